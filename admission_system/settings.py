@@ -49,6 +49,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.middleware.CurrentInstituteMiddleware',
+    'main.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # google auth
@@ -81,24 +83,89 @@ WSGI_APPLICATION = 'admission_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / config('SQLITE_NAME'),
+# DB_ENGINE=sqlite (default) keeps the single-file database for local work.
+# DB_ENGINE=postgresql uses persistent, health-checked connections, with
+# optional psycopg 3 pooling (DB_POOL) or a PgBouncer in front (DB_PGBOUNCER).
+# A read replica (DB_REPLICA_HOST, or SQLITE_REPLICA locally, which points a
+# second alias at the same file) serves the read-only catalog pages; see
+# main/routers.py.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME'),
+            'USER': config('DB_USER'),
+            'PASSWORD': config('DB_PASSWORD'),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            # Transaction-pooling PgBouncer can't keep server-side cursors open
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_PGBOUNCER', default=False, cast=bool),
+            'OPTIONS': {
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+            },
+        }
     }
-}
-
-
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': config('DB_NAME'),
-#         'USER': config('DB_USER'),
-#         'PASSWORD': config('DB_PASSWORD'),
-#         'HOST': config('DB_HOST', default='localhost'),
-#         'PORT': config('DB_PORT', default='5432'),
-#     }
-# }
+    if config('DB_POOL', default=False, cast=bool):
+        # Django's pool is psycopg 3 only, and requirements.txt pins psycopg2:
+        # install psycopg[pool] to use it. Pooled connections replace
+        # persistent ones.
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            from django.core.exceptions import ImproperlyConfigured
+            raise ImproperlyConfigured("DB_POOL needs psycopg 3 with its pool: pip install 'psycopg[pool]'.")
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+    DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+    if DB_REPLICA_HOST:
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': DB_REPLICA_HOST,
+            'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+            'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / config('SQLITE_NAME'),
+            'OPTIONS': {},
+        }
+    }
+    # Performance profile for single-box deployments (main/utils/sqlite_tuning.py):
+    # WAL so readers don't wait on the writer, and BEGIN IMMEDIATE so write
+    # transactions queue for the lock instead of failing with "database is
+    # locked". SQLITE_TUNING=False keeps SQLite's defaults.
+    SQLITE_TUNING = config('SQLITE_TUNING', default=True, cast=bool)
+    SQLITE_PRAGMAS = {}
+    if SQLITE_TUNING:
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+        SQLITE_PRAGMAS = {
+            'journal_mode': 'WAL',
+            # Durable across application crashes; only a power loss can drop
+            # the last commits
+            'synchronous': 'NORMAL',
+            'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=10000, cast=int),
+            'mmap_size': config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+            # Negative: KiB rather than pages
+            'cache_size': -config('SQLITE_CACHE_SIZE_KB', default=20000, cast=int),
+        }
+    if config('SQLITE_REPLICA', default=False, cast=bool):
+        # Stand-in replica for trying the router locally: same file, so
+        # there is never any lag
+        DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
+if 'replica' in DATABASES:
+    DATABASE_ROUTERS = ['main.routers.PrimaryReplicaRouter']
 
 
 # Password validation
@@ -139,6 +206,83 @@ STATIC_URL = 'static/'
 MEDIA_ROOT = BASE_DIR/ 'media'
 MEDIA_URL = '/media/'
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='admission-system'),
+    }
+}
+
+# Seconds the precomputed home page payload stays cached
+HOME_PAGE_CACHE_TIMEOUT = config('HOME_PAGE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds the catalog's category facet counts stay cached per filter set
+CATALOG_FACET_CACHE_TIMEOUT = config('CATALOG_FACET_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds the "Courses Offered" fragment of an institute page stays cached
+INSTITUTE_DETAIL_CACHE_TIMEOUT = config('INSTITUTE_DETAIL_CACHE_TIMEOUT', default=300, cast=int)
+
+# Search dropdown cache (seconds); prefixes with at most TYPEAHEAD_REUSE_LIMIT
+# matches per kind answer longer queries without touching the database
+TYPEAHEAD_CACHE_TIMEOUT = config('TYPEAHEAD_CACHE_TIMEOUT', default=60, cast=int)
+TYPEAHEAD_NEGATIVE_CACHE_TIMEOUT = config('TYPEAHEAD_NEGATIVE_CACHE_TIMEOUT', default=120, cast=int)
+TYPEAHEAD_REUSE_LIMIT = config('TYPEAHEAD_REUSE_LIMIT', default=50, cast=int)
+
+# Per-user cache of the logged-in owner's approved institute (seconds)
+CURRENT_INSTITUTE_CACHE_TIMEOUT = config('CURRENT_INSTITUTE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Offer letter PDFs are rendered by background workers (main/utils/offer_letters.py).
+# OFFER_LETTER_WORKERS in-process threads, which batch exports share; set to
+# 0 to leave the queue to `manage.py process_offer_letters`.
+OFFER_LETTER_WORKERS = config('OFFER_LETTER_WORKERS', default=2, cast=int)
+OFFER_LETTER_MAX_ATTEMPTS = 3
+OFFER_LETTER_JOB_TIMEOUT = 300
+
+# Generated documents stay in memory up to this many bytes, then spool to disk
+DOCUMENT_SPOOL_MAX_MEMORY = config('DOCUMENT_SPOOL_MAX_MEMORY', default=2 * 1024 * 1024, cast=int)
+
+# Content-addressed cache of rendered PDFs (main/utils/pdf_cache.py), LRU by size.
+# Generated files: the default location is ignored by git.
+PDF_CACHE_DIR = config('PDF_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'pdf'))
+PDF_CACHE_MAX_BYTES = config('PDF_CACHE_MAX_BYTES', default=256 * 1024 * 1024, cast=int)
+
+# Public base URL used in links printed on documents (QR codes, offer letters)
+SITE_URL = config('SITE_URL', default='https://yourdomain.com')
+
+# Cached QR verification records (seconds); dropped on admission changes
+VERIFICATION_CACHE_TIMEOUT = config('VERIFICATION_CACHE_TIMEOUT', default=3600, cast=int)
+
+# QR codes (main/utils/generate_qr.py): in-process LRU size, plus an optional
+# on-disk tier under MEDIA_ROOT/qr/
+QR_CACHE_SIZE = 512
+QR_DISK_CACHE = config('QR_DISK_CACHE', default=False, cast=bool)
+
+# Resized WebP/JPEG copies of uploaded images (main/utils/images.py)
+IMAGE_RENDITION_WIDTHS = (160, 320, 640, 1280)
+IMAGE_RENDITION_QUALITY = 80
+# Background threads that make renditions after upload; 0 leaves the queue to
+# `manage.py generate_renditions`
+IMAGE_WORKERS = config('IMAGE_WORKERS', default=1, cast=int)
+IMAGE_RENDITION_MAX_ATTEMPTS = 3
+
+# Chunked, resumable admission document uploads (main/utils/uploads.py).
+# Partial files live in UPLOAD_SESSION_DIR until attached to an admission.
+UPLOAD_SESSION_DIR = config('UPLOAD_SESSION_DIR', default=str(BASE_DIR / 'cache' / 'uploads'))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_SESSION_EXPIRY = 24 * 60 * 60
+# Unattached sessions a user may hold at once
+UPLOAD_MAX_SESSIONS = 10
+# Largest accepted file per document type, in bytes
+ADMISSION_DOCUMENT_MAX_SIZE = {
+    'photo': 5 * 1024 * 1024,
+    'marksheet': 10 * 1024 * 1024,
+    'id_card': 5 * 1024 * 1024,
+    'other': 10 * 1024 * 1024,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
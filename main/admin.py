@@ -1,8 +1,9 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import (
     Student, Profile, Institute, CourseCategory, Course,
-    Admission, AdmissionDocument, StudentFeedback
+    Admission, AdmissionDocument, OfferLetter, StudentFeedback
 )
+from .utils import offer_letters, reservations
 
 # Register your models here.
 
@@ -30,7 +31,7 @@ class ProfileAdmin(admin.ModelAdmin):
 # -----------------------------
 @admin.register(Institute)
 class InstituteAdmin(admin.ModelAdmin):
-    list_display = ('name', 'owner', 'status', 'created_at')
+    list_display = ('name', 'owner', 'status', 'enrolled_count', 'pending_count', 'accepted_count', 'created_at')
     list_filter = ('status',)
     search_fields = ('name', 'owner__user__username', 'email')
 
@@ -49,7 +50,7 @@ class CourseCategoryAdmin(admin.ModelAdmin):
 # -----------------------------
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
-    list_display = ('title', 'institute', 'category', 'level', 'class_type', 'original_price', 'discount_percent', 'discount_price')
+    list_display = ('title', 'institute', 'category', 'level', 'class_type', 'original_price', 'discount_percent', 'discount_price', 'enrolled_count', 'pending_count', 'accepted_count')
     list_filter = ('level', 'class_type')
     search_fields = ('title', 'institute__name', 'category__title')
 
@@ -63,6 +64,40 @@ class AdmissionAdmin(admin.ModelAdmin):
     list_filter = ('status', 'is_paid', 'institute')
     search_fields = ('student_name', 'email', 'course__title', 'institute__name')
 
+    actions = ('shortlist_selected', 'accept_selected', 'reject_selected')
+
+    def _bulk(self, request, queryset, action):
+        report = reservations.bulk_update_admissions(queryset.values_list('pk', flat=True), action)
+        for line in reservations.summarize(report):
+            self.message_user(request, line, messages.INFO)
+
+    @admin.action(description="Shortlist selected admissions")
+    def shortlist_selected(self, request, queryset):
+        self._bulk(request, queryset, 'shortlist')
+
+    @admin.action(description="Accept selected admissions (enroll and take seats)")
+    def accept_selected(self, request, queryset):
+        self._bulk(request, queryset, 'accept')
+
+    @admin.action(description="Reject selected admissions")
+    def reject_selected(self, request, queryset):
+        self._bulk(request, queryset, 'reject')
+
+    def save_model(self, request, obj, form, change):
+        # Acceptance goes through the seat reservation service
+        accepting = change and obj.status == 'accepted' and 'status' in form.changed_data
+        if accepting:
+            # Save the other edits but leave status alone: another request
+            # may have accepted the admission since this form was loaded
+            obj.status = form.initial.get('status', 'pending')
+            obj.save(update_fields=[name for name in form.changed_data if name != 'status'])
+        else:
+            super().save_model(request, obj, form, change)
+        if accepting:
+            result, _admission = reservations.accept_admission(obj.pk)
+            level = messages.SUCCESS if result in reservations.SUCCESSFUL else messages.ERROR
+            self.message_user(request, reservations.MESSAGES[result], level)
+
 
 # -----------------------------
 # AdmissionDocument
@@ -73,6 +108,23 @@ class AdmissionDocumentAdmin(admin.ModelAdmin):
     search_fields = ('admission__student_name', 'doc_type')
 
 
+# -----------------------------
+# OfferLetter
+# -----------------------------
+@admin.register(OfferLetter)
+class OfferLetterAdmin(admin.ModelAdmin):
+    list_display = ('admission', 'status', 'attempts', 'finished_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('admission__student_name',)
+    readonly_fields = ('file', 'attempts', 'error', 'started_at', 'finished_at')
+    actions = ('regenerate_selected',)
+
+    @admin.action(description="Regenerate selected offer letters")
+    def regenerate_selected(self, request, queryset):
+        count = offer_letters.enqueue(queryset.values_list('admission_id', flat=True))
+        self.message_user(request, f"Queued {count} offer letters.", messages.INFO)
+
+
 # -----------------------------
 # StudentFeedback
 # -----------------------------
@@ -1,9 +1,6 @@
-from main.models import Institute
+from main.utils.current_institute import current_institute
+from django.utils.functional import SimpleLazyObject
 
 def approved_institute(request):
-    user_student = getattr(request.user, 'student_profile', None)
-    approved = None
-    if user_student:
-        institutes = Institute.objects.filter(owner=user_student, status='approved')
-        approved = institutes.first() if institutes.exists() else None
-    return {'approved_institute': approved}
+    # Lazy, so pages that never show it skip the lookup entirely
+    return {'approved_institute': SimpleLazyObject(lambda: current_institute(request))}
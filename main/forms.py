@@ -102,6 +102,24 @@ class AdmissionForm(forms.ModelForm):
             "dob": forms.DateInput(attrs={"type": "date"})
         }
 
+    def __init__(self, *args, course=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The option labels show the institute name
+        self.fields["category"].queryset = CourseCategory.objects.select_related("institute")
+        self.fields["course"].queryset = Course.objects.select_related("institute")
+        if self.is_bound:
+            return
+        # An empty form only needs the options it shows: the chosen course,
+        # or the institutes (categories and courses load over ajax once one
+        # is picked)
+        if course is not None:
+            self.fields["institute"].queryset = Institute.objects.filter(pk=course.institute_id)
+            self.fields["category"].queryset = self.fields["category"].queryset.filter(pk=course.category_id)
+            self.fields["course"].queryset = self.fields["course"].queryset.filter(pk=course.pk)
+        else:
+            self.fields["category"].queryset = CourseCategory.objects.none()
+            self.fields["course"].queryset = Course.objects.none()
+
 
 # -----------------------------
 # 4) Admission Documents Form
@@ -0,0 +1,161 @@
+import json
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+
+from main.models import Admission, Course, CourseCategory, Enrollment, Institute, Profile, Student
+from main.utils import reservations
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent accepts at one course and check that seats, enrollments "
+        "and admission states come out consistent. Creates and removes its own data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seats", type=int, default=100)
+        parser.add_argument("--applicants", type=int, default=300)
+        parser.add_argument("--workers", type=int, default=16)
+        parser.add_argument(
+            "--duplicates", type=int, default=2,
+            help="How many times each admission is accepted concurrently.",
+        )
+        parser.add_argument("--max-retries", type=int, default=500)
+        parser.add_argument("--keep", action="store_true", help="Keep the generated rows.")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    # -----------------------------------
+    # Data
+    # -----------------------------------
+    def _create_fixture(self, seats, applicants):
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create_user(f"bench_owner_{tag}")
+        institute = Institute.objects.create(
+            owner=owner.student_profile, name=f"Bench Institute {tag}", description="benchmark",
+            estd="2000", email="bench@example.com", phone="0", status="approved",
+            register_number=tag,
+        )
+        category = CourseCategory.objects.create(institute=institute, title=f"Bench {tag}")
+        course = Course.objects.create(
+            institute=institute, category=category, title=f"Bench course {tag}",
+            description="benchmark", duration="1 month", level="Beginner",
+            class_type="online", seats=seats, original_price=1000,
+        )
+
+        users = User.objects.bulk_create(
+            [User(username=f"bench_{tag}_{i}") for i in range(applicants)]
+        )
+        if users[0].pk is None:
+            users = list(User.objects.filter(username__startswith=f"bench_{tag}_"))
+        Student.objects.bulk_create([Student(user=u) for u in users])
+        Profile.objects.bulk_create([Profile(user=u, full_name=u.username) for u in users])
+        admissions = Admission.objects.bulk_create([
+            Admission(
+                user=u, student_name=u.username, email="s@example.com", phone="0",
+                institute=institute, category=category, course=course,
+            )
+            for u in users
+        ])
+        if admissions[0].pk is None:
+            admissions = list(Admission.objects.filter(course=course))
+        return owner, users, course, [a.pk for a in admissions]
+
+    def _cleanup(self, owner, users):
+        User.objects.filter(pk__in=[u.pk for u in users]).delete()
+        owner.delete()
+
+    # -----------------------------------
+    # Run
+    # -----------------------------------
+    def _accept(self, admission_id, max_retries):
+        retries = 0
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    result, _admission = reservations.accept_admission(admission_id)
+                    return result, time.perf_counter() - start, retries
+                except OperationalError:
+                    # SQLite reports writer contention as "database is locked"
+                    retries += 1
+                    if retries > max_retries:
+                        return "error", time.perf_counter() - start, retries
+                    time.sleep(random.uniform(0.001, 0.01) * min(retries, 10))
+        finally:
+            close_old_connections()
+            connection.close()
+
+    def handle(self, *args, **options):
+        seats, applicants = options["seats"], options["applicants"]
+        if seats < 0 or applicants < 1 or options["workers"] < 1 or options["duplicates"] < 1:
+            raise CommandError("seats must be >= 0; applicants, workers and duplicates >= 1.")
+
+        owner, users, course, admission_ids = self._create_fixture(seats, applicants)
+        jobs = admission_ids * options["duplicates"]
+        random.shuffle(jobs)
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+                outcomes = list(pool.map(lambda pk: self._accept(pk, options["max_retries"]), jobs))
+            elapsed = time.perf_counter() - started
+
+            course.refresh_from_db()
+            enrollments = Enrollment.objects.filter(course=course)
+            enrolled = enrollments.count()
+            distinct_students = enrollments.values("student").distinct().count()
+            accepted = Admission.objects.filter(course=course, status="accepted").count()
+            expected = min(seats, applicants)
+
+            tally = {}
+            for result, _latency, _retries in outcomes:
+                tally[result] = tally.get(result, 0) + 1
+            latencies = sorted(latency for _result, latency, _retries in outcomes)
+
+            checks = {
+                "seats_not_negative": course.seats >= 0,
+                "seats_match_enrollments": course.seats == seats - enrolled,
+                "enrollments_expected": enrolled == expected,
+                "no_duplicate_enrollments": distinct_students == enrolled,
+                "accepted_match_enrollments": accepted == enrolled,
+                "no_errors": "error" not in tally,
+            }
+            report = {
+                "database": connection.vendor,
+                "seats": seats,
+                "applicants": applicants,
+                "requests": len(jobs),
+                "workers": options["workers"],
+                "elapsed_s": round(elapsed, 4),
+                "throughput_rps": round(len(jobs) / elapsed, 1) if elapsed else None,
+                "latency_ms": {
+                    "p50": round(statistics.median(latencies) * 1000, 2),
+                    "p95": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+                    "max": round(latencies[-1] * 1000, 2),
+                },
+                "retries": sum(r for _result, _latency, r in outcomes),
+                "results": tally,
+                "remaining_seats": course.seats,
+                "enrollments": enrolled,
+                "checks": checks,
+            }
+        finally:
+            if not options["keep"]:
+                self._cleanup(owner, users)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for key, value in report.items():
+                self.stdout.write(f"{key}: {value}")
+
+        if not all(checks.values()):
+            raise CommandError("Seat reservation benchmark found inconsistent results.")
+        self.stdout.write(self.style.SUCCESS("All reservation checks passed."))
@@ -0,0 +1,234 @@
+import json
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+
+from main.models import Admission, Course, CourseCategory, Institute, Profile, Student
+from main.utils import reservations, sqlite_tuning
+
+
+# What SQLite does when the profile is off
+STOCK_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+OPERATIONS = ("read", "apply", "pay", "accept")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the same mix of catalog reads and admission writes (apply, pay, "
+        "accept with its seat decrement) from concurrent threads against "
+        "SQLite's stock settings and then the configured SQLITE_PRAGMAS "
+        "profile, and report the error rate and throughput of each. Failed "
+        "requests are counted, not retried. Creates and removes its own data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per profile.")
+        parser.add_argument("--workers", type=int, default=16)
+        parser.add_argument("--applicants", type=int, default=300)
+        parser.add_argument("--reads", type=float, default=0.5, help="Share of requests that only read.")
+        parser.add_argument("--seed", type=int, default=None, help="Seed for the request mix.")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated rows.")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    # -----------------------------------
+    # Data
+    # -----------------------------------
+    def _create_fixture(self, applicants, seats):
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create_user(f"bench_owner_{tag}")
+        institute = Institute.objects.create(
+            owner=owner.student_profile, name=f"Bench Institute {tag}", description="benchmark",
+            estd="2000", email="bench@example.com", phone="0", status="approved",
+            register_number=tag,
+        )
+        category = CourseCategory.objects.create(institute=institute, title=f"Bench {tag}")
+        courses = [
+            Course.objects.create(
+                institute=institute, category=category, title=f"Bench course {tag} {i}",
+                description="benchmark", duration="1 month", level="Beginner",
+                class_type="online", seats=seats, original_price=1000,
+            )
+            for i in range(5)
+        ]
+        users = User.objects.bulk_create(
+            [User(username=f"bench_{tag}_{i}") for i in range(applicants)]
+        )
+        if users[0].pk is None:
+            users = list(User.objects.filter(username__startswith=f"bench_{tag}_"))
+        Student.objects.bulk_create([Student(user=u) for u in users])
+        Profile.objects.bulk_create([Profile(user=u, full_name=u.username) for u in users])
+        admissions = Admission.objects.bulk_create([
+            Admission(
+                user=u, student_name=u.username, email="s@example.com", phone="0",
+                institute=institute, category=category, course=courses[i % len(courses)],
+                amount=1000,
+            )
+            for i, u in enumerate(users)
+        ])
+        if admissions[0].pk is None:
+            admissions = list(Admission.objects.filter(institute=institute))
+        return owner, users, institute, courses, [a.pk for a in admissions]
+
+    def _cleanup(self, owner, users):
+        User.objects.filter(pk__in=[u.pk for u in users]).delete()
+        owner.delete()
+
+    # -----------------------------------
+    # Requests
+    # -----------------------------------
+    # Each mirrors the database work of its view
+    def _read(self, institute, courses, users, admission_ids):
+        # Catalog page: a course list and the institute's counters
+        list(Course.objects.filter(institute=institute).select_related("category")[:20])
+        Institute.objects.filter(pk=institute.pk).values("accepted_count", "enrolled_count").first()
+
+    def _apply(self, institute, courses, users, admission_ids):
+        # admission_form: duplicate check, then the admission and its counters
+        user, course = random.choice(users), random.choice(courses)
+        Admission.objects.filter(user=user, course=course).exclude(status="rejected").exists()
+        with transaction.atomic():
+            Admission.objects.create(
+                user=user, student_name=user.username, email="s@example.com", phone="0",
+                institute=institute, category_id=course.category_id, course=course, amount=1000,
+            )
+
+    def _pay(self, institute, courses, users, admission_ids):
+        # esewa_success_mock
+        admission = Admission.objects.get(pk=random.choice(admission_ids))
+        admission.is_paid = True
+        admission.esewa_ref_id = f"BENCH_{admission.pk}"
+        with transaction.atomic():
+            admission.save()
+
+    def _accept(self, institute, courses, users, admission_ids):
+        # Accepting takes the seat (reservations.take_seat)
+        reservations.accept_admission(random.choice(admission_ids))
+
+    def _request(self, op, fixture):
+        start = time.perf_counter()
+        try:
+            getattr(self, f"_{op}")(*fixture)
+            ok = True
+        except OperationalError:
+            # "database is locked"
+            ok = False
+        finally:
+            # A fresh connection per request, as with CONN_MAX_AGE = 0
+            connection.close()
+        return op, ok, time.perf_counter() - start
+
+    # -----------------------------------
+    # Run
+    # -----------------------------------
+    def _run_profile(self, name, pragmas, mode, ops, options):
+        connections.close_all()
+        with override_settings(SQLITE_PRAGMAS=pragmas), sqlite_tuning.transaction_mode(mode):
+            owner, users, institute, courses, admission_ids = self._create_fixture(
+                options["applicants"], len(ops),
+            )
+            fixture = (institute, courses, users, admission_ids)
+            try:
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+                    outcomes = list(pool.map(lambda op: self._request(op, fixture), ops))
+                elapsed = time.perf_counter() - started
+                journal_mode = sqlite_tuning.current(connection, "journal_mode")
+            finally:
+                if not options["keep"]:
+                    self._cleanup(owner, users)
+                connections.close_all()
+
+        latencies = sorted(latency for _op, _ok, latency in outcomes)
+        errors = sum(1 for _op, ok, _latency in outcomes if not ok)
+        by_operation = {}
+        for op, ok, _latency in outcomes:
+            counts = by_operation.setdefault(op, {"requests": 0, "errors": 0})
+            counts["requests"] += 1
+            counts["errors"] += 0 if ok else 1
+        return {
+            "profile": name,
+            "journal_mode": journal_mode,
+            "transaction_mode": mode or "DEFERRED",
+            "pragmas": pragmas,
+            "requests": len(outcomes),
+            "errors": errors,
+            "error_rate": round(errors / len(outcomes), 4),
+            "elapsed_s": round(elapsed, 4),
+            "throughput_rps": round(len(outcomes) / elapsed, 1) if elapsed else None,
+            # Failed requests return early; this is the rate that did work
+            "successful_rps": round((len(outcomes) - errors) / elapsed, 1) if elapsed else None,
+            "latency_ms": {
+                "p50": round(statistics.median(latencies) * 1000, 2),
+                "p95": round(latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2),
+            },
+            "by_operation": by_operation,
+        }
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This benchmark only applies to SQLite.")
+        if options["requests"] < 1 or options["workers"] < 1 or options["applicants"] < 1:
+            raise CommandError("requests, workers and applicants must be >= 1.")
+        if not 0 <= options["reads"] <= 1:
+            raise CommandError("--reads must be between 0 and 1.")
+        tuned = sqlite_tuning.pragmas()
+        if not tuned:
+            raise CommandError("No SQLite profile is configured (SQLITE_TUNING is off).")
+
+        rng = random.Random(options["seed"])
+        writes = OPERATIONS[1:]
+        ops = [
+            "read" if rng.random() < options["reads"] else rng.choice(writes)
+            for _ in range(options["requests"])
+        ]
+
+        original_mode = sqlite_tuning.current(connection, "journal_mode")
+        try:
+            results = [
+                self._run_profile("stock", STOCK_PRAGMAS, None, ops, options),
+                self._run_profile("tuned", tuned, "IMMEDIATE", ops, options),
+            ]
+        finally:
+            # journal_mode is stored in the file; leave it as we found it
+            connections.close_all()
+            sqlite_tuning.apply_pragmas(connection, {"journal_mode": original_mode})
+
+        stock, tuned = results
+        report = {
+            "database": str(connection.settings_dict["NAME"]),
+            "workers": options["workers"],
+            "profiles": results,
+            "error_rate_change": round(tuned["error_rate"] - stock["error_rate"], 4),
+            "successful_rps_ratio": (
+                round(tuned["successful_rps"] / stock["successful_rps"], 2)
+                if stock["successful_rps"] and tuned["successful_rps"] else None
+            ),
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for result in results:
+                self.stdout.write(
+                    f"{result['profile']}: journal={result['journal_mode']}, "
+                    f"transactions={result['transaction_mode']}, {result['requests']} requests, "
+                    f"{result['errors']} errors ({result['error_rate']:.2%}), "
+                    f"{result['throughput_rps']} req/s ({result['successful_rps']} successful), p95 {result['latency_ms']['p95']} ms"
+                )
+                for op, counts in sorted(result["by_operation"].items()):
+                    self.stdout.write(f"  {op}: {counts['requests']} requests, {counts['errors']} errors")
+            self.stdout.write(f"successful req/s, tuned / stock: {report['successful_rps_ratio']}")
+
+        if tuned["errors"]:
+            raise CommandError(f"The tuned profile still failed {tuned['errors']} requests.")
+        if not options["json"]:
+            self.stdout.write(self.style.SUCCESS("The tuned profile served every request."))
@@ -0,0 +1,170 @@
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from main.models import Admission, Course, CourseCategory, Institute
+from main.utils import verification
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a burst of QR verification scans (valid and forged) through "
+        "the full request stack and report throughput, latency and queries. "
+        "Creates and removes its own data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--admissions", type=int, default=200)
+        parser.add_argument("--scans", type=int, default=5000)
+        parser.add_argument("--workers", type=int, default=16)
+        parser.add_argument("--forged", type=float, default=0.2, help="Share of scans with a forged token.")
+        parser.add_argument("--warm", action="store_true", help="Precompute every record before the burst.")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated rows.")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    # -----------------------------------
+    # Data
+    # -----------------------------------
+    def _create_fixture(self, count):
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create_user(f"bench_owner_{tag}")
+        institute = Institute.objects.create(
+            owner=owner.student_profile, name=f"Bench Institute {tag}", description="benchmark",
+            estd="2000", email="bench@example.com", phone="0", status="approved",
+            register_number=tag,
+        )
+        category = CourseCategory.objects.create(institute=institute, title=f"Bench {tag}")
+        course = Course.objects.create(
+            institute=institute, category=category, title=f"Bench course {tag}",
+            description="benchmark", duration="1 month", level="Beginner",
+            class_type="online", seats=count, original_price=1000,
+        )
+        admissions = Admission.objects.bulk_create([
+            Admission(
+                student_name=f"Bench student {i}", email="s@example.com", phone="0",
+                institute=institute, category=category, course=course, status="accepted",
+            )
+            for i in range(count)
+        ])
+        if admissions[0].pk is None:
+            admissions = list(Admission.objects.filter(course=course))
+        return owner, [a.pk for a in admissions]
+
+    # -----------------------------------
+    # Run
+    # -----------------------------------
+    def _scan(self, local, url, forged):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = Client(HTTP_ACCEPT="application/json")
+
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count):
+            response = client.get(url)
+        latency = time.perf_counter() - start
+        ok = response.status_code == 404 if forged else (
+            response.status_code == 200 and response.json().get("verified") is True
+        )
+        return forged, ok, latency, len(queries)
+
+    def handle(self, *args, **options):
+        if options["admissions"] < 1 or options["scans"] < 1 or options["workers"] < 1:
+            raise CommandError("admissions, scans and workers must be >= 1.")
+        if not 0 <= options["forged"] <= 1:
+            raise CommandError("--forged must be between 0 and 1.")
+
+        owner, admission_ids = self._create_fixture(options["admissions"])
+        verification.invalidate(admission_ids)
+        if options["warm"]:
+            verification.warm(admission_ids)
+
+        jobs = []
+        for _ in range(options["scans"]):
+            admission_id = random.choice(admission_ids)
+            forged = random.random() < options["forged"]
+            token = verification.make_token(admission_id)
+            if forged:
+                token = f"{admission_id}:{uuid.uuid4().hex[:27]}"
+            jobs.append((reverse("main:verify_admission", args=[token]), forged))
+
+        local = threading.local()
+        # Every forged scan would otherwise log a "Not Found" warning
+        request_logger = logging.getLogger("django.request")
+        log_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+                    outcomes = list(pool.map(lambda job: self._scan(local, *job), jobs))
+                elapsed = time.perf_counter() - started
+        finally:
+            request_logger.setLevel(log_level)
+            verification.invalidate(admission_ids)
+            if not options["keep"]:
+                Admission.objects.filter(pk__in=admission_ids).delete()
+                owner.delete()
+
+        latencies = sorted(latency for _forged, _ok, latency, _q in outcomes)
+        valid = [o for o in outcomes if not o[0]]
+        forged = [o for o in outcomes if o[0]]
+
+        def pct(p):
+            return round(latencies[max(int(len(latencies) * p) - 1, 0)] * 1000, 3)
+
+        checks = {
+            "valid_scans_verified": all(ok for _f, ok, _l, _q in valid),
+            "forged_scans_rejected": all(ok for _f, ok, _l, _q in forged),
+            "forged_scans_no_queries": all(q == 0 for _f, _ok, _l, q in forged),
+            "valid_scans_at_most_one_query": all(q <= 1 for _f, _ok, _l, q in valid),
+        }
+        report = {
+            "database": connection.vendor,
+            "cache": settings.CACHES["default"]["BACKEND"],
+            "admissions": len(admission_ids),
+            "scans": len(outcomes),
+            "forged": len(forged),
+            "workers": options["workers"],
+            "warm": options["warm"],
+            "elapsed_s": round(elapsed, 4),
+            "throughput_rps": round(len(outcomes) / elapsed, 1) if elapsed else None,
+            "latency_ms": {
+                "p50": round(statistics.median(latencies) * 1000, 3),
+                "p95": pct(0.95),
+                "p99": pct(0.99),
+                "max": round(latencies[-1] * 1000, 3),
+            },
+            "queries": {
+                "valid_total": sum(q for _f, _ok, _l, q in valid),
+                "forged_total": sum(q for _f, _ok, _l, q in forged),
+            },
+            "checks": checks,
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for key, value in report.items():
+                self.stdout.write(f"{key}: {value}")
+
+        if not all(checks.values()):
+            raise CommandError("Verification benchmark found failing scans.")
+        self.stdout.write(self.style.SUCCESS("All verification checks passed."))
@@ -0,0 +1,280 @@
+import json
+import logging
+import math
+import statistics
+import tempfile
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from main.models import Admission, Course, Institute, OfferLetter, StudentFeedback
+from main.utils import offer_letters
+
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted ``values``."""
+    return values[max(math.ceil(len(values) * p / 100) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Request each main view repeatedly against the current database (fill "
+        "it with generate_load_data first) and report latency percentiles and "
+        "query counts per view as JSON. --compare checks the run against an "
+        "earlier --output file and fails on regressions. Read-only: an offer "
+        "letter rendered for the download view goes to a temporary PDF cache "
+        "and is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50, help="Measured requests per view.")
+        parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per view first.")
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request.")
+        parser.add_argument("--views", nargs="+", help="Only these views.")
+        parser.add_argument("--query", help="Search term for ajax_search (default: a word from a course title).")
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+        parser.add_argument("--compare", help="Earlier results file to compare against.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25,
+            help="Allowed p95 latency growth over --compare, as a fraction.",
+        )
+        parser.add_argument(
+            "--min-delta-ms", type=float, default=5.0,
+            help="Ignore p95 growth smaller than this, which is mostly noise on fast views.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    # -----------------------------------
+    # Fixture
+    # -----------------------------------
+    def _pick(self, query):
+        """Users and objects to request, taken from the existing data."""
+        admission = (
+            Admission.objects
+            .filter(status="accepted", user__isnull=False, course__isnull=False, institute__status="approved")
+            .select_related("user")
+            .order_by("pk")
+            .first()
+        )
+        institute = Institute.objects.filter(status="approved").order_by("-enrolled_count", "pk").first()
+        if admission is None or institute is None:
+            raise CommandError("No approved institute with an accepted admission; run generate_load_data first.")
+
+        student = admission.user
+        applied = Admission.objects.filter(user=student).exclude(status="rejected").values("course")
+        course = Course.objects.filter(institute__status="approved").exclude(pk__in=applied).order_by("pk").first()
+        if course is None:
+            raise CommandError(f"{student.username} has applied to every course.")
+        if not query:
+            query = admission.course.title.split()[0]
+        return {
+            "owner": institute.owner.user,
+            "student": student,
+            "institute": institute,
+            "course": course,
+            "admission": admission,
+            "query": query,
+        }
+
+    def _render_letter(self, admission):
+        """
+        Render the admission's offer letter up front so downloads measure
+        serving it. Returns the OfferLetter row when it was created here (the
+        caller deletes it), or None when the admission already had one.
+        """
+        if offer_letters.letter_for(admission) is not None:
+            return None
+        # Rendered directly rather than through the queue, which would also
+        # pick up other admissions' pending letters
+        letter = OfferLetter.objects.create(
+            admission=admission, status=offer_letters.RUNNING, started_at=timezone.now(), attempts=1,
+        )
+        offer_letters.run_job(letter)
+        return letter
+
+    def _pages(self, fixture):
+        # label -> (user or None, url)
+        return {
+            "home": (None, reverse("main:home")),
+            "course": (fixture["student"], reverse("main:course")),
+            "ajax_search": (None, f"{reverse('main:ajax_search')}?q={fixture['query']}"),
+            "institute_detail": (None, reverse("main:institute_detail", args=[fixture["institute"].pk])),
+            "dashboard": (fixture["owner"], reverse("main:dashboard")),
+            "student_profile": (fixture["student"], reverse("main:student_profile")),
+            "admission_form": (
+                fixture["student"], f"{reverse('main:admission_form')}?course_id={fixture['course'].pk}",
+            ),
+            "download_offer_letter": (
+                fixture["student"], reverse("main:download_offer_letter", args=[fixture["admission"].pk]),
+            ),
+        }
+
+    def _dataset(self):
+        return {
+            "institutes": Institute.objects.count(),
+            "courses": Course.objects.count(),
+            "admissions": Admission.objects.count(),
+            "feedback": StudentFeedback.objects.count(),
+        }
+
+    # -----------------------------------
+    # Run
+    # -----------------------------------
+    def _request(self, client, url, cold):
+        if cold:
+            cache.clear()
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # Every alias, so pages routed to a read replica are counted too
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count))
+            start = time.perf_counter()
+            response = client.get(url)
+            # Streamed responses (offer letters) are only done once read
+            if response.streaming:
+                b"".join(response.streaming_content)
+            latency = time.perf_counter() - start
+        return response.status_code, latency, len(queries)
+
+    def _measure(self, user, url, options):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        for _ in range(options["warmup"]):
+            self._request(client, url, options["cold"])
+        samples = [self._request(client, url, options["cold"]) for _ in range(options["iterations"])]
+
+        statuses = {}
+        for status, _latency, _queries in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        latencies = sorted(latency * 1000 for _status, latency, _queries in samples)
+        queries = sorted(q for _status, _latency, q in samples)
+        return {
+            "url": url,
+            "status": statuses,
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies), 3),
+                **{f"p{p}": round(percentile(latencies, p), 3) for p in PERCENTILES},
+                "max": round(latencies[-1], 3),
+            },
+            "queries": {
+                "min": queries[0],
+                "median": statistics.median(queries),
+                "max": queries[-1],
+            },
+        }
+
+    # -----------------------------------
+    # Compare
+    # -----------------------------------
+    def _regressions(self, results, baseline, tolerance, min_delta):
+        found = []
+        for label, result in results.items():
+            before = baseline.get("views", {}).get(label)
+            if before is None:
+                continue
+            p95, old_p95 = result["latency_ms"]["p95"], before["latency_ms"]["p95"]
+            if p95 > old_p95 * (1 + tolerance) and p95 - old_p95 > min_delta:
+                found.append(f"{label}: p95 {old_p95} ms -> {p95} ms")
+            queries, old_queries = result["queries"]["max"], before["queries"]["max"]
+            if queries > old_queries:
+                found.append(f"{label}: up to {old_queries} -> {queries} queries")
+            if set(result["status"]) != set(before["status"]):
+                found.append(f"{label}: status {sorted(before['status'])} -> {sorted(result['status'])}")
+        return found
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1 or options["warmup"] < 0:
+            raise CommandError("iterations must be >= 1 and warmup >= 0.")
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+            if baseline.get("cold") != options["cold"]:
+                raise CommandError("--compare needs a baseline run with the same --cold setting.")
+
+        fixture = self._pick(options["query"])
+        pages = self._pages(fixture)
+        labels = options["views"] or list(pages)
+        unknown = sorted(set(labels) - set(pages))
+        if unknown:
+            raise CommandError(f"Unknown views: {', '.join(unknown)}. Choose from {', '.join(pages)}.")
+
+        results = {}
+        request_logger = logging.getLogger("django.request")
+        log_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        letter = None
+        try:
+            # Rendered PDFs go to a throwaway cache, not the shared one
+            with tempfile.TemporaryDirectory() as pdf_cache_dir, override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], PDF_CACHE_DIR=pdf_cache_dir,
+            ):
+                if "download_offer_letter" in labels:
+                    letter = self._render_letter(fixture["admission"])
+                for label in labels:
+                    user, url = pages[label]
+                    results[label] = self._measure(user, url, options)
+        finally:
+            request_logger.setLevel(log_level)
+            if letter is not None:
+                # Its stored file goes with it (signals.delete_offer_letter_file)
+                letter.delete()
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "cache": settings.CACHES["default"]["BACKEND"],
+            "dataset": self._dataset(),
+            "iterations": options["iterations"],
+            "warmup": options["warmup"],
+            "cold": options["cold"],
+            "views": results,
+        }
+        regressions = []
+        if baseline is not None:
+            regressions = self._regressions(
+                results, baseline, options["tolerance"], options["min_delta_ms"],
+            )
+            report["compared_to"] = options["compare"]
+            report["regressions"] = regressions
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(f"dataset: {report['dataset']}")
+            for label, result in results.items():
+                latency = result["latency_ms"]
+                self.stdout.write(
+                    f"{label}: HTTP {result['status']}, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+                    f"p99 {latency['p99']} ms, {result['queries']['max']} queries"
+                )
+            for line in regressions:
+                self.stderr.write(f"Regression: {line}")
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} regressions against {options['compare']}.")
+        if not options["json"]:
+            self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(results)} views."))
@@ -0,0 +1,279 @@
+import json
+import logging
+import re
+import uuid
+from contextlib import ExitStack
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from main.models import (
+    Admission, Course, CourseCategory, Enrollment, Institute, Profile, Student,
+    StudentFeedback,
+)
+
+
+# Indexes added for these pages (migrations 0012 and 0013); each must show up in at
+# least one plan, so dropping or shadowing one fails the run too
+EXPECTED_INDEXES = (
+    "institute_owner_status_idx",
+    "coursecategory_title_idx",
+    "course_category_id_idx",
+    "admission_user_course_idx",
+    "admission_institute_course_idx",
+    "feedback_created_idx",
+    "course_price_idx",
+)
+
+# Most queries each page may issue on a cold cache (the session and user
+# lookups included). The counts don't depend on the size of the dataset, so
+# a page going over its budget has picked up an N+1.
+QUERY_BUDGETS = {
+    "home": 4,
+    "catalog": 6,
+    "catalog_category": 5,
+    "catalog_price": 5,
+    "institute_detail": 3,
+    "dashboard": 8,
+    "category_list": 4,
+    "course_list": 5,
+    "student_profile": 5,
+    "admission_form": 8,
+}
+
+SQLITE_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+POSTGRES_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a dataset, request the hot pages, run EXPLAIN (QUERY PLAN) on "
+        "every SELECT they issue and fail if one scans a whole table, a "
+        "hot-path index goes unused, or a page doesn't answer 200 within its "
+        "query budget. "
+        "Creates and removes its own data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=200)
+        parser.add_argument("--admissions", type=int, default=2000)
+        parser.add_argument("--students", type=int, default=50)
+        parser.add_argument("--plans", action="store_true", help="Print every query plan.")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated rows.")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    # -----------------------------------
+    # Data
+    # -----------------------------------
+    def _create_fixture(self, options):
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create_user(f"explain_owner_{tag}")
+        students = User.objects.bulk_create([
+            User(username=f"explain_student_{tag}_{i}") for i in range(options["students"])
+        ])
+        students = list(User.objects.filter(username__startswith=f"explain_student_{tag}_").order_by("pk"))
+        # bulk_create skips the signals that give users their Student and Profile
+        Student.objects.bulk_create([Student(user=user) for user in students])
+        Profile.objects.bulk_create([Profile(user=user, full_name=user.username) for user in students])
+        students = list(
+            User.objects.filter(pk__in=[user.pk for user in students]).select_related("student_profile").order_by("pk")
+        )
+        institute = Institute.objects.create(
+            owner=owner.student_profile, name=f"Explain Institute {tag}", description="explain",
+            estd="2000", email="explain@example.com", phone="0", status="approved",
+            register_number=tag,
+        )
+        categories = CourseCategory.objects.bulk_create([
+            CourseCategory(institute=institute, title=f"Explain {tag} {i}") for i in range(10)
+        ])
+        categories = list(CourseCategory.objects.filter(institute=institute).order_by("pk"))
+        Course.objects.bulk_create([
+            Course(
+                institute=institute, category=categories[i % len(categories)],
+                title=f"Explain course {tag} {i}", description="explain", duration="1 month",
+                level="Beginner", class_type="online", seats=100,
+                original_price=Decimal("1000"), discount_price=Decimal("1000"),
+            )
+            for i in range(options["courses"])
+        ])
+        courses = list(Course.objects.filter(institute=institute).order_by("pk"))
+        statuses = ["pending", "shortlisted", "accepted", "rejected"]
+        Admission.objects.bulk_create([
+            Admission(
+                user=students[i % len(students)], student_name=f"Student {i}", email="s@example.com",
+                phone="0", institute=institute, category=courses[i % len(courses)].category,
+                course=courses[i % len(courses)], status=statuses[i % len(statuses)],
+            )
+            for i in range(options["admissions"])
+        ])
+        Enrollment.objects.bulk_create([
+            Enrollment(student=user.student_profile, course=courses[(i * 7 + j) % len(courses)])
+            for i, user in enumerate(students) for j in range(3)
+        ], ignore_conflicts=True)
+        StudentFeedback.objects.bulk_create([
+            StudentFeedback(student=students[i % len(students)], feedback_text="explain")
+            for i in range(options["students"] * 4)
+        ])
+        # A course the first student hasn't applied to, so the admission form renders
+        applied = Admission.objects.filter(user=students[0]).values("course")
+        course = Course.objects.filter(institute=institute).exclude(pk__in=applied).order_by("pk").first()
+        if course is None:
+            raise CommandError("The first student applied to every course; use more --courses.")
+        return owner, students, institute, categories[0], course
+
+    def _pages(self, owner, student, institute, category, course):
+        # (label, user or None, url)
+        return [
+            ("home", None, reverse("main:home")),
+            ("catalog", student, reverse("main:course")),
+            ("catalog_category", student, f"{reverse('main:course')}?category={category.title}"),
+            ("catalog_price", student, f"{reverse('main:course')}?sort=price"),
+            ("institute_detail", None, reverse("main:institute_detail", args=[institute.pk])),
+            ("dashboard", owner, reverse("main:dashboard")),
+            ("category_list", owner, reverse("main:category_list")),
+            ("course_list", owner, reverse("main:course_list", args=[category.pk])),
+            ("student_profile", student, reverse("main:student_profile")),
+            ("admission_form", student, f"{reverse('main:admission_form')}?course_id={course.pk}"),
+        ]
+
+    # -----------------------------------
+    # Plans
+    # -----------------------------------
+    def _explain(self, alias, sql, params):
+        with connections[alias].cursor() as cursor:
+            if connections[alias].vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                lines = [row[-1] for row in cursor.fetchall()]
+                scans = [m.group(1) for m in map(SQLITE_SCAN_RE.match, lines) if m]
+                # A top-N that walks the table in rowid order (no sort step)
+                # stops after LIMIT rows; that isn't a full scan
+                if "LIMIT" in sql and "ORDER BY" in sql and not any("TEMP B-TREE" in line for line in lines):
+                    scans = []
+            else:
+                cursor.execute(f"EXPLAIN {sql}", params)
+                lines = [row[0] for row in cursor.fetchall()]
+                scans = [m.group(1) for line in lines for m in [POSTGRES_SCAN_RE.search(line)] if m]
+        return lines, scans
+
+    def _capture(self, client, url):
+        """The response, the number of queries and the SELECTs among them."""
+        queries = []
+        count = 0
+
+        def capture(alias):
+            def wrapper(execute, sql, params, many, context):
+                nonlocal count
+                count += 1
+                if not many and sql.lstrip().upper().startswith("SELECT"):
+                    queries.append((alias, sql, params))
+                return execute(sql, params, many, context)
+            return wrapper
+
+        # Every alias, so pages routed to a read replica are covered too
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(capture(alias)))
+            response = client.get(url)
+        return response, count, queries
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"EXPLAIN parsing is not implemented for {connection.vendor}.")
+        if min(options["courses"], options["admissions"], options["students"]) < 1:
+            raise CommandError("courses, admissions and students must be >= 1.")
+
+        owner, students, institute, category, course = self._create_fixture(options)
+        pages = self._pages(owner, students[0], institute, category, course)
+
+        results = []
+        request_logger = logging.getLogger("django.request")
+        log_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                for label, user, url in pages:
+                    client = Client()
+                    if user is not None:
+                        client.force_login(user)
+                    response, count, queries = self._capture(client, url)
+                    page = {
+                        "page": label, "url": url, "status": response.status_code,
+                        "query_count": count, "budget": QUERY_BUDGETS[label], "queries": [],
+                    }
+                    for alias, sql, params in queries:
+                        lines, scans = self._explain(alias, sql, params)
+                        page["queries"].append({
+                            "database": alias,
+                            "sql": sql,
+                            "plan": lines,
+                            "full_scans": scans,
+                        })
+                    results.append(page)
+        finally:
+            request_logger.setLevel(log_level)
+            if not options["keep"]:
+                owner.delete()
+                User.objects.filter(pk__in=[u.pk for u in students]).delete()
+
+        failures = [
+            (page["page"], query)
+            for page in results for query in page["queries"] if query["full_scans"]
+        ]
+        # A redirect or error page says nothing about the page's own queries
+        bad_status = [page for page in results if page["status"] != 200]
+        over_budget = [page for page in results if page["query_count"] > page["budget"]]
+        plans = "\n".join(
+            line for page in results for query in page["queries"] for line in query["plan"]
+        )
+        unused = [name for name in EXPECTED_INDEXES if name not in plans]
+
+        if options["json"]:
+            self.stdout.write(json.dumps({
+                "database": connection.vendor,
+                "pages": results,
+                "failures": len(failures),
+                "bad_status": [page["page"] for page in bad_status],
+                "over_budget": [page["page"] for page in over_budget],
+                "unused_indexes": unused,
+            }, indent=2))
+        else:
+            for page in results:
+                scans = sum(1 for q in page["queries"] if q["full_scans"])
+                self.stdout.write(
+                    f"{page['page']}: HTTP {page['status']}, {page['query_count']} queries "
+                    f"(budget {page['budget']}), {scans} full scans"
+                )
+                if options["plans"]:
+                    for query in page["queries"]:
+                        self.stdout.write(f"  {query['sql']}")
+                        for line in query["plan"]:
+                            self.stdout.write(f"    {line}")
+            for label, query in failures:
+                self.stderr.write(f"[{label}] full scan of {', '.join(query['full_scans'])}:")
+                self.stderr.write(f"  {query['sql']}")
+                for line in query["plan"]:
+                    self.stderr.write(f"    {line}")
+            for name in unused:
+                self.stderr.write(f"Index {name} is not used by any page.")
+            for page in bad_status:
+                self.stderr.write(f"[{page['page']}] answered HTTP {page['status']}, expected 200.")
+            for page in over_budget:
+                self.stderr.write(
+                    f"[{page['page']}] ran {page['query_count']} queries, budget {page['budget']}."
+                )
+
+        if failures or unused or bad_status or over_budget:
+            raise CommandError(
+                f"{len(failures)} hot queries scan a whole table, {len(unused)} expected indexes unused, "
+                f"{len(bad_status)} pages not HTTP 200, {len(over_budget)} pages over their query budget."
+            )
+        if not options["json"]:
+            self.stdout.write(self.style.SUCCESS(
+                "Every page answered 200 within its query budget, with no unexpected full "
+                "table scans, and every hot-path index is used."
+            ))
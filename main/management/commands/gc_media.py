@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+
+from main.models import StoredFile
+from main.utils import storage, uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount references to deduplicated uploads, remove blobs that no "
+        "row points at (e.g. files replaced on edit) and drop expired "
+        "chunked upload sessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report without changing anything.")
+
+    def handle(self, *args, **options):
+        updated, removed = storage.reconcile(dry_run=options["dry_run"])
+        if not options["dry_run"]:
+            expired = uploads.expire_sessions()
+            self.stdout.write(f"Dropped {expired} expired upload sessions.")
+        totals = StoredFile.objects.aggregate(blobs=Count("pk"), size=Sum("size"), refs=Sum("refcount"))
+        verb = "Would fix" if options["dry_run"] else "Fixed"
+        self.stdout.write(
+            f"{totals['blobs']} blobs, {totals['size'] or 0} bytes, {totals['refs'] or 0} references."
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {updated} refcounts and {'would remove' if options['dry_run'] else 'removed'} {removed} orphaned blobs."
+        ))
@@ -0,0 +1,344 @@
+import random
+import time
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from PIL import Image
+
+from main.models import (
+    Admission, AdmissionDocument, Course, CourseCategory, Enrollment, Institute,
+    InstituteBranding, OfferLetter, Profile, Student, StudentFeedback,
+)
+from main.utils import search, storage, typeahead
+from main.utils.counters import recount
+from main.utils.home_cache import invalidate_home_payload
+from main.utils.pricing import apply_discount_price
+
+
+CITIES = (
+    "Kathmandu", "Lalitpur", "Bhaktapur", "Pokhara", "Biratnagar", "Butwal",
+    "Dharan", "Chitwan", "Nepalgunj", "Hetauda", "Janakpur", "Birgunj",
+)
+NAME_WORDS = (
+    "Everest", "Himalayan", "Sagarmatha", "Global", "Bright", "Future", "Pioneer",
+    "Summit", "Lotus", "Crystal", "Apex", "Unique", "Smart", "Excel", "Prime",
+)
+KINDS = ("Academy", "Institute", "Training Center", "College", "Learning Hub")
+SUBJECTS = (
+    "Python Programming", "Data Science", "Web Development", "Accounting",
+    "IELTS Preparation", "Graphic Design", "Mathematics", "Physics", "Chemistry",
+    "Digital Marketing", "Mobile App Development", "Networking", "Cyber Security",
+    "Japanese Language", "Korean Language", "Spoken English", "Photography",
+    "Music", "Nursing Entrance", "Engineering Entrance",
+)
+LEVELS = ("Beginner", "Intermediate", "Advanced")
+CLASS_TYPES = ("online", "offline", "both")
+DURATIONS = ("1 month", "3 months", "6 months", "1 year")
+FIRST_NAMES = (
+    "Aarav", "Aayush", "Anjali", "Bibek", "Bipana", "Kritika", "Manish", "Nisha",
+    "Prakash", "Pooja", "Rohan", "Sabina", "Sagar", "Sita", "Suman", "Sunita",
+)
+LAST_NAMES = (
+    "Adhikari", "Bhandari", "Gautam", "Gurung", "Karki", "Khadka", "Magar",
+    "Poudel", "Rai", "Sharma", "Shrestha", "Tamang", "Thapa",
+)
+FEEDBACK = (
+    "The classes were well organised and the instructors were helpful.",
+    "Applying online was quick and I got my offer letter the same day.",
+    "Good course material, but I would like more practical sessions.",
+    "Finding a course near me was easy with the search.",
+)
+
+# Weights of admission statuses; most applications are still being handled
+STATUSES = (("pending", 50), ("shortlisted", 15), ("accepted", 25), ("rejected", 10))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset (institutes, categories, courses, "
+        "students, admissions, enrollments and feedback) with bulk_create for "
+        "load testing. Generated usernames and registration numbers start "
+        "with --prefix; --clear removes them again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--institutes", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=5, help="Categories per institute.")
+        parser.add_argument("--courses", type=int, default=50000)
+        parser.add_argument("--students", type=int, default=20000)
+        parser.add_argument("--admissions", type=int, default=1000000)
+        parser.add_argument("--feedback", type=int, default=100000)
+        parser.add_argument("--scale", type=float, default=1.0, help="Multiply every row count by this.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--prefix", default="load")
+        parser.add_argument("--clear", action="store_true", help="Remove the rows generated with --prefix.")
+
+    # -----------------------------------
+    # Helpers
+    # -----------------------------------
+    def _step(self, label, count, started):
+        done = f"{count} in " if count is not None else ""
+        self.stdout.write(f"{label}: {done}{time.perf_counter() - started:.1f}s")
+
+    def _bulk_create(self, model, objs, **kwargs):
+        """bulk_create an iterable in batches of --batch-size, one transaction each."""
+        batch, created = [], 0
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                created += self._flush(model, batch, **kwargs)
+                batch = []
+        if batch:
+            created += self._flush(model, batch, **kwargs)
+        return created
+
+    def _flush(self, model, batch, **kwargs):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=self.batch_size, **kwargs)
+        return len(batch)
+
+    def _image(self):
+        """One shared image for every generated file field; the storage keeps a single copy."""
+        out = BytesIO()
+        Image.new("RGB", (640, 400), (37, 99, 235)).save(out, format="JPEG", quality=70)
+        return storage.dedup_storage().save("load/placeholder.jpg", ContentFile(out.getvalue()))
+
+    # -----------------------------------
+    # Generate
+    # -----------------------------------
+    def _users(self, rng, prefix, owners, students):
+        password = make_password(None)
+
+        def users():
+            for kind, count in (("owner", owners), ("student", students)):
+                for i in range(count):
+                    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                    yield User(
+                        username=f"{prefix}_{kind}_{i}", first_name=first, last_name=last,
+                        email=f"{prefix}.{kind}.{i}@example.com", password=password,
+                    )
+
+        self._bulk_create(User, users())
+        rows = list(
+            User.objects.filter(username__startswith=f"{prefix}_").values_list("pk", "username", "first_name", "last_name")
+        )
+        # bulk_create skips the signals that give users their Student and Profile
+        self._bulk_create(Student, (Student(user_id=pk) for pk, *_ in rows))
+        self._bulk_create(Profile, (
+            Profile(user_id=pk, full_name=f"{first} {last}", phone=f"98{pk:08d}"[-10:])
+            for pk, _username, first, last in rows
+        ))
+        owner_ids = list(
+            Student.objects.filter(user__username__startswith=f"{prefix}_owner_")
+            .order_by("user_id").values_list("pk", flat=True)
+        )
+        # (user id, name) per generated student
+        students = [
+            (pk, f"{first} {last}")
+            for pk, username, first, last in rows if username.startswith(f"{prefix}_student_")
+        ]
+        return owner_ids, students
+
+    def _institutes(self, rng, prefix, owner_ids, image):
+        statuses = ["approved"] * 90 + ["pending"] * 7 + ["rejected"] * 3
+
+        def institutes():
+            for i, owner_id in enumerate(owner_ids):
+                city = rng.choice(CITIES)
+                yield Institute(
+                    owner_id=owner_id,
+                    name=f"{rng.choice(NAME_WORDS)} {rng.choice(KINDS)} {city}",
+                    description=f"Courses and entrance preparation in {city}.",
+                    estd=str(rng.randint(1990, 2024)), email=f"{prefix}.institute.{i}@example.com",
+                    phone=f"01{rng.randint(4000000, 5999999)}", address=city,
+                    profile_logo=image, background_image=image, register_image=image,
+                    register_number=f"{prefix}-{i}", status=rng.choice(statuses),
+                )
+
+        self._bulk_create(Institute, institutes())
+        return list(
+            Institute.objects.filter(register_number__startswith=f"{prefix}-").order_by("pk").values_list("pk", flat=True)
+        )
+
+    def _categories(self, rng, institute_ids, per_institute, image):
+        self._bulk_create(CourseCategory, (
+            CourseCategory(
+                institute_id=institute_id, title=subject, image=image,
+                description=f"{subject} courses for every level.",
+            )
+            for institute_id in institute_ids
+            for subject in rng.sample(SUBJECTS, min(per_institute, len(SUBJECTS)))
+        ))
+        return list(
+            CourseCategory.objects.filter(institute_id__in=institute_ids)
+            .order_by("pk").values_list("pk", "institute_id", "title")
+        )
+
+    def _courses(self, rng, categories, count, image):
+        def courses():
+            for i in range(count):
+                category_id, institute_id, title = categories[i % len(categories)]
+                level = rng.choice(LEVELS)
+                course = Course(
+                    institute_id=institute_id, category_id=category_id,
+                    title=f"{title} {level} {i // len(categories) + 1}",
+                    description=f"A {level.lower()} course in {title.lower()}.",
+                    image=image, duration=rng.choice(DURATIONS), level=level,
+                    class_type=rng.choice(CLASS_TYPES), seats=rng.randint(20, 200),
+                    original_price=Decimal(rng.randrange(2000, 60000, 500)),
+                    discount_percent=rng.choice((0, 0, 0, 10, 15, 25)),
+                )
+                # Course.save() is skipped by bulk_create
+                yield apply_discount_price(course)
+
+        self._bulk_create(Course, courses())
+        institute_ids = {institute_id for _c, institute_id, _t in categories}
+        return list(
+            Course.objects.filter(institute_id__in=institute_ids)
+            .order_by("pk").values_list("pk", "category_id", "institute_id", "discount_price")
+        )
+
+    def _admissions(self, rng, prefix, students, courses, count):
+        statuses = [status for status, weight in STATUSES for _ in range(weight)]
+
+        def admissions():
+            for _ in range(count):
+                user_id, name = rng.choice(students)
+                course_id, category_id, institute_id, price = rng.choice(courses)
+                status = rng.choice(statuses)
+                yield Admission(
+                    user_id=user_id, student_name=name, email=f"student{user_id}@example.com",
+                    phone=f"98{user_id:08d}"[-10:], gender=rng.choice(("male", "female")),
+                    institute_id=institute_id, category_id=category_id, course_id=course_id,
+                    status=status, amount=price,
+                    is_paid=status == "accepted" and rng.random() < 0.8,
+                )
+
+        created = self._bulk_create(Admission, admissions())
+        # One enrollment per accepted (student, course)
+        accepted = (
+            Admission.objects.filter(user__username__startswith=f"{prefix}_student_", status="accepted")
+            .values_list("user__student_profile", "course_id", "institute_id").distinct()
+        )
+        enrolled = self._bulk_create(Enrollment, (
+            Enrollment(student_id=student_id, course_id=course_id, institute_id=institute_id)
+            for student_id, course_id, institute_id in accepted.iterator()
+        ), ignore_conflicts=True)
+        return created, enrolled
+
+    def _feedback(self, rng, students, count):
+        return self._bulk_create(StudentFeedback, (
+            StudentFeedback(student_id=rng.choice(students)[0], feedback_text=rng.choice(FEEDBACK))
+            for _ in range(count)
+        ))
+
+    def _finish(self):
+        # Rows made by bulk_create bypass the counter, search and cache signals
+        with transaction.atomic():
+            recount(Course, Institute, Admission, Enrollment)
+        if search.is_supported():
+            with transaction.atomic():
+                search.rebuild_index()
+        storage.reconcile()
+        invalidate_home_payload()
+        typeahead.invalidate()
+
+    # -----------------------------------
+    # Clear
+    # -----------------------------------
+    def _delete_rows(self, queryset):
+        """DELETE the rows of ``queryset`` in one statement, without loading them or sending signals."""
+        model = queryset.model
+        qn = connection.ops.quote_name
+        sql, params = queryset.values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {qn(model._meta.db_table)} WHERE {qn(model._meta.pk.column)} IN ({sql})",
+                params,
+            )
+            return cursor.rowcount
+
+    def _clear(self, prefix):
+        users = User.objects.filter(username__startswith=f"{prefix}_")
+        institutes = Institute.objects.filter(register_number__startswith=f"{prefix}-")
+        started = time.perf_counter()
+        # Offer letters own files, so they go through the ORM
+        OfferLetter.objects.filter(admission__user__in=users).delete()
+        with transaction.atomic():
+            counts = {
+                "admission documents": self._delete_rows(AdmissionDocument.objects.filter(admission__user__in=users)),
+                "enrollments": self._delete_rows(Enrollment.objects.filter(student__user__in=users)),
+                "admissions": self._delete_rows(Admission.objects.filter(user__in=users)),
+                "feedback": self._delete_rows(StudentFeedback.objects.filter(student__in=users)),
+                "courses": self._delete_rows(Course.objects.filter(institute__in=institutes)),
+                "categories": self._delete_rows(CourseCategory.objects.filter(institute__in=institutes)),
+                "brandings": self._delete_rows(InstituteBranding.objects.filter(institute__in=institutes)),
+                "institutes": self._delete_rows(institutes),
+                "profiles": self._delete_rows(Profile.objects.filter(user__in=users)),
+                "students": self._delete_rows(Student.objects.filter(user__in=users)),
+            }
+        counts["users"], _ = users.delete()
+        self._finish()
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count} removed")
+        self._step("clear", sum(counts.values()), started)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if options["clear"]:
+            self._clear(prefix)
+            return
+
+        scale = options["scale"]
+        counts = {
+            key: max(1, int(options[key] * scale))
+            for key in ("institutes", "courses", "students", "admissions", "feedback")
+        }
+        if scale <= 0 or options["categories"] < 1 or options["batch_size"] < 1:
+            raise CommandError("scale, categories and batch-size must be positive.")
+        if User.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(f"Rows with prefix '{prefix}' exist; run with --clear first or pick another --prefix.")
+
+        self.batch_size = options["batch_size"]
+        rng = random.Random(options["seed"])
+        total = time.perf_counter()
+
+        started = time.perf_counter()
+        image = self._image()
+        owner_ids, students = self._users(rng, prefix, counts["institutes"], counts["students"])
+        self._step("users", len(owner_ids) + len(students), started)
+
+        started = time.perf_counter()
+        institute_ids = self._institutes(rng, prefix, owner_ids, image)
+        self._step("institutes", len(institute_ids), started)
+
+        started = time.perf_counter()
+        categories = self._categories(rng, institute_ids, options["categories"], image)
+        self._step("categories", len(categories), started)
+
+        started = time.perf_counter()
+        courses = self._courses(rng, categories, counts["courses"], image)
+        self._step("courses", len(courses), started)
+
+        started = time.perf_counter()
+        admissions, enrollments = self._admissions(rng, prefix, students, courses, counts["admissions"])
+        self._step("admissions", admissions, started)
+        self.stdout.write(f"enrollments: {enrollments}")
+
+        started = time.perf_counter()
+        self._step("feedback", self._feedback(rng, students, counts["feedback"]), started)
+
+        started = time.perf_counter()
+        # Also sets the shared image's refcount from the rows using it
+        self._finish()
+        self._step("counters, search index and caches", None, started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated the '{prefix}' dataset in {time.perf_counter() - total:.1f}s."
+        ))
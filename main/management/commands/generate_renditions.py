@@ -0,0 +1,44 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from main.utils import images
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued image renditions. Images that were never queued are "
+        "queued first, so this also backfills older uploads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenerate existing renditions too.")
+        parser.add_argument("--once", action="store_true", help="Process the queue once and exit.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls.")
+
+    def _backfill(self, force):
+        names = []
+        for label, fields in images.RENDITION_FIELDS.items():
+            model = apps.get_model(label)
+            for instance in model.objects.only("pk", *fields).iterator():
+                names.extend(images.sources_for(instance))
+        if not force:
+            tracked = set(images.ImageRendition.objects.values_list("source", flat=True))
+            names = [name for name in names if name not in tracked]
+        return images.enqueue(names, force=force)
+
+    def handle(self, *args, **options):
+        queued = self._backfill(options["force"])
+        if queued:
+            self.stdout.write(f"Queued {len(queued)} images.")
+
+        while True:
+            results = images.run_pending()
+            ready = sum(1 for status in results.values() if status == images.READY)
+            failed = sum(1 for status in results.values() if status == images.FAILED)
+            if results:
+                self.stdout.write(self.style.SUCCESS(f"Generated renditions for {ready} images ({failed} failed)."))
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
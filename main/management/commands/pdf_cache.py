@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from main.utils import pdf_cache
+
+
+class Command(BaseCommand):
+    help = "Report the rendered-PDF cache hit rate and size, or clear/trim it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="Delete every cached PDF and reset the counters.")
+        parser.add_argument("--evict", action="store_true", help="Trim the cache to PDF_CACHE_MAX_BYTES now.")
+        parser.add_argument("--json", action="store_true", help="Print the stats as JSON.")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            self.stdout.write(f"Removed {pdf_cache.clear()} cached PDFs.")
+        elif options["evict"]:
+            self.stdout.write(f"Evicted {pdf_cache.evict()} cached PDFs.")
+
+        stats = pdf_cache.stats()
+        if options["json"]:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+        hit_rate = "n/a" if stats["hit_rate"] is None else f"{stats['hit_rate']:.1%}"
+        self.stdout.write(
+            f"hits: {stats['hits']}  misses: {stats['misses']}  hit rate: {hit_rate}\n"
+            f"entries: {stats['entries']}  size: {stats['bytes']} / {stats['max_bytes']} bytes"
+        )
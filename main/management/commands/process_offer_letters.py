@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.models import Admission
+from main.utils import offer_letters
+
+
+class Command(BaseCommand):
+    help = (
+        "Render queued offer letter PDFs. Runs until stopped unless --once is "
+        "given; safe to run next to the in-process workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls.")
+        parser.add_argument(
+            "--backfill", action="store_true",
+            help="Queue letters for accepted admissions that have none yet.",
+        )
+
+    def handle(self, *args, **options):
+        if options["backfill"]:
+            missing = Admission.objects.filter(status="accepted", offer_letter__isnull=True)
+            queued = offer_letters.enqueue(missing.values_list("pk", flat=True))
+            self.stdout.write(f"Queued {queued} offer letters.")
+
+        while True:
+            done = offer_letters.run_pending()
+            if done:
+                summary = ", ".join(f"{count} {status}" for status, count in sorted(done.items()))
+                self.stdout.write(f"Processed offer letters: {summary}")
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS("Offer letter queue drained."))
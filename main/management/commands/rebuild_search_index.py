@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from main.utils.search import is_supported, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for courses, categories and institutes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            self.stdout.write(self.style.WARNING(
+                f"No search index for the '{connection.vendor}' backend; search uses icontains lookups."
+            ))
+            return
+
+        with transaction.atomic():
+            counts = rebuild_index(batch_size=options["batch_size"])
+
+        for kind, count in counts.items():
+            self.stdout.write(f"{kind}: {count} indexed")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
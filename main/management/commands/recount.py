@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.models import Admission, Course, Enrollment, Institute
+from main.utils.counters import recount
+
+
+class Command(BaseCommand):
+    help = "Recompute the enrollment/admission counters on courses and institutes."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recount(Course, Institute, Admission, Enrollment)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recounted {updated['courses']} courses and {updated['institutes']} institutes."
+            )
+        )
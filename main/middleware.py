@@ -0,0 +1,36 @@
+from django.utils.functional import SimpleLazyObject
+
+from main import routers
+from main.utils.current_institute import current_institute
+
+
+class CurrentInstituteMiddleware:
+    """Attach a lazy ``request.institute``; nothing is looked up until it is used."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.institute = SimpleLazyObject(lambda: current_institute(request))
+        return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """Let GET/HEAD requests to @replica_reads views read from the replica (see routers.py)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = routers.begin_request()
+        try:
+            # Template responses render inside this call, so their queries
+            # are routed too
+            return self.get_response(request)
+        finally:
+            routers.end_request(tokens)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ("GET", "HEAD") and routers.wants_replica(view_func):
+            routers.use_replica()
+        return None
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def backfill_discount_price(apps, schema_editor):
+    from main.utils.pricing import discount_price_expression
+
+    Course = apps.get_model('main', 'Course')
+    # Rows written by fixtures or raw imports may have a stale or missing price
+    Course.objects.update(discount_price=discount_price_expression())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_discount_price, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from main.utils.search import create_index_table, fill_index, is_supported
+
+    conn = schema_editor.connection
+    if not is_supported(conn):
+        return
+    create_index_table(conn)
+    # Index the rows that already exist, so search works right after deploy
+    fill_index(conn, {
+        "course": apps.get_model("main", "Course"),
+        "category": apps.get_model("main", "CourseCategory"),
+        "institute": apps.get_model("main", "Institute"),
+    })
+
+
+def drop_search_index(apps, schema_editor):
+    from main.utils.search import drop_index_table
+
+    drop_index_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_backfill_discount_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:14
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_enrollments(apps, schema_editor):
+    from main.utils.counters import recount
+
+    Enrollment = apps.get_model('main', 'Enrollment')
+    duplicates = (
+        Enrollment.objects.filter(course__isnull=False)
+        .values('student', 'course')
+        .annotate(n=Count('id'), keep=Min('id'))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        Enrollment.objects.filter(
+            student=row['student'], course=row['course']
+        ).exclude(id=row['keep']).delete()
+
+    recount(
+        apps.get_model('main', 'Course'),
+        apps.get_model('main', 'Institute'),
+        apps.get_model('main', 'Admission'),
+        Enrollment,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_denormalized_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_enrollments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='enrollment',
+            constraint=models.UniqueConstraint(fields=('student', 'course'), name='unique_enrollment_per_course'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:20
+
+import django.db.models.deletion
+import django.utils.timezone
+import main.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_unique_enrollment_per_course'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferLetter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('ready', 'Ready'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('file', models.FileField(blank=True, null=True, upload_to=main.models.offer_letter_path)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('admission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='offer_letter', to='main.admission')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='offer_letter_queue_idx')],
+            },
+        ),
+    ]
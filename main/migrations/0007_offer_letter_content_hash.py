@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_offer_letters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offerletter',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_offer_letter_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstituteBranding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature_base64', models.TextField(blank=True)),
+                ('stamp_base64', models.TextField(blank=True)),
+                ('logo_base64', models.TextField(blank=True)),
+                ('sources', models.JSONField(default=dict)),
+                ('digest', models.CharField(blank=True, max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('institute', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='branding', to='main.institute')),
+            ],
+        ),
+    ]
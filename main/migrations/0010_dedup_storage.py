@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:37
+
+import main.utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='admissiondocument',
+            name='file',
+            field=models.FileField(storage=main.utils.storage.dedup_storage, upload_to='admission_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='image',
+            field=models.ImageField(storage=main.utils.storage.dedup_storage, upload_to='course/images/'),
+        ),
+        migrations.AlterField(
+            model_name='coursecategory',
+            name='image',
+            field=models.ImageField(storage=main.utils.storage.dedup_storage, upload_to='category/images/'),
+        ),
+        migrations.AlterField(
+            model_name='institute',
+            name='background_image',
+            field=models.ImageField(storage=main.utils.storage.dedup_storage, upload_to='institute/background/'),
+        ),
+        migrations.AlterField(
+            model_name='institute',
+            name='profile_logo',
+            field=models.ImageField(storage=main.utils.storage.dedup_storage, upload_to='institute/logo/'),
+        ),
+        migrations.AlterField(
+            model_name='institute',
+            name='register_image',
+            field=models.ImageField(storage=main.utils.storage.dedup_storage, upload_to='institute/register_docs/'),
+        ),
+        migrations.AlterField(
+            model_name='institute',
+            name='signature',
+            field=models.ImageField(blank=True, null=True, storage=main.utils.storage.dedup_storage, upload_to='institute/signature/'),
+        ),
+        migrations.AlterField(
+            model_name='institute',
+            name='stamp',
+            field=models.ImageField(blank=True, null=True, storage=main.utils.storage.dedup_storage, upload_to='institute/stamp/'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, storage=main.utils.storage.dedup_storage, upload_to='avatars/'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_upload_sessions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='admission',
+            index=models.Index(fields=['user', 'course', 'status'], name='admission_user_course_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='admission',
+            index=models.Index(condition=models.Q(('course__isnull', False)), fields=['institute', 'course'], name='admission_institute_course_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['category', '-id'], name='course_category_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursecategory',
+            index=models.Index(fields=['title'], name='coursecategory_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='institute',
+            index=models.Index(fields=['owner', 'status'], name='institute_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentfeedback',
+            index=models.Index(fields=['-created_at'], name='feedback_created_idx'),
+        ),
+    ]
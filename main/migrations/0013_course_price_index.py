@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['discount_price', 'id'], name='course_price_idx'),
+        ),
+    ]
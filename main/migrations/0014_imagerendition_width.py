@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_course_price_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagerendition',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
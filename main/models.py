@@ -1,11 +1,21 @@
 from django.db import models
 
 # Create your models here.
-from django.db import models
+import uuid
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from .utils.counters import save_kwargs_without_counters
+from .utils.pricing import (
+    PRICE_FIELDS, apply_discount_price, discount_price_expression,
+    final_price_expression,
+)
+from .utils.storage import dedup_storage
+
 # -----------------------------
 # 1) Student Model
 # -----------------------------
@@ -21,7 +31,7 @@ class Student(models.Model):
 # -----------------------------
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    avatar = models.ImageField(upload_to='avatars/', blank=True, null=True, )
+    avatar = models.ImageField(upload_to='avatars/', storage=dedup_storage, blank=True, null=True, )
     full_name = models.CharField(max_length=150)
     date_of_birth = models.DateField(blank=True, null=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
@@ -49,20 +59,52 @@ class Institute(models.Model):
     phone = models.CharField(max_length=20)
     website = models.URLField(blank=True, null=True)
     address = models.CharField(max_length=255, blank=True)
-    profile_logo = models.ImageField(upload_to='institute/logo/')
-    background_image = models.ImageField(upload_to='institute/background/')
-    signature = models.ImageField(upload_to='institute/signature/', blank=True, null=True)
-    stamp = models.ImageField(upload_to='institute/stamp/', blank=True, null=True)
+    profile_logo = models.ImageField(upload_to='institute/logo/', storage=dedup_storage)
+    background_image = models.ImageField(upload_to='institute/background/', storage=dedup_storage)
+    signature = models.ImageField(upload_to='institute/signature/', storage=dedup_storage, blank=True, null=True)
+    stamp = models.ImageField(upload_to='institute/stamp/', storage=dedup_storage, blank=True, null=True)
     register_number = models.CharField(max_length=100)
-    register_image = models.ImageField(upload_to='institute/register_docs/')
+    register_image = models.ImageField(upload_to='institute/register_docs/', storage=dedup_storage)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     admin_message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Current institute lookup: owner's approved institute
+            models.Index(fields=["owner", "status"], name="institute_owner_status_idx"),
+        ]
+
+    # Denormalised counters, maintained by main/utils/counters.py
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    shortlisted_count = models.PositiveIntegerField(default=0, editable=False)
+    accepted_count = models.PositiveIntegerField(default=0, editable=False)
+    rejected_count = models.PositiveIntegerField(default=0, editable=False)
+    paid_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **save_kwargs_without_counters(self, kwargs))
+
     def __str__(self):
         return self.name
 
 
+class InstituteBranding(models.Model):
+    """Offer letter images, pre-resized and base64-encoded by main/utils/branding.py."""
+    institute = models.OneToOneField(Institute, on_delete=models.CASCADE, related_name="branding")
+    signature_base64 = models.TextField(blank=True)
+    stamp_base64 = models.TextField(blank=True)
+    logo_base64 = models.TextField(blank=True)
+    # image field name -> stored file name each asset was built from
+    sources = models.JSONField(default=dict)
+    digest = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Branding for {self.institute_id}"
+
+
 # -----------------------------
 # 4) CourseCategory Model
 # -----------------------------
@@ -70,7 +112,13 @@ class CourseCategory(models.Model):
     institute = models.ForeignKey(Institute, on_delete=models.CASCADE, related_name="categories")
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
-    image = models.ImageField(upload_to='category/images/')
+    image = models.ImageField(upload_to='category/images/', storage=dedup_storage)
+
+    class Meta:
+        indexes = [
+            # Catalog category filter and facets, both by title
+            models.Index(fields=["title"], name="coursecategory_title_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.institute.name}"
@@ -79,12 +127,52 @@ class CourseCategory(models.Model):
 # -----------------------------
 # 5) Course Model
 # -----------------------------
+class CourseQuerySet(models.QuerySet):
+    """Keeps ``discount_price`` current on bulk write paths that skip save()."""
+
+    def update(self, **kwargs):
+        if "discount_price" not in kwargs and any(f in kwargs for f in PRICE_FIELDS):
+            kwargs["discount_price"] = discount_price_expression(
+                kwargs.get("original_price"), kwargs.get("discount_percent")
+            )
+        return super().update(**kwargs)
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            apply_discount_price(obj)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        if any(f in fields for f in PRICE_FIELDS):
+            for obj in objs:
+                apply_discount_price(obj)
+            if "discount_price" not in fields:
+                fields.append("discount_price")
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def with_final_price(self):
+        return self.annotate(final_price=final_price_expression())
+
+    def final_price_between(self, min_price=None, max_price=None):
+        qs = self.with_final_price()
+        if min_price is not None:
+            qs = qs.filter(final_price__gte=min_price)
+        if max_price is not None:
+            qs = qs.filter(final_price__lte=max_price)
+        return qs
+
+
 class Course(models.Model):
     institute = models.ForeignKey(Institute, on_delete=models.CASCADE, related_name="courses")
     category = models.ForeignKey(CourseCategory, on_delete=models.CASCADE, related_name="courses")
     title = models.CharField(max_length=200)
     description = models.TextField()
-    image = models.ImageField(upload_to='course/images/')
+    image = models.ImageField(upload_to='course/images/', storage=dedup_storage)
     duration = models.CharField(max_length=100)
     level = models.CharField(
         max_length=50,
@@ -99,13 +187,30 @@ class Course(models.Model):
     discount_percent = models.PositiveIntegerField(default=0)
     discount_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
 
+    # Denormalised counters, maintained by main/utils/counters.py
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    shortlisted_count = models.PositiveIntegerField(default=0, editable=False)
+    accepted_count = models.PositiveIntegerField(default=0, editable=False)
+    rejected_count = models.PositiveIntegerField(default=0, editable=False)
+    paid_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Course lists per category, newest first
+            models.Index(fields=["category", "-id"], name="course_category_id_idx"),
+            # Catalog price sorts and price range filters (utils/catalog.py)
+            models.Index(fields=["discount_price", "id"], name="course_price_idx"),
+        ]
+
     def save(self, *args, **kwargs):
-        if self.discount_percent > 0:
-            discount_amount = (self.original_price * self.discount_percent) / 100
-            self.discount_price = self.original_price - discount_amount
-        else:
-            self.discount_price = self.original_price
-        super().save(*args, **kwargs)
+        apply_discount_price(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and any(f in update_fields for f in PRICE_FIELDS):
+            kwargs["update_fields"] = set(update_fields) | {"discount_price"}
+        super().save(*args, **save_kwargs_without_counters(self, kwargs))
 
     def __str__(self):
         return f"{self.title} ({self.institute.name})"
@@ -152,6 +257,23 @@ class Admission(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Duplicate-application check and the student's admission list
+            models.Index(fields=["user", "course", "status"], name="admission_user_course_idx"),
+            # Institute dashboard: admissions that still have a course
+            models.Index(
+                fields=["institute", "course"], name="admission_institute_course_idx",
+                condition=models.Q(course__isnull=False),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The counter signals read the stored row (locked) before writing;
+        # keep that read and the write in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.student_name} - {self.course.title}"
 
@@ -163,7 +285,7 @@ class AdmissionDocument(models.Model):
     admission = models.ForeignKey(
         Admission, on_delete=models.CASCADE, related_name="documents"
     )
-    file = models.FileField(upload_to="admission_docs/")
+    file = models.FileField(upload_to="admission_docs/", storage=dedup_storage)
     doc_type = models.CharField(
         max_length=50,
         choices=[('photo', 'Photo'), ('marksheet', 'Marksheet'), ('id_card', 'ID Card'), ('other', 'Other')]
@@ -185,31 +307,14 @@ class Enrollment(models.Model):
     institute = models.ForeignKey(Institute, on_delete=models.CASCADE)
     enrolled_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["student", "course"], name="unique_enrollment_per_course"),
+        ]
+
     def __str__(self):
         return f"{self.student} - {self.course}"
 
-# -----------------------------------
-# Signal to auto-create Enrollment when Admission is accepted
-# -----------------------------------
-@receiver(post_save, sender=Admission)
-def create_enrollment_on_approval(sender, instance, created, **kwargs):
-    if not instance.user:
-        return
-    if not hasattr(instance.user, "student_profile"):
-        return
-    if instance.status == "accepted":
-        student = instance.user.student_profile
-        course = instance.course
-        institute = instance.institute
-        if not Enrollment.objects.filter(student=student, course=course).exists():
-            Enrollment.objects.create(
-                student=student,
-                course=course,
-                institute=institute
-            )
-
-
-
 # -----------------------------
 # 8) StudentFeedback Model
 # -----------------------------
@@ -218,12 +323,127 @@ class StudentFeedback(models.Model):
     feedback_text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Latest feedback on the home page
+            models.Index(fields=["-created_at"], name="feedback_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.student.username} Feedback"
 
 
 # -----------------------------
-# 9) Signals to auto-create Profile
+# 9) OfferLetter Model
+# -----------------------------
+def offer_letter_path(instance, filename):
+    return f"offer_letters/Offer_Letter_{instance.admission_id}.pdf"
+
+
+class OfferLetter(models.Model):
+    """Pre-generated offer letter PDF, queued by main/utils/offer_letters.py."""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
+    admission = models.OneToOneField(Admission, on_delete=models.CASCADE, related_name="offer_letter")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    file = models.FileField(upload_to=offer_letter_path, blank=True, null=True)
+    content_hash = models.CharField(max_length=64, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="offer_letter_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"Offer letter #{self.admission_id} ({self.status})"
+
+
+# -----------------------------
+# 10) ImageRendition Model
+# -----------------------------
+class ImageRendition(models.Model):
+    """Processing state of an uploaded image's renditions (main/utils/images.py)."""
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
+    source = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Width of the original, which decides the rendition widths
+    width = models.PositiveIntegerField(blank=True, null=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="image_rendition_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
+
+
+# -----------------------------
+# 11) StoredFile Model
+# -----------------------------
+class StoredFile(models.Model):
+    """One deduplicated upload and its reference count (main/utils/storage.py)."""
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
+
+
+# -----------------------------
+# 12) UploadSession Model
+# -----------------------------
+class UploadSession(models.Model):
+    """A chunked, resumable document upload (main/utils/uploads.py)."""
+    STATUS_CHOICES = [
+        ("open", "Open"),
+        ("complete", "Complete"),
+        ("attached", "Attached"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    doc_type = models.CharField(max_length=50)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="open")
+    document = models.ForeignKey(
+        AdmissionDocument, on_delete=models.SET_NULL, blank=True, null=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+# -----------------------------
+# 13) Signals to auto-create Profile
 # -----------------------------
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -0,0 +1,92 @@
+import contextvars
+from contextlib import contextmanager
+
+
+# Primary/replica routing. Writes always go to the primary ("default").
+# Reads go to the "replica" alias only inside views marked @replica_reads
+# (the public catalog, search and detail pages) on GET/HEAD, and only until
+# the request writes something, after which it reads its own writes from
+# the primary. Admissions, payments, enrollments and the job queues, plus
+# auth and session data, are always read from the primary so they are
+# never behind. Background workers and management commands never touch
+# the replica. Anything a replica view builds for a shared cache reads from
+# the primary too (primary_reads), since the entry would outlive the lag.
+
+PRIMARY = "default"
+REPLICA = "replica"
+
+PRIMARY_APPS = {"auth", "sessions", "admin", "account", "socialaccount", "social_django"}
+PRIMARY_MODELS = {
+    "main.admission",
+    "main.admissiondocument",
+    "main.enrollment",
+    "main.offerletter",
+    "main.uploadsession",
+    "main.storedfile",
+    "main.imagerendition",
+}
+
+_use_replica = contextvars.ContextVar("use_replica", default=False)
+_pinned = contextvars.ContextVar("primary_pinned", default=False)
+
+
+def replica_reads(view):
+    """Mark a view (function or class-based) whose reads may come from the replica."""
+    view.replica_reads = True
+    return view
+
+
+def wants_replica(view_func):
+    view_class = getattr(view_func, "view_class", None)
+    return getattr(view_func, "replica_reads", False) or getattr(view_class, "replica_reads", False)
+
+
+def begin_request():
+    """Reset routing for a new request; returns tokens for end_request()."""
+    return _use_replica.set(False), _pinned.set(False)
+
+
+def end_request(tokens):
+    use_replica, pinned = tokens
+    _use_replica.reset(use_replica)
+    _pinned.reset(pinned)
+
+
+def use_replica():
+    _use_replica.set(True)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, e.g. while filling a shared cache."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _primary_only(model):
+    return model._meta.app_label in PRIMARY_APPS or model._meta.label_lower in PRIMARY_MODELS
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and not _pinned.get() and not _primary_only(model):
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        # Read-your-writes for the rest of the request
+        _pinned.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica follows the primary through replication
+        return db == PRIMARY
@@ -1,11 +1,26 @@
 # students/signals.py
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.db import transaction
-from .models import Admission, Enrollment, Student, Profile, Course
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import (
+    Admission, AdmissionDocument, Enrollment, Student, Profile, Course,
+    CourseCategory, Institute, OfferLetter, StudentFeedback
+)
+from .utils.home_cache import invalidate_home_payload
+from .utils.pricing import apply_discount_price
+from .utils import (
+    branding, current_institute, images, search, sqlite_tuning, storage, typeahead,
+    verification,
+)
+from .utils.institute_cache import bump_detail_version
+from .utils.counters import (
+    ENROLLED_COUNTER, admission_state, apply_admission_deltas,
+    apply_counter_deltas, stored_admission_state,
+)
 from django.contrib.auth.models import User
 from allauth.account.signals import user_signed_up
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_delete, pre_save
 
 
 
@@ -29,37 +44,212 @@ def create_student_on_google_login(request, user, **kwargs):
 
 
 # ----------------------------
-# Admission accepted → Enrollment + seat decrement
+# Admission state before save (for the counters below). Accepting an
+# admission, with its enrollment and seat, goes through
+# utils/reservations.py instead of a signal.
 # ----------------------------
 @receiver(pre_save, sender=Admission)
-def handle_admission_accept(sender, instance, **kwargs):
-    if not instance.pk:
+@receiver(pre_delete, sender=Admission)
+def remember_admission_state(sender, instance, raw=False, **kwargs):
+    # The stored row, not the instance: a stale copy (loaded before another
+    # request changed it) would count the same transition twice
+    if raw or instance._state.adding:
+        instance._counter_state = None
+    else:
+        instance._counter_state = stored_admission_state(Admission, instance.pk)
+
+
+# ----------------------------
+# Denormalised counters on Course / Institute
+# ----------------------------
+@receiver(post_save, sender=Admission)
+def update_admission_counters(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    before = None if created else getattr(instance, "_counter_state", None)
+    after = admission_state(instance)
+    if before is not None and update_fields is not None:
+        # Fields left out of the save keep their stored values
+        after = {
+            name: value if name in update_fields or name.removesuffix("_id") in update_fields else before[name]
+            for name, value in after.items()
+        }
+    apply_admission_deltas(Course, Institute, before, after)
+
+
+@receiver(post_delete, sender=Admission)
+def release_admission_counters(sender, instance, **kwargs):
+    # None when another request deleted the row first
+    apply_admission_deltas(Course, Institute, getattr(instance, "_counter_state", None), None)
+
+
+@receiver(post_save, sender=Enrollment)
+def increment_enrolled_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        apply_counter_deltas(Course, instance.course_id, {ENROLLED_COUNTER: 1})
+        apply_counter_deltas(Institute, instance.institute_id, {ENROLLED_COUNTER: 1})
+
+
+@receiver(post_delete, sender=Enrollment)
+def decrement_enrolled_count(sender, instance, **kwargs):
+    apply_counter_deltas(Course, instance.course_id, {ENROLLED_COUNTER: -1})
+    apply_counter_deltas(Institute, instance.institute_id, {ENROLLED_COUNTER: -1})
+
+
+# ----------------------------
+# Fixture loads bypass Course.save(); keep discount_price current
+# ----------------------------
+@receiver(pre_save, sender=Course)
+def apply_course_discount_price(sender, instance, raw=False, **kwargs):
+    if raw:
+        apply_discount_price(instance)
+
+
+# ----------------------------
+# Home page payload invalidation
+# ----------------------------
+for _model in (Course, CourseCategory, Institute, StudentFeedback, Profile):
+    post_save.connect(invalidate_home_payload, sender=_model, dispatch_uid=f"home_cache_save_{_model.__name__}")
+    post_delete.connect(invalidate_home_payload, sender=_model, dispatch_uid=f"home_cache_delete_{_model.__name__}")
+
+
+# ----------------------------
+# Search index maintenance
+# ----------------------------
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=CourseCategory)
+@receiver(post_save, sender=Institute)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        # Fixture loads: related rows may not exist yet, so run
+        # rebuild_search_index once the load is done
+        return
+    search.index_object(instance)
+    typeahead.invalidate()
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=CourseCategory)
+@receiver(post_delete, sender=Institute)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_object(instance)
+    typeahead.invalidate()
+
+
+# ----------------------------
+# Offer letter branding assets
+# ----------------------------
+@receiver(post_save, sender=Institute)
+def refresh_institute_branding(sender, instance, raw=False, **kwargs):
+    if raw:
         return
+    branding.refresh_on_save(instance)
+
 
-    previous = Admission.objects.get(pk=instance.pk)
+# ----------------------------
+# Current institute cache
+# ----------------------------
+@receiver(post_save, sender=Institute)
+@receiver(post_delete, sender=Institute)
+def invalidate_current_institute(sender, instance, **kwargs):
+    user_id = Student.objects.filter(pk=instance.owner_id).values_list("user_id", flat=True).first()
+    if user_id is not None:
+        current_institute.invalidate(user_id)
 
-    if previous.status == "accepted" or instance.status != "accepted":
+
+# ----------------------------
+# Image renditions
+# ----------------------------
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Institute)
+@receiver(post_save, sender=CourseCategory)
+@receiver(post_save, sender=Course)
+def create_image_renditions(sender, instance, raw=False, **kwargs):
+    if raw:
         return
+    images.queue_instance(instance)
+
 
-    # Student check
-    if not instance.user or not hasattr(instance.user, "student_profile"):
+# ----------------------------
+# QR verification records
+# ----------------------------
+@receiver(post_save, sender=Admission)
+@receiver(post_delete, sender=Admission)
+def invalidate_verification_record(sender, instance, **kwargs):
+    verification.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Institute)
+def invalidate_verification_records(sender, instance, raw=False, **kwargs):
+    if raw:
         return
+    verification.bump("course" if sender is Course else "institute", instance.pk)
+
 
-    course = instance.course
-    if not course:
+# ----------------------------
+# Institute detail fragment invalidation
+# ----------------------------
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=CourseCategory)
+@receiver(post_delete, sender=CourseCategory)
+def invalidate_institute_detail(sender, instance, **kwargs):
+    bump_detail_version(instance.institute_id)
+
+
+# ----------------------------
+# Uploaded file cleanup
+# ----------------------------
+# Cascades fire these too, so deleting an admission or a category releases
+# the files of its documents and courses.
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=Institute)
+@receiver(post_delete, sender=CourseCategory)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=AdmissionDocument)
+def release_uploaded_files(sender, instance, **kwargs):
+    storage.delete_files(instance)
+
+
+# A save that replaces or clears a file releases the old one once the row
+# is written, so its refcount doesn't leak
+@receiver(pre_save, sender=Profile)
+@receiver(pre_save, sender=Institute)
+@receiver(pre_save, sender=CourseCategory)
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=AdmissionDocument)
+def remember_replaced_files(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
         return
+    instance._replaced_files = storage.replaced_files(instance, update_fields)
 
-    with transaction.atomic():
-        course_locked = Course.objects.select_for_update().get(id=course.id)
 
-        # Create enrollment
-        Enrollment.objects.create(
-            student=instance.user.student_profile,
-            course=course_locked,
-            institute=instance.institute
-        )
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Institute)
+@receiver(post_save, sender=CourseCategory)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=AdmissionDocument)
+def release_replaced_files(sender, instance, raw=False, **kwargs):
+    names = getattr(instance, "_replaced_files", None)
+    if names:
+        instance._replaced_files = []
+        storage.release(names)
+
+
+@receiver(post_delete, sender=OfferLetter)
+def delete_offer_letter_file(sender, instance, **kwargs):
+    if instance.file:
+        name, file_storage = instance.file.name, instance.file.storage
+        transaction.on_commit(lambda: file_storage.delete(name))
 
-        # Decrease seat
-        if course_locked.seats > 0:
-            course_locked.seats -= 1
-            course_locked.save()
+
+# ----------------------------
+# SQLite connection profile (WAL, busy timeout, ...)
+# ----------------------------
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    sqlite_tuning.apply_pragmas(connection)
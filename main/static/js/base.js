@@ -5,36 +5,94 @@ document.addEventListener('DOMContentLoaded', function() {
     const searchInput = document.getElementById('search-input');
     const searchResults = document.getElementById('search-results');
 
-    searchInput.addEventListener('keyup', function() {
-        const query = this.value.trim();
-        console.log('Searching for:', query); // Debug
-        
-        if(query.length === 0) {
-            searchResults.style.display = 'none';
-            searchResults.innerHTML = '';
-            return;
+    const DEBOUNCE_MS = 250;
+    let debounceTimer = null;
+    let inFlight = null;
+
+    function escapeHtml(value) {
+        const div = document.createElement('div');
+        div.textContent = value == null ? '' : String(value);
+        return div.innerHTML;
+    }
+
+    function thumb(url, label, rounded) {
+        const radius = rounded ? '50%' : '6px';
+        if (url) {
+            return `<img src="${escapeHtml(url)}" style="width:40px; height:40px; border-radius:${radius}; object-fit:cover; margin-right:10px;">`;
         }
+        return `<div class="bg-secondary text-white d-flex justify-content-center align-items-center" style="width:40px; height:40px; border-radius:${radius}; margin-right:10px;">${escapeHtml(String(label).slice(0, 1))}</div>`;
+    }
 
-        searchResults.innerHTML = '<div class="p-2 text-center">Searching...</div>';
-        searchResults.style.display = 'block';
+    // Rows are compact tuples, see main/utils/typeahead.py
+    function renderResults(data) {
+        let html = '';
+        data.categories.forEach(([id, title, instituteName, imageUrl]) => {
+            html += `<div class="d-flex align-items-center p-2 border-bottom search-item" data-url="/category/${id}/">
+                ${thumb(imageUrl, title, true)}
+                <div><strong style="color:violet;">${escapeHtml(title)}</strong><br>
+                <small style="color:black;">${escapeHtml(instituteName)}</small></div></div>`;
+        });
+        data.courses.forEach(([id, title, price, instituteName, imageUrl]) => {
+            html += `<div class="d-flex align-items-center p-2 border-bottom search-item" data-url="/courses/${id}/">
+                ${thumb(imageUrl, title, false)}
+                <div><strong style="color: red">${escapeHtml(title)}</strong><br>
+                <small style="color: green;">Price: ₹${escapeHtml(price)}</small><br>
+                <small style="color: black;">By: ${escapeHtml(instituteName)}</small></div></div>`;
+        });
+        data.institutes.forEach(([id, name, logoUrl]) => {
+            html += `<div class="d-flex align-items-center p-2 border-bottom search-item" data-url="/institute/${id}/">
+                ${thumb(logoUrl, name, true)}
+                <div><strong style="color: black;">${escapeHtml(name)}</strong></div></div>`;
+        });
+        return html || '<div class="p-3 text-center text-muted">No results found</div>';
+    }
 
-        fetch(`/ajax-search/?q=${encodeURIComponent(query)}`)
+    function runSearch(query) {
+        if (inFlight) {
+            inFlight.abort();
+        }
+        inFlight = new AbortController();
+
+        fetch(`/api/search/?q=${encodeURIComponent(query)}`, { signal: inFlight.signal })
             .then(res => {
-                console.log('Response status:', res.status); // Debug
                 if (!res.ok) {
                     throw new Error(`HTTP error! status: ${res.status}`);
                 }
                 return res.json();
             })
             .then(data => {
-                console.log('Data received:', data); // Debug
-                searchResults.innerHTML = data.html;
+                // Ignore answers for text the user has already changed
+                if (data.q !== query.toLowerCase().split(/\s+/).join(' ')) {
+                    return;
+                }
+                searchResults.innerHTML = renderResults(data);
                 searchResults.style.display = 'block';
             })
             .catch(error => {
+                if (error.name === 'AbortError') {
+                    return;
+                }
                 console.error('Fetch error:', error);
-                searchResults.innerHTML = '<div class="p-2 text-center text-danger">Error: ' + error.message + '</div>';
+                searchResults.innerHTML = '<div class="p-2 text-center text-danger">Error: ' + escapeHtml(error.message) + '</div>';
             });
+    }
+
+    searchInput.addEventListener('input', function() {
+        const query = this.value.trim();
+        clearTimeout(debounceTimer);
+
+        if(query.length === 0) {
+            if (inFlight) {
+                inFlight.abort();
+            }
+            searchResults.style.display = 'none';
+            searchResults.innerHTML = '';
+            return;
+        }
+
+        searchResults.innerHTML = '<div class="p-2 text-center">Searching...</div>';
+        searchResults.style.display = 'block';
+        debounceTimer = setTimeout(() => runSearch(query), DEBOUNCE_MS);
     });
 
     // Click outside to close
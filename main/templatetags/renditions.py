@@ -0,0 +1,43 @@
+from django import template
+from django.utils.html import format_html
+
+from main.utils import images
+
+
+register = template.Library()
+
+
+@register.filter
+def rendition(field_file, width):
+    """{{ course.image|rendition:640 }} -> JPEG rendition URL, or the original."""
+    return images.rendition_url(field_file, width)
+
+
+@register.filter
+def rendition_srcset(field_file, fmt="jpeg"):
+    return images.srcset(field_file, fmt)
+
+
+@register.simple_tag
+def picture(field_file, width, alt="", css_class="", style="", sizes=None):
+    """
+    <picture> with a WebP srcset and a JPEG fallback sized for ``width`` CSS
+    pixels. Renders a plain <img> (placeholder or original) until the
+    renditions are ready.
+    """
+    if not field_file:
+        return ""
+    sizes = sizes or f"{int(width)}px"
+    webp = images.srcset(field_file, "webp")
+    if not webp:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}" loading="lazy">',
+            images.rendition_url(field_file, width), alt, css_class, style,
+        )
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" style="{}" loading="lazy"></picture>',
+        webp, sizes,
+        images.rendition_url(field_file, width), images.srcset(field_file), sizes,
+        alt, css_class, style,
+    )
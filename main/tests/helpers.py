@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+
+from main.models import Admission, Course, CourseCategory, Institute
+
+
+# Small builders shared by the test modules. Users get their Student and
+# Profile from the post_save signal, as in the app.
+
+PASSWORD = "pw"
+
+
+def make_user(username, **kwargs):
+    return User.objects.create_user(username, password=PASSWORD, **kwargs)
+
+
+def make_institute(owner=None, status="approved", **kwargs):
+    owner = owner or make_user(f"owner{User.objects.count()}")
+    fields = {
+        "name": "Test Institute", "description": "test", "estd": "2000",
+        "email": "institute@example.com", "phone": "0", "register_number": "1",
+        "status": status,
+    }
+    fields.update(kwargs)
+    return Institute.objects.create(owner=owner.student_profile, **fields)
+
+
+def make_category(institute, title="Science", **kwargs):
+    return CourseCategory.objects.create(institute=institute, title=title, **kwargs)
+
+
+def make_course(category, title="Physics", **kwargs):
+    fields = {
+        "description": "test", "duration": "1 month", "level": "Beginner",
+        "class_type": "online", "seats": 10, "original_price": Decimal("1000"),
+    }
+    fields.update(kwargs)
+    return Course.objects.create(institute=category.institute, category=category, title=title, **fields)
+
+
+def make_admission(user, course, **kwargs):
+    fields = {
+        "student_name": user.username if user else "Walk-in", "email": "student@example.com",
+        "phone": "0", "status": "pending",
+    }
+    fields.update(kwargs)
+    return Admission.objects.create(
+        user=user, institute=course.institute, category=course.category, course=course, **fields,
+    )
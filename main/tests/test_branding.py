@@ -0,0 +1,85 @@
+import base64
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from main.models import Enrollment, InstituteBranding
+from main.utils import branding, offer_letters
+
+from .helpers import make_admission, make_category, make_course, make_institute, make_user
+
+
+def image(name, size, color="black"):
+    out = BytesIO()
+    Image.new("RGB", size, color).save(out, format="PNG")
+    return SimpleUploadedFile(name, out.getvalue(), content_type="image/png")
+
+
+def decoded_size(value):
+    with Image.open(BytesIO(base64.b64decode(value))) as img:
+        return img.size
+
+
+class BrandingTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        settings_override = override_settings(MEDIA_ROOT=tmp, IMAGE_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.institute = make_institute(
+                signature=image("sign.png", (2000, 600)),
+                stamp=image("stamp.png", (1200, 1200)),
+                profile_logo=image("logo.png", (300, 100)),
+            )
+
+    def stored(self):
+        return InstituteBranding.objects.get(institute=self.institute)
+
+    def test_assets_are_resized_to_their_boxes(self):
+        assets = self.stored()
+        self.assertEqual(decoded_size(assets.signature_base64), (320, 96))
+        self.assertEqual(decoded_size(assets.stamp_base64), (200, 200))
+        # Smaller than its box: left alone
+        self.assertEqual(decoded_size(assets.logo_base64), (240, 80))
+        self.assertEqual(assets.sources, branding.sources_for(self.institute))
+
+    def test_new_image_rebuilds_after_commit(self):
+        old = self.stored()
+        self.institute.signature = image("new-sign.png", (400, 400), "red")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.institute.save()
+        new = self.stored()
+        self.assertNotEqual(new.signature_base64, old.signature_base64)
+        self.assertNotEqual(new.digest, old.digest)
+        self.assertEqual(new.stamp_base64, old.stamp_base64)
+
+    def test_unrelated_edit_keeps_the_assets(self):
+        self.institute.name = "Renamed"
+        with mock.patch.object(branding, "rebuild") as rebuild, self.captureOnCommitCallbacks(execute=True):
+            self.institute.save()
+        rebuild.assert_not_called()
+
+    def test_rendering_never_opens_the_uploads(self):
+        user = make_user("ada")
+        course = make_course(make_category(self.institute))
+        Enrollment.objects.create(student=user.student_profile, course=course, institute=self.institute)
+        admission = make_admission(user, course, status="accepted")
+        institute = offer_letters.letter_institute(admission)
+        with mock.patch.object(branding, "encode_image") as encode_image:
+            context = offer_letters.offer_letter_context(admission, institute)
+        encode_image.assert_not_called()
+        self.assertEqual(context["signature_base64"], self.stored().signature_base64)
+
+    def test_missing_row_is_rebuilt_on_demand(self):
+        InstituteBranding.objects.filter(institute=self.institute).delete()
+        self.institute.refresh_from_db()
+        assets = branding.branding_for(self.institute)
+        self.assertEqual(decoded_size(assets.stamp_base64), (200, 200))
+        self.assertTrue(InstituteBranding.objects.filter(institute=self.institute).exists())
@@ -0,0 +1,117 @@
+import base64
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+
+from main.models import Course
+from main.utils import catalog
+
+from .helpers import make_category, make_course, make_institute, make_user
+
+
+def tampered(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def filters(query=""):
+    return catalog.parse_filters(QueryDict(query))
+
+
+class CoursePageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = make_category(make_institute())
+        # Repeated prices so keyset ties fall back to id
+        self.courses = [
+            make_course(category, title=f"Course {i}", original_price=Decimal(100 * (i % 3 + 1)))
+            for i in range(7)
+        ]
+
+    def walk(self, query):
+        seen, cursor = [], None
+        while True:
+            page = catalog.course_page(filters(query), cursor)
+            seen.extend(page["courses"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return seen
+
+    def test_newest_pages_cover_every_course_once(self):
+        seen = self.walk("page_size=3")
+        self.assertEqual([c.pk for c in seen], sorted((c.pk for c in self.courses), reverse=True))
+
+    def test_price_pages_follow_price_then_id(self):
+        for sort, reverse in (("price", False), ("-price", True)):
+            with self.subTest(sort=sort):
+                seen = self.walk(f"sort={sort}&page_size=2")
+                expected = sorted(self.courses, key=lambda c: (c.discount_price, c.pk), reverse=reverse)
+                self.assertEqual([c.pk for c in seen], [c.pk for c in expected])
+
+    def test_cursor_for_another_sort_is_ignored(self):
+        cursor = catalog.course_page(filters("page_size=2"))["next_cursor"]
+        self.assertIsNone(catalog.decode_cursor(cursor, "price"))
+        self.assertIsNone(catalog.decode_cursor("not-a-cursor", "newest"))
+
+    def test_tampered_cursor_is_ignored(self):
+        for payload in (
+            ["newest", "abc", 1], ["newest", None, 1], ["newest", [1], 1], ["newest", "Infinity", 1],
+            ["newest", "1", "1"], ["price", "abc", 1], ["price", {"x": 1}, 1], ["price", "NaN", 1],
+            [], ["newest", "1"], None,
+        ):
+            with self.subTest(payload=payload):
+                sort = payload[0] if payload else "newest"
+                self.assertIsNone(catalog.decode_cursor(tampered(payload), sort))
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        first = catalog.course_page(filters("page_size=3"))["courses"]
+        page = catalog.course_page(filters("page_size=3"), tampered(["newest", "abc", 1]))
+        self.assertEqual(page["courses"], first)
+
+        self.client.force_login(make_user("student"))
+        response = self.client.get(reverse("main:course"), {"cursor": tampered(["newest", "abc", 1])})
+        self.assertEqual(response.status_code, 200)
+
+    def test_price_sort_uses_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN is SQLite's")
+        sql, params = (
+            Course.objects.order_by("discount_price", "id").values("id")[:10].query.sql_with_params()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("course_price_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class CategoryFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        institute = make_institute()
+        self.science = make_category(institute, title="Science")
+        make_category(institute, title="Arts")
+        make_course(self.science, title="Physics", level="Beginner")
+        make_course(self.science, title="Chemistry", level="Advanced")
+
+    def test_counts_follow_filters(self):
+        counts = {f["title"]: f["course_count"] for f in catalog.category_facets(filters("level=Beginner"))}
+        self.assertEqual(counts, {"Arts": 0, "Science": 1})
+
+    def test_facets_are_cached_per_filter_set(self):
+        catalog.category_facets(filters("level=Beginner"))
+        with self.assertNumQueries(0):
+            # Sort and category don't change the counts
+            catalog.category_facets(filters("level=Beginner&sort=price&category=Science"))
+        with self.assertNumQueries(1):
+            catalog.category_facets(filters("level=Advanced"))
+
+    def test_course_save_invalidates_facets(self):
+        catalog.category_facets(filters())
+        make_course(self.science, title="Biology")
+        counts = {f["title"]: f["course_count"] for f in catalog.category_facets(filters())}
+        self.assertEqual(counts["Science"], 3)
@@ -0,0 +1,147 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from main.models import Admission, Course, Enrollment, Institute
+
+from .helpers import make_admission, make_category, make_course, make_institute, make_user
+
+
+FIELDS = ("pending_count", "shortlisted_count", "accepted_count", "rejected_count", "paid_count", "enrolled_count")
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.institute = make_institute()
+        category = make_category(self.institute)
+        self.course = make_course(category, title="Physics")
+        self.other = make_course(category, title="Chemistry")
+        self.user = make_user("ada")
+
+    def counts(self, course=None):
+        """Non-zero counters of ``course`` (default: self.course) and of the institute."""
+        course = Course.objects.values(*FIELDS).get(pk=(course or self.course).pk)
+        institute = Institute.objects.values(*FIELDS).get(pk=self.institute.pk)
+        return (
+            {f: n for f, n in course.items() if n},
+            {f: n for f, n in institute.items() if n},
+        )
+
+    def assertCounts(self, expected, course=None):
+        self.assertEqual(self.counts(course), (expected, expected))
+
+
+class AdmissionDeltaTests(CounterTests):
+    def test_create_counts_status_and_payment(self):
+        make_admission(self.user, self.course, is_paid=True)
+        self.assertCounts({"pending_count": 1, "paid_count": 1})
+
+    def test_status_transition_moves_the_count(self):
+        admission = make_admission(self.user, self.course)
+        admission.status = "shortlisted"
+        admission.save()
+        self.assertCounts({"shortlisted_count": 1})
+        admission.status = "rejected"
+        admission.is_paid = True
+        admission.save()
+        self.assertCounts({"rejected_count": 1, "paid_count": 1})
+
+    def test_unrelated_edit_changes_nothing(self):
+        admission = make_admission(self.user, self.course)
+        admission.student_name = "Ada Lovelace"
+        admission.save()
+        self.assertCounts({"pending_count": 1})
+
+    def test_changing_course_moves_the_count(self):
+        admission = make_admission(self.user, self.course)
+        admission.course = self.other
+        admission.save()
+        self.assertEqual(self.counts()[0], {})
+        self.assertEqual(self.counts(self.other), ({"pending_count": 1}, {"pending_count": 1}))
+
+    def test_update_fields_only_applies_the_saved_fields(self):
+        admission = make_admission(self.user, self.course)
+        admission.status = "accepted"
+        admission.is_paid = True  # not saved below
+        admission.save(update_fields=["status"])
+        self.assertCounts({"accepted_count": 1})
+
+    def test_delete_releases_the_count(self):
+        admission = make_admission(self.user, self.course, is_paid=True)
+        admission.delete()
+        self.assertCounts({})
+
+    def test_queryset_delete_releases_the_count(self):
+        make_admission(self.user, self.course)
+        make_admission(make_user("bob"), self.course, status="accepted")
+        Admission.objects.filter(course=self.course).delete()
+        self.assertCounts({})
+
+
+class StaleInstanceTests(CounterTests):
+    def test_stale_save_does_not_repeat_the_transition(self):
+        admission = make_admission(self.user, self.course)
+        stale = Admission.objects.get(pk=admission.pk)
+        admission.status = "accepted"
+        admission.save()
+        # Loaded before the accept; makes the same change again
+        stale.status = "accepted"
+        stale.save()
+        self.assertCounts({"accepted_count": 1})
+
+    def test_stale_save_reverting_a_change_is_counted_once(self):
+        admission = make_admission(self.user, self.course)
+        stale = Admission.objects.get(pk=admission.pk)
+        admission.status = "rejected"
+        admission.save()
+        stale.student_name = "Edited elsewhere"
+        stale.save()  # still says pending, and writes it back
+        self.assertCounts({"pending_count": 1})
+
+    def test_deleting_twice_releases_once(self):
+        admission = make_admission(self.user, self.course)
+        make_admission(make_user("bob"), self.course)
+        stale = Admission.objects.get(pk=admission.pk)
+        admission.delete()
+        stale.delete()
+        self.assertCounts({"pending_count": 1})
+
+    def test_stale_delete_releases_the_stored_status(self):
+        admission = make_admission(self.user, self.course)
+        stale = Admission.objects.get(pk=admission.pk)
+        admission.status = "accepted"
+        admission.save()
+        stale.delete()
+        self.assertCounts({})
+
+
+class EnrollmentCounterTests(CounterTests):
+    def test_enrollment_create_and_delete(self):
+        enrollment = Enrollment.objects.create(
+            student=self.user.student_profile, course=self.course, institute=self.institute,
+        )
+        self.assertCounts({"enrolled_count": 1})
+        enrollment.delete()
+        self.assertCounts({})
+
+
+class RecountTests(CounterTests):
+    def test_recount_repairs_drift(self):
+        make_admission(self.user, self.course, status="accepted", is_paid=True)
+        make_admission(make_user("bob"), self.course)
+        Enrollment.objects.create(student=self.user.student_profile, course=self.course, institute=self.institute)
+        expected = self.counts()
+        Course.objects.update(accepted_count=7, pending_count=0, enrolled_count=3)
+        Institute.objects.update(paid_count=0, rejected_count=2)
+
+        out = StringIO()
+        call_command("recount", stdout=out)
+        self.assertEqual(self.counts(), expected)
+        self.assertIn("Recounted 2 courses and 1 institutes", out.getvalue())
+
+    def test_counters_never_go_negative(self):
+        admission = make_admission(self.user, self.course)
+        Course.objects.update(pending_count=0)
+        admission.delete()
+        self.assertEqual(Course.objects.get(pk=self.course.pk).pending_count, 0)
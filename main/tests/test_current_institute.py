@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from main.utils import current_institute
+
+from .helpers import PASSWORD, make_institute, make_user
+
+
+class CurrentInstituteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user("owner")
+        self.institute = make_institute(owner=self.owner)
+
+    def request(self, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        return request
+
+    def test_second_lookup_is_a_cache_hit(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(current_institute.approved_institute_for(self.owner), self.institute)
+        with self.assertNumQueries(0):
+            self.assertEqual(current_institute.approved_institute_for(self.owner), self.institute)
+
+    def test_users_without_an_institute_are_cached_too(self):
+        student = make_user("student")
+        with self.assertNumQueries(1):
+            self.assertIsNone(current_institute.approved_institute_for(student))
+        with self.assertNumQueries(0):
+            self.assertIsNone(current_institute.approved_institute_for(student))
+
+    def test_anonymous_users_cost_nothing(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(current_institute.current_institute(self.request(AnonymousUser())))
+
+    def test_looked_up_once_per_request(self):
+        request = self.request(self.owner)
+        with self.assertNumQueries(1):
+            current_institute.current_institute(request)
+            current_institute.current_institute(request)
+
+    def test_only_an_approved_institute_counts(self):
+        owner = make_user("applicant")
+        make_institute(owner=owner, status="rejected")
+        approved = make_institute(owner=owner, name="Second try")
+        self.assertEqual(current_institute.approved_institute_for(owner), approved)
+
+    def test_status_change_invalidates_the_entry(self):
+        current_institute.approved_institute_for(self.owner)
+        self.institute.status = "rejected"
+        self.institute.save()
+        self.assertIsNone(current_institute.approved_institute_for(self.owner))
+
+        self.institute.status = "approved"
+        self.institute.save()
+        self.assertEqual(current_institute.approved_institute_for(self.owner), self.institute)
+
+    def test_delete_invalidates_the_entry(self):
+        current_institute.approved_institute_for(self.owner)
+        self.institute.delete()
+        self.assertIsNone(current_institute.approved_institute_for(self.owner))
+
+    def test_page_and_navbar_share_one_lookup(self):
+        self.client.login(username="owner", password=PASSWORD)
+        lookup = mock.patch.object(
+            current_institute, "approved_institute_for", wraps=current_institute.approved_institute_for,
+        )
+        with lookup as approved_institute_for:
+            response = self.client.get(reverse("main:dashboard"))
+        self.assertEqual(response.status_code, 200)
+        approved_institute_for.assert_called_once()
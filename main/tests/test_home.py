@@ -0,0 +1,39 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from main.models import StudentFeedback
+from main.utils.home_cache import get_home_payload
+
+from .helpers import make_category, make_course, make_institute, make_user
+
+
+class HomePayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = make_category(make_institute())
+        self.course = make_course(self.category, title="Physics")
+
+    def test_payload_is_cached(self):
+        get_home_payload()
+        with self.assertNumQueries(0):
+            payload = get_home_payload()
+        self.assertEqual([c["title"] for c in payload["courses"]], ["Physics"])
+
+    def test_course_save_invalidates_payload(self):
+        get_home_payload()
+        make_course(self.category, title="Chemistry")
+        titles = [c["title"] for c in get_home_payload()["courses"]]
+        self.assertEqual(titles, ["Chemistry", "Physics"])
+
+    def test_feedback_invalidates_payload(self):
+        get_home_payload()
+        StudentFeedback.objects.create(student=make_user("stud"), feedback_text="Great")
+        self.assertEqual([f["text"] for f in get_home_payload()["feedbacks"]], ["Great"])
+
+    def test_home_view_serves_cached_payload(self):
+        url = reverse("main:home")
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, "Physics")
@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+from io import BytesIO
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from main.models import ImageRendition
+from main.utils import images
+
+
+def png(width, height):
+    out = BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, format="PNG")
+    return ContentFile(out.getvalue())
+
+
+@override_settings(IMAGE_RENDITION_WIDTHS=(160, 320, 640, 1280), IMAGE_WORKERS=0)
+class RenditionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.storage = FileSystemStorage(location=tmp, base_url="/media/")
+
+    def make_ready(self, name, width):
+        self.storage.save(name, png(width, width // 2))
+        images.enqueue([name])
+        self.assertEqual(images.process(name, self.storage), images.READY)
+        return SimpleNamespace(name=name, storage=self.storage, url=f"/media/{name}")
+
+    def rendered(self, name):
+        stem = name.rsplit(".", 1)[0]
+        directory = f"renditions/{stem}"
+        return sorted(self.storage.listdir(directory)[1])
+
+    def test_small_original_is_not_upscaled(self):
+        self.make_ready("course/small.png", 500)
+        self.assertEqual(
+            self.rendered("course/small.png"),
+            ["w160.jpg", "w160.webp", "w320.jpg", "w320.webp", "w500.jpg", "w500.webp"],
+        )
+        with self.storage.open("renditions/course/small/w500.jpg") as f, Image.open(f) as img:
+            self.assertEqual(img.width, 500)
+
+    def test_large_original_gets_every_width(self):
+        self.make_ready("course/large.png", 2000)
+        self.assertEqual(len(self.rendered("course/large.png")), 8)
+
+    def test_srcset_and_url_use_real_widths(self):
+        field = self.make_ready("course/small.png", 500)
+        self.assertEqual(
+            images.srcset(field),
+            "/media/renditions/course/small/w160.jpg 160w, "
+            "/media/renditions/course/small/w320.jpg 320w, "
+            "/media/renditions/course/small/w500.jpg 500w",
+        )
+        self.assertEqual(images.rendition_url(field, 1280), "/media/renditions/course/small/w500.jpg")
+        self.assertEqual(images.rendition_url(field, 200), "/media/renditions/course/small/w320.jpg")
+
+    def test_width_survives_a_cold_cache(self):
+        field = self.make_ready("course/small.png", 500)
+        cache.clear()
+        self.assertIn("500w", images.srcset(field, "webp"))
+
+    def test_discard_removes_every_rendition(self):
+        self.make_ready("course/small.png", 500)
+        images.discard("course/small.png", self.storage)
+        self.assertEqual(self.rendered("course/small.png"), [])
+        self.assertFalse(ImageRendition.objects.exists())
+
+    def test_pending_image_serves_placeholder(self):
+        self.storage.save("course/new.png", png(400, 200))
+        images.enqueue(["course/new.png"])
+        field = SimpleNamespace(name="course/new.png", storage=self.storage, url="/media/course/new.png")
+        self.assertEqual(images.srcset(field), "")
+        self.assertTrue(images.rendition_url(field, 320).endswith(images.PLACEHOLDER))
@@ -0,0 +1,122 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from pypdf import PdfReader
+
+from main.models import Enrollment
+from main.utils import offer_letter_export, offer_letters
+from main.utils.pdf_generator import render_pdf_from_html
+
+from .helpers import PASSWORD, make_admission, make_category, make_course, make_institute, make_user
+
+
+def letter_pdf(text):
+    return render_pdf_from_html(f"<html><body><p>{text}</p></body></html>").read()
+
+
+class FilenameTests(TestCase):
+    def setUp(self):
+        self.category = make_category(make_institute())
+
+    def test_title_is_made_safe(self):
+        course = make_course(self.category, title="Maths/../Physics 101")
+        admission = make_admission(make_user("stud"), course)
+        folder, name = offer_letter_export.filename_for(admission).split("/")
+        self.assertEqual(folder, "Maths..Physics_101")
+        self.assertEqual(name, f"Offer_Letter_{admission.id}.pdf")
+
+    def test_unusable_title_falls_back_to_id(self):
+        course = make_course(self.category, title="..")
+        admission = make_admission(make_user("stud"), course)
+        self.assertTrue(offer_letter_export.filename_for(admission).startswith(f"course_{course.id}/"))
+
+
+class MergeTests(TestCase):
+    def test_merge_keeps_every_page_in_order(self):
+        paths = []
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        for i in range(3):
+            path = f"{tmp}/{i}.pdf"
+            with open(path, "wb") as f:
+                f.write(letter_pdf(f"Letter {i}"))
+            paths.append(path)
+
+        merged = offer_letter_export.merge_pdfs(paths, io.BytesIO())
+        reader = PdfReader(merged, strict=True)
+        self.assertEqual([page.extract_text().strip() for page in reader.pages], ["Letter 0", "Letter 1", "Letter 2"])
+
+
+@override_settings(OFFER_LETTER_WORKERS=0)
+class ExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        settings_override = override_settings(PDF_CACHE_DIR=tmp)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.owner = make_user("owner")
+        self.institute = make_institute(owner=self.owner)
+        course = make_course(make_category(self.institute), title="Physics")
+        self.admissions = []
+        for name in ("ada", "bob"):
+            user = make_user(name)
+            Enrollment.objects.create(student=user.student_profile, course=course, institute=self.institute)
+            self.admissions.append(make_admission(user, course, status="accepted", student_name=name))
+        self.client.login(username="owner", password=PASSWORD)
+
+    def fake_render(self, failing):
+        def render(admission, institute=None):
+            key = offer_letters.render_key(admission, institute)
+            if admission.pk in failing:
+                return key, None
+            return key, io.BytesIO(letter_pdf(admission.student_name))
+        return mock.patch.object(offer_letters, "offer_letter_pdf", side_effect=render)
+
+    def test_zip_lists_failed_letters(self):
+        with self.fake_render({self.admissions[1].pk}), self.assertLogs(offer_letter_export.logger, "WARNING"):
+            response = self.client.get(reverse("main:export_offer_letters"))
+            archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(
+            archive.namelist(), [f"Physics/Offer_Letter_{self.admissions[0].pk}.pdf", offer_letter_export.MISSING_NAME],
+        )
+        self.assertIn("bob - Physics", archive.read(offer_letter_export.MISSING_NAME).decode())
+
+    def test_merged_pdf_reports_failed_letters(self):
+        with self.fake_render({self.admissions[1].pk}), self.assertLogs(offer_letter_export.logger, "WARNING"):
+            response = self.client.get(reverse("main:export_offer_letters"), {"format": "pdf"})
+            data = b"".join(response.streaming_content)
+        self.assertEqual(response["X-Missing-Offer-Letters"], str(self.admissions[1].pk))
+        self.assertEqual(len(PdfReader(io.BytesIO(data)).pages), 1)
+
+    def test_cached_letters_are_not_rendered_again(self):
+        with self.fake_render(set()) as render:
+            b"".join(self.client.get(reverse("main:export_offer_letters")).streaming_content)
+            b"".join(self.client.get(reverse("main:export_offer_letters")).streaming_content)
+        self.assertEqual(render.call_count, 2)
+
+    def test_zip_is_streamed_as_an_attachment(self):
+        with self.fake_render(set()):
+            response = self.client.get(reverse("main:export_offer_letters"))
+            b"".join(response.streaming_content)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertNotIsInstance(response, FileResponse)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="offer_letters_test-institute.zip"')
+
+    def test_merged_pdf_is_a_file_attachment(self):
+        with self.fake_render(set()):
+            response = self.client.get(reverse("main:export_offer_letters"), {"format": "pdf"})
+            b"".join(response.streaming_content)
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="offer_letters_test-institute.pdf"')
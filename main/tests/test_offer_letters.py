@@ -0,0 +1,88 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from main.models import Enrollment, OfferLetter
+from main.utils import background, offer_letters
+
+from .helpers import PASSWORD, make_admission, make_category, make_course, make_institute, make_user
+
+
+@override_settings(OFFER_LETTER_WORKERS=2)
+class RetryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        settings_override = override_settings(MEDIA_ROOT=tmp, PDF_CACHE_DIR=f"{tmp}/pdf")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = make_user("ada")
+        institute = make_institute()
+        course = make_course(make_category(institute))
+        Enrollment.objects.create(student=user.student_profile, course=course, institute=institute)
+        self.admission = make_admission(user, course, status="accepted")
+        offer_letters.enqueue([self.admission.pk])
+        self.client.login(username="ada", password=PASSWORD)
+
+    def letter(self):
+        return OfferLetter.objects.get(admission=self.admission)
+
+    def renders(self, *outcomes):
+        outcomes = iter(outcomes)
+
+        def render(admission, institute=None):
+            return "key", next(outcomes)
+        return mock.patch.object(offer_letters, "offer_letter_pdf", side_effect=render)
+
+    def test_failed_render_is_retried_until_ready(self):
+        with self.renders(None, io.BytesIO(b"%PDF-1.4 letter")), \
+                mock.patch.object(background, "submit_later") as submit_later:
+            self.assertEqual(offer_letters.run_pending(), {offer_letters.QUEUED: 1})
+            letter = self.letter()
+            self.assertEqual((letter.status, letter.attempts), (offer_letters.QUEUED, 1))
+            self.assertGreater(letter.run_after, timezone.now())
+            submit_later.assert_called_once_with(
+                offer_letters.RETRY_DELAY, "offer-letters", 2, offer_letters.run_pending,
+            )
+
+            # The timer fires once the backoff has passed
+            OfferLetter.objects.filter(pk=letter.pk).update(run_after=timezone.now())
+            _delay, _name, _workers, retry = submit_later.call_args.args
+            self.assertEqual(retry(), {offer_letters.READY: 1})
+
+        letter = self.letter()
+        self.assertEqual((letter.status, letter.attempts, letter.error), (offer_letters.READY, 2, ""))
+        with letter.file.open("rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4 letter")
+
+    def test_last_attempt_fails_without_a_retry(self):
+        OfferLetter.objects.filter(admission=self.admission).update(attempts=2)
+        with self.renders(None), mock.patch.object(background, "submit_later") as submit_later:
+            self.assertEqual(offer_letters.run_pending(), {offer_letters.FAILED: 1})
+        submit_later.assert_not_called()
+
+    def test_status_wakes_workers_for_a_due_retry(self):
+        OfferLetter.objects.filter(admission=self.admission).update(
+            attempts=1, run_after=timezone.now() - timedelta(seconds=1),
+        )
+        with mock.patch.object(offer_letters, "wake_workers") as wake:
+            response = self.client.get(reverse("main:offer_letter_status", args=[self.admission.pk]))
+        self.assertEqual(response.json()["status"], offer_letters.QUEUED)
+        wake.assert_called_once_with()
+
+    def test_status_leaves_a_pending_backoff_alone(self):
+        OfferLetter.objects.filter(admission=self.admission).update(
+            attempts=1, run_after=timezone.now() + timedelta(minutes=1),
+        )
+        with mock.patch.object(offer_letters, "wake_workers") as wake:
+            self.client.get(reverse("main:offer_letter_status", args=[self.admission.pk]))
+        wake.assert_not_called()
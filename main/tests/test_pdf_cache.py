@@ -0,0 +1,143 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import FileResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from main.models import Enrollment
+from main.utils import offer_letters, pdf_cache
+
+from .helpers import PASSWORD, make_admission, make_category, make_course, make_institute, make_user
+
+
+class PdfCacheTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        settings_override = override_settings(PDF_CACHE_DIR=self.tmp, PDF_CACHE_MAX_BYTES=1000)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class StoreTests(PdfCacheTestMixin, SimpleTestCase):
+    def age(self, key, seconds):
+        past = time.time() - seconds
+        os.utime(pdf_cache.path_for(key), (past, past))
+
+    def test_put_then_get(self):
+        pdf_cache.put("a", b"%PDF a")
+        self.assertEqual(pdf_cache.get("a"), b"%PDF a")
+        self.assertIsNone(pdf_cache.get("missing"))
+
+    def test_counts_are_shared_outside_the_process_cache(self):
+        pdf_cache.put("a", b"%PDF a")
+        pdf_cache.get("a")
+        pdf_cache.get("a")
+        pdf_cache.get("missing")
+        # Another process has its own Django cache; the counts must not live there
+        cache.clear()
+        stats = pdf_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (2, 1, 0.6667))
+
+        out = io.StringIO()
+        call_command("pdf_cache", "--json", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["hits"], 2)
+
+    def test_contains_is_not_counted(self):
+        pdf_cache.put("a", b"%PDF a")
+        pdf_cache.contains("a")
+        self.assertEqual((pdf_cache.stats()["hits"], pdf_cache.stats()["misses"]), (0, 0))
+
+    def test_clear_removes_entries_and_counts(self):
+        pdf_cache.put("a", b"%PDF a")
+        pdf_cache.get("a")
+        self.assertEqual(pdf_cache.clear(), 1)
+        stats = pdf_cache.stats()
+        self.assertEqual((stats["entries"], stats["hits"]), (0, 0))
+
+    def test_least_recently_used_entries_are_evicted_past_the_cap(self):
+        for i, key in enumerate("abc"):
+            pdf_cache.put(key, b"x" * 300)
+            self.age(key, 100 - i)
+        # Reading "a" makes "b" the least recently used
+        pdf_cache.get_path("a")
+        pdf_cache.put("d", b"x" * 300)
+        self.assertEqual(
+            sorted(k for k in "abcd" if pdf_cache.contains(k)), ["a", "c", "d"],
+        )
+        self.assertLessEqual(pdf_cache.stats()["bytes"], 1000)
+
+    def test_evict_trims_to_ninety_percent(self):
+        for i, key in enumerate("abcd"):
+            pdf_cache.put(key, b"x" * 200)
+            self.age(key, 100 - i)
+        self.assertEqual(pdf_cache.evict(max_bytes=500), 2)
+        self.assertEqual(sorted(k for k in "abcd" if pdf_cache.contains(k)), ["c", "d"])
+        self.assertEqual(pdf_cache.evict(max_bytes=500), 0)
+
+
+@override_settings(OFFER_LETTER_WORKERS=0)
+class DownloadTests(PdfCacheTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = make_user("ada")
+        institute = make_institute()
+        course = make_course(make_category(institute))
+        Enrollment.objects.create(student=user.student_profile, course=course, institute=institute)
+        self.admission = make_admission(user, course, status="accepted")
+        self.url = reverse("main:download_offer_letter", args=[self.admission.pk])
+        self.client.login(username="ada", password=PASSWORD)
+
+        def render(admission, institute=None):
+            institute = institute or offer_letters.letter_institute(admission)
+            return offer_letters.render_key(admission, institute), io.BytesIO(b"%PDF-1.4 letter")
+
+        offer_letters.enqueue([self.admission.pk])
+        with mock.patch.object(offer_letters, "offer_letter_pdf", side_effect=render):
+            offer_letters.run_pending()
+
+    def test_ready_letter_has_an_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 letter")
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_letter_is_a_file_attachment(self):
+        response = self.client.get(self.url)
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(
+            response["Content-Disposition"], f'attachment; filename="Offer_Letter_{self.admission.pk}.pdf"',
+        )
+        response.close()
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_changed_letter_does_not_match_the_old_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.admission.student_name = "Ada Lovelace"
+        self.admission.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        # Stale and not rendered yet: queued again instead of a 304
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(offer_letters.letter_for(self.admission).status, offer_letters.QUEUED)
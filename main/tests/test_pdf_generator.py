@@ -0,0 +1,37 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from main.utils import pdf_generator
+
+
+class GeneratePdfTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        settings_override = override_settings(PDF_CACHE_DIR=tmp)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def generate(self):
+        with mock.patch.object(pdf_generator, "get_template") as get_template:
+            get_template.return_value.render.return_value = "<html><body><p>Receipt</p></body></html>"
+            return pdf_generator.generate_pdf("receipt.html")
+
+    def test_returns_open_pdf(self):
+        with self.generate() as pdf:
+            self.assertTrue(pdf.read().startswith(b"%PDF"))
+
+    def test_second_render_streams_from_cache(self):
+        self.generate().close()
+        with mock.patch.object(pdf_generator, "render_pdf_from_html") as render:
+            with self.generate() as pdf:
+                self.assertTrue(pdf.name.endswith(".pdf"))
+                self.assertTrue(pdf.read().startswith(b"%PDF"))
+        render.assert_not_called()
+
+    def test_failed_render_returns_none(self):
+        with mock.patch.object(pdf_generator, "render_pdf_from_html", return_value=None):
+            self.assertIsNone(self.generate())
@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from main.models import Course
+from main.utils.pricing import compute_discount_price, discount_price_expression, final_price
+
+from .helpers import make_category, make_course, make_institute
+
+
+# (original_price, discount_percent), including values that round at the cent
+PRICES = [
+    (Decimal("1000.00"), 0),
+    (Decimal("1000.00"), 10),
+    (Decimal("999.99"), 33),
+    (Decimal("10.05"), 50),
+    (Decimal("0.15"), 50),
+    (Decimal("1234.57"), 15),
+    (Decimal("19.99"), 99),
+    (Decimal("500.00"), 100),
+    (Decimal("0.00"), 25),
+]
+
+
+class PriceParityTestCase(TestCase):
+    def setUp(self):
+        self.category = make_category(make_institute())
+
+    def assertMatchesPython(self, courses=None):
+        """The stored, SQL-computed and annotated prices all equal compute_discount_price()."""
+        qs = Course.objects.annotate(sql_price=discount_price_expression()).with_final_price().order_by("pk")
+        if courses is not None:
+            qs = qs.filter(pk__in=[c.pk for c in courses])
+        rows = list(qs)
+        self.assertTrue(rows)
+        for course in rows:
+            expected = compute_discount_price(course.original_price, course.discount_percent)
+            with self.subTest(original_price=course.original_price, discount_percent=course.discount_percent):
+                self.assertEqual(course.discount_price, expected)
+                self.assertEqual(Decimal(course.sql_price), expected)
+                self.assertEqual(Decimal(course.final_price), expected)
+                self.assertEqual(final_price(course), expected)
+
+
+class AnnotationTests(PriceParityTestCase):
+    def test_save_matches_annotation(self):
+        for i, (price, percent) in enumerate(PRICES):
+            make_course(self.category, title=f"Course {i}", original_price=price, discount_percent=percent)
+        self.assertMatchesPython()
+
+    def test_removed_discount(self):
+        course = make_course(self.category, original_price=Decimal("800.00"), discount_percent=25)
+        course.discount_percent = 0
+        course.save()
+        self.assertEqual(course.discount_price, Decimal("800.00"))
+        self.assertMatchesPython()
+
+    def test_legacy_row_without_stored_price_falls_back_to_sql(self):
+        course = make_course(self.category, original_price=Decimal("999.99"), discount_percent=33)
+        # A row written before discount_price existed
+        Course.objects.filter(pk=course.pk).update(discount_price=None)
+        row = Course.objects.with_final_price().get(pk=course.pk)
+        self.assertIsNone(row.discount_price)
+        self.assertEqual(Decimal(row.final_price), compute_discount_price(course.original_price, 33))
+
+    def test_final_price_between_filters_in_sql(self):
+        for i, (price, percent) in enumerate(PRICES):
+            make_course(self.category, title=f"Course {i}", original_price=price, discount_percent=percent)
+        found = set(Course.objects.final_price_between(Decimal("5.00"), Decimal("700.00")).values_list("pk", flat=True))
+        expected = {
+            c.pk for c in Course.objects.all()
+            if Decimal("5.00") <= compute_discount_price(c.original_price, c.discount_percent) <= Decimal("700.00")
+        }
+        self.assertEqual(found, expected)
+
+
+class WritePathTests(PriceParityTestCase):
+    def test_queryset_update(self):
+        courses = [
+            make_course(self.category, title=f"Course {i}", original_price=price, discount_percent=0)
+            for i, (price, _percent) in enumerate(PRICES)
+        ]
+        for course, (_price, percent) in zip(courses, PRICES):
+            Course.objects.filter(pk=course.pk).update(discount_percent=percent)
+        self.assertMatchesPython()
+
+        # New price and percent in one UPDATE, and a discount removed
+        Course.objects.filter(pk=courses[2].pk).update(original_price=Decimal("49.95"), discount_percent=15)
+        Course.objects.filter(pk=courses[1].pk).update(discount_percent=0)
+        self.assertMatchesPython()
+
+    def test_bulk_create(self):
+        Course.objects.bulk_create([
+            Course(
+                institute=self.category.institute, category=self.category, title=f"Course {i}",
+                description="test", duration="1 month", level="Beginner", class_type="online",
+                original_price=price, discount_percent=percent,
+            )
+            for i, (price, percent) in enumerate(PRICES)
+        ])
+        self.assertMatchesPython()
+
+    def test_bulk_update(self):
+        courses = [
+            make_course(self.category, title=f"Course {i}", original_price=Decimal("1.00"))
+            for i in range(len(PRICES))
+        ]
+        for course, (price, percent) in zip(courses, PRICES):
+            course.original_price, course.discount_percent = price, percent
+        Course.objects.bulk_update(courses, ["original_price", "discount_percent"])
+        self.assertMatchesPython()
+
+    def test_save_with_update_fields(self):
+        course = make_course(self.category, original_price=Decimal("1234.57"))
+        course.discount_percent = 15
+        course.save(update_fields=["discount_percent"])
+        self.assertMatchesPython([course])
@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import qrcode
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from main.utils import generate_qr, verification
+
+from .helpers import make_admission, make_category, make_course, make_institute, make_user
+
+
+def modules(png, box_size):
+    """Dark/light grid of a QR PNG, sampled at the centre of each module."""
+    with Image.open(BytesIO(png)) as img:
+        img = img.convert("1")
+        n = img.width // box_size
+        return [
+            [img.getpixel((x * box_size + box_size // 2, y * box_size + box_size // 2)) == 0 for x in range(n)]
+            for y in range(n)
+        ]
+
+
+def encoded(data, box_size=4, border=2, error_correction="M"):
+    qr = qrcode.QRCode(
+        error_correction=generate_qr.ERROR_CORRECTION[error_correction], box_size=box_size, border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+@override_settings(SITE_URL="https://admissions.example.com/")
+class AdmissionQrTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        course = make_course(make_category(make_institute()))
+        self.admission = make_admission(make_user("stud"), course, status="accepted")
+
+    def test_code_holds_a_signed_url_that_verifies(self):
+        url = generate_qr.admission_qr_data(self.admission.pk)
+        # No QR reader is installed; compare the printed modules with an encoding of the URL
+        self.assertEqual(modules(generate_qr.admission_qr_png(self.admission.pk), 4), encoded(url))
+
+        parts = urlsplit(url)
+        self.assertEqual(parts.netloc, "admissions.example.com")
+        token = parts.path.rstrip("/").rsplit("/", 1)[1]
+        self.assertEqual(verification.admission_id_from_token(token), self.admission.pk)
+
+        response = self.client.get(parts.path, {"format": "json"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["verified"])
+
+    def test_tampered_url_does_not_verify(self):
+        path = urlsplit(generate_qr.admission_qr_data(self.admission.pk)).path
+        tampered = path.replace(f"/{self.admission.pk}:", f"/{self.admission.pk + 1}:")
+        self.assertNotEqual(tampered, path)
+        response = self.client.get(tampered, {"format": "json"})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.json()["verified"])
+
+    def test_options_are_applied(self):
+        png = generate_qr.admission_qr_png(self.admission.pk, box_size=8, border=4, error_correction="h")
+        url = generate_qr.admission_qr_data(self.admission.pk)
+        self.assertEqual(modules(png, 8), encoded(url, box_size=8, border=4, error_correction="H"))
+        with self.assertRaises(ValueError):
+            generate_qr.admission_qr_png(self.admission.pk, error_correction="X")
+
+    def test_disk_tier_serves_the_same_code(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        expected = generate_qr.admission_qr_png(self.admission.pk)
+        with self.settings(MEDIA_ROOT=tmp, QR_DISK_CACHE=True):
+            self.assertEqual(generate_qr.admission_qr_png(self.admission.pk), expected)
+            # Second call is read back from MEDIA_ROOT/qr/
+            self.assertEqual(generate_qr.admission_qr_png(self.admission.pk), expected)
+            path = generate_qr.generate_qr(self.admission.pk)
+            self.assertTrue(path.startswith(tmp))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), expected)
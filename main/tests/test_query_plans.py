@@ -0,0 +1,34 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from main.management.commands.explain_queries import QUERY_BUDGETS
+
+
+class HotPageQueryTests(TestCase):
+    """
+    Runs explain_queries on a small dataset: every hot page must answer 200
+    within its query budget, without full table scans, and use the hot-path
+    indexes.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hot_pages(self):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest("explain_queries only reads SQLite and PostgreSQL plans")
+        stdout, stderr = StringIO(), StringIO()
+        try:
+            call_command(
+                "explain_queries", courses=30, admissions=120, students=10,
+                stdout=stdout, stderr=stderr,
+            )
+        except CommandError as e:
+            self.fail(f"{e}\n{stdout.getvalue()}{stderr.getvalue()}")
+        for label in QUERY_BUDGETS:
+            self.assertIn(f"{label}: HTTP 200", stdout.getvalue())
@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.contrib import admin, messages
+from django.contrib.messages import get_messages
+from django.test import TestCase
+from django.urls import reverse
+
+from main.models import Admission, Course, Enrollment
+from main.utils import reservations
+
+from .helpers import PASSWORD, make_admission, make_category, make_course, make_institute, make_user
+
+
+class ReservationTestCase(TestCase):
+    def setUp(self):
+        self.owner = make_user("owner")
+        self.course = make_course(make_category(make_institute(owner=self.owner)), seats=1)
+
+    def applicant(self, username, course=None):
+        return make_admission(make_user(username), course or self.course)
+
+    def seats(self):
+        return Course.objects.get(pk=self.course.pk).seats
+
+
+class AcceptAdmissionTests(ReservationTestCase):
+    def test_accept_enrolls_and_takes_a_seat(self):
+        admission = self.applicant("a")
+        result, admission = reservations.accept_admission(admission.pk)
+        self.assertEqual((result, admission.status), (reservations.ACCEPTED, "accepted"))
+        self.assertEqual(self.seats(), 0)
+        self.assertTrue(Enrollment.objects.filter(course=self.course, student__user=admission.user).exists())
+
+    def test_last_seat_goes_to_one_admission(self):
+        first, second = self.applicant("a"), self.applicant("b")
+        self.assertEqual(reservations.accept_admission(first.pk)[0], reservations.ACCEPTED)
+        result, second = reservations.accept_admission(second.pk)
+        self.assertEqual((result, second.status), (reservations.NO_SEATS, "pending"))
+        self.assertEqual(self.seats(), 0)
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 1)
+
+    def test_seat_taken_concurrently_rolls_back_the_enrollment(self):
+        admission = self.applicant("a")
+        # Another accept took the seat after this admission was loaded
+        Course.objects.filter(pk=self.course.pk).update(seats=0)
+        result, admission = reservations.accept_admission(admission.pk)
+        self.assertEqual((result, admission.status), (reservations.NO_SEATS, "pending"))
+        self.assertFalse(Enrollment.objects.exists())
+
+    def test_accepting_twice_keeps_one_seat(self):
+        admission = self.applicant("a")
+        reservations.accept_admission(admission.pk)
+        result, _admission = reservations.accept_admission(admission.pk)
+        self.assertEqual(result, reservations.ALREADY_ACCEPTED)
+        self.assertIn(result, reservations.SUCCESSFUL)
+        self.assertEqual(self.seats(), 0)
+
+    def test_second_admission_for_an_enrolled_course_keeps_the_seat(self):
+        user = make_user("a")
+        first = make_admission(user, self.course)
+        reservations.accept_admission(first.pk)
+        Admission.objects.filter(pk=first.pk).update(status="rejected")
+        second = make_admission(user, self.course)
+        self.assertEqual(reservations.accept_admission(second.pk)[0], reservations.ALREADY_ENROLLED)
+        self.assertEqual(self.seats(), 0)
+
+
+class BulkAcceptTests(ReservationTestCase):
+    def test_seats_go_first_come_first_served(self):
+        Course.objects.filter(pk=self.course.pk).update(seats=2)
+        admissions = [self.applicant(name) for name in "abc"]
+        report = dict(reservations.bulk_update_admissions([a.pk for a in admissions], "accept"))
+        self.assertEqual(
+            [report[a.pk] for a in admissions],
+            [reservations.ACCEPTED, reservations.ACCEPTED, reservations.NO_SEATS],
+        )
+        self.assertEqual(self.seats(), 0)
+        self.assertEqual(Enrollment.objects.count(), 2)
+
+    def test_already_accepted_admissions_are_left_alone(self):
+        admission = self.applicant("a")
+        reservations.accept_admission(admission.pk)
+        report = reservations.bulk_update_admissions([admission.pk], "accept")
+        self.assertEqual(report, [(admission.pk, reservations.ALREADY_ACCEPTED)])
+        self.assertEqual(Enrollment.objects.count(), 1)
+
+
+class AlreadyAcceptedTests(ReservationTestCase):
+    def flashed(self, response):
+        return [(m.level_tag, str(m)) for m in get_messages(response.wsgi_request)]
+
+    def test_manage_student_treats_a_repeat_accept_as_success(self):
+        admission = self.applicant("a")
+        reservations.accept_admission(admission.pk)
+        self.client.login(username="owner", password=PASSWORD)
+        response = self.client.post(reverse("main:manage_student", args=[admission.pk]), {"action": "accept"})
+        self.assertEqual(self.flashed(response), [("success", reservations.MESSAGES[reservations.ALREADY_ACCEPTED])])
+        self.assertEqual(self.seats(), 0)
+
+    def test_admin_save_treats_a_repeat_accept_as_success(self):
+        admission = self.applicant("a")
+        model_admin = admin.site._registry[Admission]
+        # Loaded as pending, accepted by someone else before saving
+        reservations.accept_admission(admission.pk)
+        admission.status = "accepted"
+        form = type("Form", (), {"changed_data": ["status"], "initial": {"status": "pending"}})()
+        with mock.patch.object(model_admin, "message_user") as message_user:
+            model_admin.save_model(None, admission, form, change=True)
+        message_user.assert_called_once_with(
+            None, reservations.MESSAGES[reservations.ALREADY_ACCEPTED], messages.SUCCESS,
+        )
+        self.assertEqual(Admission.objects.get(pk=admission.pk).status, "accepted")
+        self.assertEqual(self.seats(), 0)
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase
+
+from main import routers, views
+from main.models import Admission, Course
+from main.utils import catalog, home_cache, typeahead
+
+from .helpers import make_category, make_course, make_institute
+
+
+class RoutingTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.router = routers.PrimaryReplicaRouter()
+        tokens = routers.begin_request()
+        self.addCleanup(routers.end_request, tokens)
+
+
+class RouterTests(RoutingTestMixin, SimpleTestCase):
+    def test_reads_use_primary_outside_replica_views(self):
+        self.assertEqual(self.router.db_for_read(Course), routers.PRIMARY)
+
+    def test_replica_views_read_catalog_from_replica(self):
+        routers.use_replica()
+        self.assertEqual(self.router.db_for_read(Course), routers.REPLICA)
+        # Admissions and auth data are never behind
+        self.assertEqual(self.router.db_for_read(Admission), routers.PRIMARY)
+        self.assertEqual(self.router.db_for_read(User), routers.PRIMARY)
+
+    def test_write_pins_reads_to_primary(self):
+        routers.use_replica()
+        self.router.db_for_write(Course)
+        self.assertEqual(self.router.db_for_read(Course), routers.PRIMARY)
+
+    def test_end_request_resets_routing(self):
+        tokens = routers.begin_request()
+        routers.use_replica()
+        routers.end_request(tokens)
+        self.assertEqual(self.router.db_for_read(Course), routers.PRIMARY)
+
+    def test_primary_reads_block(self):
+        routers.use_replica()
+        with routers.primary_reads():
+            self.assertEqual(self.router.db_for_read(Course), routers.PRIMARY)
+        self.assertEqual(self.router.db_for_read(Course), routers.REPLICA)
+
+    def test_wants_replica(self):
+        self.assertTrue(routers.wants_replica(views.home))
+        self.assertTrue(routers.wants_replica(views.InstituteDetailView.as_view()))
+        self.assertFalse(routers.wants_replica(views.dashboard))
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate(routers.PRIMARY, "main"))
+        self.assertFalse(self.router.allow_migrate(routers.REPLICA, "main"))
+
+
+class CacheFillTests(RoutingTestMixin, TestCase):
+    """Shared cache entries built during a replica request read from the primary."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        make_course(make_category(make_institute()), title="Physics")
+        routers.use_replica()
+
+    def assert_fills_from_primary(self, target, fill):
+        seen = []
+        original = getattr(target[0], target[1])
+
+        def spy(*args, **kwargs):
+            seen.append(self.router.db_for_read(Course))
+            return original(*args, **kwargs)
+
+        setattr(target[0], target[1], spy)
+        try:
+            fill()
+        finally:
+            setattr(target[0], target[1], original)
+        self.assertEqual(seen, [routers.PRIMARY])
+
+    def test_home_payload(self):
+        self.assert_fills_from_primary((home_cache, "build_home_payload"), home_cache.get_home_payload)
+
+    def test_typeahead(self):
+        self.assert_fills_from_primary((typeahead, "_build_entry"), lambda: typeahead.lookup("phys"))
+
+    def test_catalog_facets(self):
+        filters = catalog.parse_filters(QueryDict())
+        self.assert_fills_from_primary((catalog, "_course_filter"), lambda: catalog.category_facets(filters))
@@ -0,0 +1,55 @@
+import importlib
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core import serializers
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from main.utils import search
+
+from .helpers import make_category, make_course, make_institute
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.institute = make_institute(name="Everest Academy")
+        self.category = make_category(self.institute, title="Science")
+        self.course = make_course(self.category, title="Quantum Physics")
+
+    def test_saved_objects_are_indexed(self):
+        results = search.search("quant")
+        self.assertEqual(results["courses"], [self.course])
+        self.assertEqual(search.search("everest")["institutes"], [self.institute])
+
+    def test_deleted_objects_leave_the_index(self):
+        self.course.delete()
+        self.assertEqual(search.search("quantum")["courses"], [])
+
+    def test_fixture_loads_leave_the_index_alone(self):
+        fixture = serializers.serialize("json", [self.course])
+        pk = self.course.pk
+        self.course.delete()
+        for obj in serializers.deserialize("json", fixture):
+            obj.save()  # raw save, as loaddata does
+        self.assertEqual(search.search("quantum")["courses"], [])
+
+        search.rebuild_index()
+        self.assertEqual([c.pk for c in search.search("quantum")["courses"]], [pk])
+
+    def test_migration_backfills_existing_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.INDEX_TABLE}")
+        self.assertEqual(search.search("quantum")["courses"], [])
+
+        migration = importlib.import_module("main.migrations.0003_search_index")
+        migration.create_search_index(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual(search.search("quantum")["courses"], [self.course])
+        self.assertEqual(search.search("science")["categories"], [self.category])
+
+    def test_ajax_search_renders_matches(self):
+        response = self.client.get(reverse("main:ajax_search"), {"q": "quantum"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Quantum Physics", response.json()["html"])
@@ -0,0 +1,46 @@
+import os
+import shutil
+import tempfile
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase
+
+from main.utils import sqlite_tuning
+
+
+SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite only")
+@skipUnless(getattr(settings, "SQLITE_PRAGMAS", None), "SQLITE_TUNING is off")
+class ConnectionProfileTests(SimpleTestCase):
+    # Only throwaway connections below; the test database is never touched
+    databases = {"default"}
+
+    def open(self):
+        """A new connection to a file database (the test database is in memory and can't use WAL)."""
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        wrapper = DatabaseWrapper({**connection.settings_dict, "NAME": os.path.join(tmp, "db.sqlite3")})
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def test_new_connections_get_the_pragmas(self):
+        wrapper = self.open()
+        pragmas = settings.SQLITE_PRAGMAS
+        self.assertEqual(sqlite_tuning.current(wrapper, "journal_mode"), "wal")
+        self.assertEqual(sqlite_tuning.current(wrapper, "busy_timeout"), pragmas["busy_timeout"])
+        self.assertEqual(sqlite_tuning.current(wrapper, "synchronous"), SYNCHRONOUS[pragmas["synchronous"].upper()])
+        self.assertEqual(sqlite_tuning.current(wrapper, "cache_size"), pragmas["cache_size"])
+
+    def test_writes_begin_immediate(self):
+        self.assertEqual(self.open().transaction_mode, "IMMEDIATE")
+
+    def test_transaction_mode_override_is_restored(self):
+        with sqlite_tuning.transaction_mode(None):
+            self.assertIsNone(self.open().transaction_mode)
+        self.assertEqual(self.open().transaction_mode, "IMMEDIATE")
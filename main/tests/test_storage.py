@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from main.models import Course, StoredFile
+from main.utils import storage
+
+from .helpers import make_category, make_course, make_institute
+
+
+def upload(color, name="photo.png"):
+    out = BytesIO()
+    Image.new("RGB", (8, 8), color).save(out, format="PNG")
+    return SimpleUploadedFile(name, out.getvalue(), content_type="image/png")
+
+
+class DedupStorageTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        settings_override = override_settings(MEDIA_ROOT=tmp, IMAGE_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.category = make_category(make_institute())
+        self.store = storage.dedup_storage()
+
+    def stored(self, name):
+        return StoredFile.objects.filter(name=name).values_list("refcount", flat=True).first()
+
+    def test_identical_uploads_share_one_blob(self):
+        first = make_course(self.category, title="A", image=upload("red", "a.png"))
+        second = make_course(self.category, title="B", image=upload("red", "b.png"))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(storage.is_blob(first.image.name))
+        self.assertEqual(self.stored(first.image.name), 2)
+
+    def test_deleting_drops_one_reference_then_the_blob(self):
+        first = make_course(self.category, title="A", image=upload("red"))
+        second = make_course(self.category, title="B", image=upload("red"))
+        name = first.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.stored(name), 1)
+        self.assertTrue(self.store.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertIsNone(self.stored(name))
+        self.assertFalse(self.store.exists(name))
+
+    def test_replacing_a_file_releases_the_old_one(self):
+        course = make_course(self.category, image=upload("red"))
+        old = course.image.name
+        course.image = upload("blue")
+        with self.captureOnCommitCallbacks(execute=True):
+            course.save()
+        self.assertNotEqual(course.image.name, old)
+        self.assertIsNone(self.stored(old))
+        self.assertFalse(self.store.exists(old))
+        self.assertEqual(self.stored(course.image.name), 1)
+
+    def test_saving_without_changes_keeps_the_reference(self):
+        course = make_course(self.category, image=upload("red"))
+        course.title = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            course.save()
+        self.assertEqual(self.stored(course.image.name), 1)
+
+    def test_reuploading_the_same_content_keeps_the_blob(self):
+        course = make_course(self.category, image=upload("red"))
+        name = course.image.name
+        course.image = upload("red", "again.png")
+        with self.captureOnCommitCallbacks(execute=True):
+            course.save()
+        self.assertEqual(course.image.name, name)
+        self.assertEqual(self.stored(name), 1)
+        self.assertTrue(self.store.exists(name))
+
+    def test_referenced_checks_every_name_in_one_query(self):
+        course = make_course(self.category, image=upload("red"))
+        names = [course.image.name] + [f"renditions/x/w{w}.jpg" for w in range(7)]
+        with self.assertNumQueries(1):
+            self.assertEqual(storage.referenced(names), {course.image.name})
+
+    def test_reconcile_repairs_refcounts(self):
+        course = make_course(self.category, image=upload("red"))
+        StoredFile.objects.filter(name=course.image.name).update(refcount=5)
+        self.assertEqual(storage.reconcile(), (1, 0))
+        self.assertEqual(self.stored(course.image.name), 1)
+        Course.objects.filter(pk=course.pk).update(image="")
+        self.assertEqual(storage.reconcile(), (0, 1))
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from main.utils import typeahead
+
+from .helpers import make_category, make_course, make_institute
+
+
+class TypeaheadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = make_category(make_institute(name="Lotus Academy"), title="Hospitality")
+        self.course = make_course(self.category, title="Café Management")
+
+    def titles(self, payload):
+        return [row[1] for row in payload["courses"]]
+
+    def test_repeated_query_is_a_cache_hit(self):
+        _payload, source = typeahead.lookup("manage")
+        self.assertEqual(source, "miss")
+        with self.assertNumQueries(0):
+            payload, source = typeahead.lookup("Manage ")
+        self.assertEqual(source, "hit")
+        self.assertEqual(self.titles(payload), ["Café Management"])
+
+    def test_narrowing_folds_accents_and_case(self):
+        typeahead.lookup("caf")
+        for query in ("cafe", "CAFÉ", "café man"):
+            payload, source = typeahead.lookup(query)
+            self.assertEqual(source, "prefix")
+            self.assertEqual(self.titles(payload), ["Café Management"], query)
+
+    def test_narrowed_results_match_a_fresh_lookup(self):
+        typeahead.lookup("caf")
+        narrowed, _source = typeahead.lookup("cafe")
+        cache.clear()
+        fresh, source = typeahead.lookup("cafe")
+        self.assertEqual(source, "miss")
+        self.assertEqual(narrowed["courses"], fresh["courses"])
+
+    def test_saves_retire_cached_entries(self):
+        typeahead.lookup("manage")
+        make_course(self.category, title="Hotel Management")
+        payload, source = typeahead.lookup("manage")
+        self.assertEqual(source, "miss")
+        self.assertEqual(sorted(self.titles(payload)), ["Café Management", "Hotel Management"])
+
+    def test_search_api_reports_cache_source(self):
+        url = reverse("main:search_api")
+        self.assertEqual(self.client.get(url, {"q": "lotus"})["X-Search-Cache"], "miss")
+        response = self.client.get(url, {"q": "lotus"})
+        self.assertEqual(response["X-Search-Cache"], "hit")
+        self.assertEqual([row[1] for row in response.json()["institutes"]], ["Lotus Academy"])
@@ -0,0 +1,168 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from main.models import Admission, AdmissionDocument, UploadSession
+from main.utils import uploads
+
+from .helpers import PASSWORD, make_admission, make_category, make_course, make_institute, make_user
+
+
+class UploadTestCase(TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        settings_override = override_settings(
+            MEDIA_ROOT=os.path.join(tmp, "media"), UPLOAD_SESSION_DIR=os.path.join(tmp, "uploads"),
+            UPLOAD_CHUNK_SIZE=4, UPLOAD_MAX_SESSIONS=3, IMAGE_WORKERS=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = make_user("student")
+        self.client.login(username="student", password=PASSWORD)
+        self.course = make_course(make_category(make_institute()))
+
+    def create(self, size=6, doc_type="marksheet"):
+        return self.client.post(
+            reverse("main:create_upload"),
+            json.dumps({"doc_type": doc_type, "filename": "marks.pdf", "size": size}),
+            content_type="application/json",
+        )
+
+    def put(self, session_id, data, start, size=6, **extra):
+        return self.client.put(
+            reverse("main:upload_session", args=[session_id]), data,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(data) - 1}/{size}",
+            **extra,
+        )
+
+    def completed(self, data=b"abcdef"):
+        session = uploads.create_session(self.user, "marksheet", "marks.pdf", len(data))
+        for start in range(0, len(data), 4):
+            chunk = data[start:start + 4]
+            session = uploads.write_chunk(session, _Stream(chunk), f"bytes {start}-{start + len(chunk) - 1}/{len(data)}")
+        return session
+
+
+class _Stream:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, size=-1):
+        data, self.data = (self.data, b"") if size < 0 else (self.data[:size], self.data[size:])
+        return data
+
+
+class ChunkedUploadTests(UploadTestCase):
+    def test_chunks_resume_and_complete(self):
+        session_id = self.create().json()["id"]
+        self.assertEqual(self.put(session_id, b"abcd", 0).json()["received"], 4)
+        # A retried chunk overlapping stored bytes only adds the new ones
+        body = self.put(session_id, b"cdef", 2).json()
+        self.assertEqual((body["received"], body["status"]), (6, uploads.COMPLETE))
+        with open(uploads.part_path(UploadSession.objects.get(pk=session_id)), "rb") as f:
+            self.assertEqual(f.read(), b"abcdef")
+
+    def test_chunk_past_received_bytes_is_refused(self):
+        session_id = self.create().json()["id"]
+        response = self.put(session_id, b"ef", 4)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["received"], 0)
+
+    def test_content_length_must_match_content_range(self):
+        session_id = self.create().json()["id"]
+        response = self.put(session_id, b"abcd", 0, CONTENT_LENGTH="3")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).received, 0)
+
+    def test_oversized_chunk_is_refused_from_its_headers(self):
+        session_id = self.create().json()["id"]
+        response = self.put(session_id, b"abcdef", 0)
+        self.assertEqual(response.status_code, 413)
+
+    def test_oversized_create_body_is_refused(self):
+        response = self.client.post(
+            reverse("main:create_upload"),
+            json.dumps({"doc_type": "marksheet", "filename": "x" * uploads.CREATE_BODY_MAX, "size": 6}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_open_sessions_per_user_are_limited(self):
+        for _ in range(3):
+            self.assertEqual(self.create().status_code, 201)
+        response = self.create()
+        self.assertEqual(response.status_code, 429)
+        # Cancelling one makes room again
+        uploads.abort(UploadSession.objects.filter(user=self.user).first())
+        self.assertEqual(self.create().status_code, 201)
+
+    def test_attached_sessions_do_not_count_towards_the_limit(self):
+        admission = make_admission(self.user, self.course)
+        for _ in range(3):
+            uploads.attach(self.completed(), admission)
+        self.assertEqual(self.create().status_code, 201)
+
+
+class AttachTests(UploadTestCase):
+    def test_attach_moves_the_part_into_a_document(self):
+        session = self.completed()
+        document = uploads.attach(session, make_admission(self.user, self.course))
+        with document.file.open("rb") as f:
+            self.assertEqual(f.read(), b"abcdef")
+        self.assertFalse(os.path.exists(uploads.part_path(session)))
+        session.refresh_from_db()
+        self.assertEqual((session.status, session.document), (uploads.ATTACHED, document))
+
+    def test_attaching_twice_is_a_conflict(self):
+        session = self.completed()
+        admission = make_admission(self.user, self.course)
+        uploads.attach(session, admission)
+        # A second submit that loaded the session before the first attached it
+        with self.assertRaises(uploads.UploadError) as raised:
+            uploads.attach(session, admission)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertEqual(AdmissionDocument.objects.count(), 1)
+
+    def form_data(self, session):
+        return {
+            "student_name": "Student", "email": "student@example.com", "phone": "0",
+            "gender": "other", "institute": self.course.institute_id,
+            "category": self.course.category_id, "course": self.course.pk,
+            "marksheet_upload": str(session.pk),
+        }
+
+    def test_admission_form_attaches_the_session(self):
+        session = self.completed()
+        response = self.client.post(reverse("main:admission_form"), self.form_data(session))
+        admission = Admission.objects.get()
+        self.assertRedirects(response, reverse("main:esewa_payment", args=[admission.pk]), fetch_redirect_response=False)
+        self.assertEqual(admission.documents.get().doc_type, "marksheet")
+
+    def test_resubmitting_an_attached_session_is_refused(self):
+        session = self.completed()
+        data = self.form_data(session)
+        self.client.post(reverse("main:admission_form"), data)
+        response = self.client.post(reverse("main:admission_form"), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("can no longer be used", " ".join(str(m) for m in get_messages(response.wsgi_request)))
+        self.assertEqual(Admission.objects.count(), 1)
+
+    def test_concurrent_attach_rolls_the_admission_back(self):
+        session = self.completed()
+        uploads.attach(session, make_admission(self.user, self.course))
+        # The other request read the session while it was still complete
+        session.status = uploads.COMPLETE
+        stale = lambda user, session_id, doc_type: session if doc_type == "marksheet" else None
+        with mock.patch.object(uploads, "completed_session", stale):
+            response = self.client.post(reverse("main:admission_form"), self.form_data(session))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Admission.objects.count(), 1)
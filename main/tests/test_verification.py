@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from main.utils import verification
+
+from .helpers import make_admission, make_category, make_course, make_institute, make_user
+
+
+class VerificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.institute = make_institute(name="Everest Academy")
+        self.course = make_course(make_category(self.institute), title="Physics")
+        self.admission = make_admission(make_user("stud"), self.course, status="accepted")
+        self.token = verification.make_token(self.admission.pk)
+
+    def test_token_round_trip(self):
+        self.assertEqual(verification.admission_id_from_token(self.token), self.admission.pk)
+
+    def test_forged_token_never_reaches_database(self):
+        forged = f"{self.admission.pk + 1}:{self.token.split(':', 1)[1]}"
+        with self.assertNumQueries(0):
+            self.assertIsNone(verification.verify(forged))
+            self.assertIsNone(verification.verify("garbage"))
+
+    def test_record_is_cached(self):
+        verification.verify(self.token)
+        with self.assertNumQueries(0):
+            record = verification.verify(self.token)
+        self.assertEqual(record["course"], "Physics")
+        self.assertTrue(record["verified"])
+
+    def test_admission_save_updates_record(self):
+        verification.verify(self.token)
+        self.admission.status = "rejected"
+        self.admission.save()
+        self.assertFalse(verification.verify(self.token)["verified"])
+
+    def test_course_and_institute_saves_outdate_record(self):
+        verification.verify(self.token)
+        self.course.title = "Advanced Physics"
+        self.course.save()
+        self.assertEqual(verification.verify(self.token)["course"], "Advanced Physics")
+        self.institute.name = "Himalaya Academy"
+        self.institute.save()
+        self.assertEqual(verification.verify(self.token)["institute"], "Himalaya Academy")
+
+    def test_evicted_version_outdates_record(self):
+        verification.verify(self.token)
+        cache.delete(verification.VERSION_KEY.format("course", self.course.pk))
+        with self.assertNumQueries(1):
+            verification.verify(self.token)
+
+    def test_warm_fills_records(self):
+        verification.warm([self.admission.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(verification.verify(self.token)["institute"], "Everest Academy")
+
+    def test_deleted_admission_is_not_found(self):
+        self.admission.delete()
+        self.assertEqual(verification.verify(self.token)["status"], "not_found")
+
+    def test_view_rejects_forged_token(self):
+        url = reverse("main:verify_admission", args=["garbage"])
+        response = self.client.get(url, {"format": "json"})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["status"], "invalid")
+
+    def test_revocation_is_seen_on_the_next_scan(self):
+        url = reverse("main:verify_admission", args=[self.token])
+        for params in ({}, {"format": "json"}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                cache_control = response["Cache-Control"]
+                for directive in ("no-cache", "no-store", "must-revalidate", "private"):
+                    self.assertIn(directive, cache_control)
+                self.assertNotIn("max-age=60", cache_control)
+
+        self.admission.status = "rejected"
+        self.admission.save()
+        self.assertFalse(self.client.get(url, {"format": "json"}).json()["verified"])
@@ -15,6 +15,7 @@ urlpatterns = [
     # -----------------------------
     path("", views.home, name="home"),
     path('ajax-search/', views.ajax_search, name='ajax_search'),
+    path('api/search/', views.search_api, name='search_api'),
 
     # -----------------------------
     # Courses
@@ -81,6 +82,7 @@ urlpatterns = [
     # Student Management
     # -----------------------------
     path("student/manage/<int:admission_id>/", views.manage_student, name="manage_student"),
+    path("student/manage/bulk/", views.bulk_manage_students, name="bulk_manage_students"),
 
     # -----------------------------
     # CourseCategory CRUD
@@ -114,6 +116,8 @@ urlpatterns = [
     # Admission Form
     # -----------------------------
     path("admission/form/", views.admission_form, name="admission_form"),
+    path("uploads/", views.create_upload, name="create_upload"),
+    path("uploads/<uuid:session_id>/", views.upload_session, name="upload_session"),
     path('admission/<int:admission_id>/delete/', views.delete_admission, name='delete_admission'),
 
 
@@ -122,6 +126,9 @@ urlpatterns = [
     # Offer Letter PDF
     # -----------------------------
     path("admission/<int:admission_id>/offer-letter/download/", views.download_offer_letter, name="download_offer_letter"),
+    path("admission/<int:admission_id>/offer-letter/status/", views.offer_letter_status, name="offer_letter_status"),
+    path("offer-letters/export/", views.export_offer_letters, name="export_offer_letters"),
+    path("verify/admission/<str:token>/", views.verify_admission, name="verify_admission"),
 
     # -----------------------------
     # AJAX Dynamic Loading
@@ -0,0 +1,53 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+
+# Small named thread pools for work that should not run on the request
+# thread (offer letter PDFs, image renditions). Each pool is created on
+# first use; a pool sized 0 means the work is left to a management command.
+# Tasks get their own database connection, closed when they finish.
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def _run(name, fn, args):
+    try:
+        return fn(*args)
+    except Exception:
+        logger.exception("Background task in %s failed", name)
+        return None
+    finally:
+        connection.close()
+
+
+def submit(name, max_workers, fn, *args):
+    """
+    Run ``fn(*args)`` on the ``name`` pool. Returns the Future (its result is
+    None if ``fn`` raised), or None if the pool is disabled.
+    """
+    if max_workers <= 0:
+        return None
+    with _lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=name,
+            )
+    return executor.submit(_run, name, fn, args)
+
+
+def submit_later(delay, name, max_workers, fn, *args):
+    """submit() after ``delay`` seconds, for retry backoff."""
+    if max_workers <= 0:
+        return None
+    timer = threading.Timer(delay, submit, args=(name, max_workers, fn, *args))
+    timer.daemon = True
+    timer.start()
+    return timer
@@ -0,0 +1,92 @@
+import base64
+import hashlib
+import logging
+from io import BytesIO
+
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from main.models import InstituteBranding
+
+
+logger = logging.getLogger(__name__)
+
+
+# Institute signature, stamp and logo as used on offer letters. Uploads can
+# be multi-megabyte photos, but the letter prints them at a few dozen pixels,
+# so each one is resized once, encoded as PNG/base64 and kept on an
+# InstituteBranding row. Institute saves rebuild the row when one of the
+# image fields changed; rendering rebuilds it lazily if it is missing or
+# was made from different files.
+
+# image field -> (asset attribute, bounding box in px). Boxes are about 4x
+# the size offer_letter.html prints them at.
+ASSETS = {
+    "signature": ("signature_base64", (320, 120)),
+    "stamp": ("stamp_base64", (200, 200)),
+    "profile_logo": ("logo_base64", (240, 240)),
+}
+
+
+def sources_for(institute):
+    return {field: getattr(institute, field).name or "" for field in ASSETS}
+
+
+def encode_image(image_field, size):
+    """Resize an uploaded image to fit ``size`` and return it as base64 PNG."""
+    if not image_field:
+        return ""
+    try:
+        with image_field.open("rb") as f, Image.open(f) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail(size, Image.LANCZOS)
+            if img.mode not in ("RGB", "RGBA", "L", "LA"):
+                img = img.convert("RGBA")
+            out = BytesIO()
+            img.save(out, format="PNG", optimize=True)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not encode %s: %s", image_field.name, e)
+        return ""
+    return base64.b64encode(out.getvalue()).decode("ascii")
+
+
+def rebuild(institute):
+    """Re-encode every branding image for ``institute`` and store the result."""
+    values = {}
+    for field, (attr, size) in ASSETS.items():
+        values[attr] = encode_image(getattr(institute, field), size)
+    digest = hashlib.sha256(
+        "\0".join(values[attr] for attr, _size in ASSETS.values()).encode("ascii")
+    ).hexdigest()
+    branding, _created = InstituteBranding.objects.update_or_create(
+        institute=institute,
+        defaults={**values, "sources": sources_for(institute), "digest": digest},
+    )
+    institute.branding = branding
+    return branding
+
+
+def _cached(institute):
+    try:
+        return institute.branding
+    except InstituteBranding.DoesNotExist:
+        return None
+
+
+def is_current(branding, institute):
+    return branding is not None and branding.sources == sources_for(institute)
+
+
+def branding_for(institute):
+    """The institute's InstituteBranding, rebuilt first if it is stale."""
+    branding = _cached(institute)
+    if not is_current(branding, institute):
+        branding = rebuild(institute)
+    return branding
+
+
+def refresh_on_save(institute):
+    """Schedule a rebuild after commit if the saved images differ from the stored assets."""
+    branding = InstituteBranding.objects.filter(institute=institute).first()
+    if not is_current(branding, institute):
+        transaction.on_commit(lambda: rebuild(institute))
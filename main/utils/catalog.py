@@ -0,0 +1,180 @@
+import base64
+import binascii
+import hashlib
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from main.models import Course, CourseCategory
+from main.routers import primary_reads
+from main.utils.home_cache import catalog_version
+
+
+# Keyset-paginated course catalog. Pages are addressed by an opaque cursor
+# holding the sort key of the last row shown, so every page costs the same
+# indexed range scan no matter how deep the user has scrolled.
+
+PAGE_SIZE = 12
+MAX_PAGE_SIZE = 48
+
+# sort name -> (order_by, key field, descending). Price sorts use the stored
+# discount_price column (kept current by utils/pricing.py) so they can walk
+# the (discount_price, id) index instead of ordering on a computed expression.
+SORTS = {
+    "newest": (("-id",), "id", True),
+    "price": (("discount_price", "id"), "discount_price", False),
+    "-price": (("-discount_price", "-id"), "discount_price", True),
+}
+DEFAULT_SORT = "newest"
+
+LEVELS = [value for value, _label in Course._meta.get_field("level").choices]
+CLASS_TYPES = [value for value, _label in Course._meta.get_field("class_type").choices]
+
+
+# -----------------------------------
+# Parameters
+# -----------------------------------
+def _decimal(value):
+    if value in (None, ""):
+        return None
+    try:
+        value = Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return value if value.is_finite() and value >= 0 else None
+
+
+def _positive_int(value, default, maximum):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(value, 1), maximum)
+
+
+def parse_filters(params):
+    """Clean catalog filters from a QueryDict; unknown values are dropped."""
+    level = params.get("level")
+    class_type = params.get("class_type")
+    sort = params.get("sort")
+    return {
+        "category": params.get("category") or None,
+        "level": level if level in LEVELS else None,
+        "class_type": class_type if class_type in CLASS_TYPES else None,
+        "min_price": _decimal(params.get("min_price")),
+        "max_price": _decimal(params.get("max_price")),
+        "sort": sort if sort in SORTS else DEFAULT_SORT,
+        "page_size": _positive_int(params.get("page_size"), PAGE_SIZE, MAX_PAGE_SIZE),
+    }
+
+
+def encode_cursor(sort, value, pk):
+    raw = json.dumps([sort, str(value), pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """Return (value, pk) for a cursor made for ``sort``, or None (also for tampered ones)."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, pk = json.loads(raw)
+        if cursor_sort != sort or type(pk) is not int:
+            return None
+        value = int(value) if SORTS[sort][1] == "id" else _decimal(value)
+    except (binascii.Error, ValueError, TypeError, ArithmeticError):
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+# -----------------------------------
+# Queries
+# -----------------------------------
+def _course_filter(filters, prefix=""):
+    q = Q()
+    if filters["level"]:
+        q &= Q(**{f"{prefix}level": filters["level"]})
+    if filters["class_type"]:
+        q &= Q(**{f"{prefix}class_type": filters["class_type"]})
+    if filters["min_price"] is not None:
+        q &= Q(**{f"{prefix}discount_price__gte": filters["min_price"]})
+    if filters["max_price"] is not None:
+        q &= Q(**{f"{prefix}discount_price__lte": filters["max_price"]})
+    return q
+
+
+# Filters the facet counts depend on; category, sort and page size don't
+FACET_FILTERS = ("level", "class_type", "min_price", "max_price")
+
+
+def _facet_cache_key(filters):
+    values = json.dumps([str(filters[name]) for name in FACET_FILTERS])
+    digest = hashlib.sha1(values.encode()).hexdigest()
+    return f"catalog:facets:{catalog_version()}:{digest}"
+
+
+def category_facets(filters):
+    """
+    Distinct category titles with the number of matching courses. Cached per
+    filter set until the catalog changes (see home_cache.catalog_version).
+    """
+    key = _facet_cache_key(filters)
+    facets = cache.get(key)
+    if facets is None:
+        with primary_reads():
+            facets = list(
+                CourseCategory.objects
+                .values("title")
+                .annotate(course_count=Count("courses", filter=_course_filter(filters, "courses__")))
+                .order_by("title")
+            )
+        cache.set(key, facets, getattr(settings, "CATALOG_FACET_CACHE_TIMEOUT", 300))
+    return facets
+
+
+def _after(sort, value, pk):
+    _order, field, descending = SORTS[sort]
+    if field == "id":
+        return Q(id__lt=pk) if descending else Q(id__gt=pk)
+    if descending:
+        return Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk})
+    return Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk})
+
+
+def course_page(filters, cursor=None):
+    """
+    Return {"courses": [...], "next_cursor": str or None} for one page of
+    the catalog.
+    """
+    sort = filters["sort"]
+    order_by, field, _descending = SORTS[sort]
+
+    courses = (
+        Course.objects
+        .select_related("category", "institute")
+        .with_final_price()
+        .filter(_course_filter(filters))
+    )
+    if filters["category"]:
+        courses = courses.filter(category__title=filters["category"])
+
+    position = decode_cursor(cursor, sort)
+    if position is not None:
+        courses = courses.filter(_after(sort, *position))
+
+    page_size = filters["page_size"]
+    rows = list(courses.order_by(*order_by)[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, field), last.id)
+
+    return {"courses": rows, "next_cursor": next_cursor}
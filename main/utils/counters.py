@@ -0,0 +1,156 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+# Denormalised enrollment/admission counters kept on Course and Institute.
+# Signal handlers call the apply_* helpers with F() updates so concurrent
+# requests never lose an increment. The state an admission moves from is
+# read from its locked row inside the save (or delete), not from the
+# instance, so a stale copy cannot count a transition twice. The ``recount``
+# management command rebuilds every counter from the source tables, for
+# changes that bypass the signals (queryset .update(), raw SQL).
+
+STATUS_COUNTERS = {
+    "pending": "pending_count",
+    "shortlisted": "shortlisted_count",
+    "accepted": "accepted_count",
+    "rejected": "rejected_count",
+}
+PAID_COUNTER = "paid_count"
+ENROLLED_COUNTER = "enrolled_count"
+
+COUNTER_FIELDS = (ENROLLED_COUNTER, *STATUS_COUNTERS.values(), PAID_COUNTER)
+
+# Admission attributes the counters depend on
+COUNTER_STATE_FIELDS = ("course_id", "institute_id", "status", "is_paid")
+
+
+# -----------------------------------
+# Model saves
+# -----------------------------------
+def save_kwargs_without_counters(instance, kwargs):
+    """
+    Keep Model.save() from writing back stale counter values: saves of an
+    existing row only touch the non-counter fields unless the caller chose
+    update_fields itself.
+    """
+    if instance._state.adding or kwargs.get("update_fields") is not None:
+        return kwargs
+    kwargs["update_fields"] = [
+        f.name for f in instance._meta.concrete_fields
+        if not f.primary_key and f.name not in COUNTER_FIELDS
+    ]
+    return kwargs
+
+
+# -----------------------------------
+# Incremental updates
+# -----------------------------------
+def stored_admission_state(model, pk):
+    """
+    admission_state() of the row as stored, or None if it is gone. Taken
+    from the database rather than the instance being saved, so a stale
+    instance cannot apply the same transition twice. Locks the row.
+    """
+    return model.objects.select_for_update().filter(pk=pk).values(*COUNTER_STATE_FIELDS).first()
+
+
+def admission_state(admission):
+    """Snapshot of the admission fields the counters depend on."""
+    return {
+        "course_id": admission.course_id,
+        "institute_id": admission.institute_id,
+        "status": admission.status,
+        "is_paid": admission.is_paid,
+    }
+
+
+def _admission_counts(state):
+    counts = {}
+    if state is None:
+        return counts
+    field = STATUS_COUNTERS.get(state["status"])
+    if field:
+        counts[field] = 1
+    if state["is_paid"]:
+        counts[PAID_COUNTER] = 1
+    return counts
+
+
+def admission_deltas(before, after):
+    """
+    Counter deltas for an admission moving from ``before`` to ``after``
+    (either may be None for create/delete). Returns
+    {"course": {pk: {field: delta}}, "institute": {pk: {field: delta}}}.
+    """
+    deltas = {"course": {}, "institute": {}}
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None:
+            continue
+        for field, n in _admission_counts(state).items():
+            for target, pk in (("course", state["course_id"]), ("institute", state["institute_id"])):
+                if pk is None:
+                    continue
+                row = deltas[target].setdefault(pk, {})
+                row[field] = row.get(field, 0) + sign * n
+
+    # Drop the fields that cancelled out
+    for target in deltas.values():
+        for pk in list(target):
+            target[pk] = {f: d for f, d in target[pk].items() if d}
+            if not target[pk]:
+                del target[pk]
+    return deltas
+
+
+def _shift(field, delta):
+    if delta < 0:
+        # Never go below zero even if the counters have drifted
+        return Greatest(F(field) + delta, Value(0))
+    return F(field) + delta
+
+
+def apply_counter_deltas(model, pk, deltas):
+    if pk is None or not deltas:
+        return
+    model.objects.filter(pk=pk).update(
+        **{field: _shift(field, delta) for field, delta in deltas.items()}
+    )
+
+
+def apply_admission_deltas(course_model, institute_model, before, after):
+    deltas = admission_deltas(before, after)
+    for pk, fields in deltas["course"].items():
+        apply_counter_deltas(course_model, pk, fields)
+    for pk, fields in deltas["institute"].items():
+        apply_counter_deltas(institute_model, pk, fields)
+
+
+# -----------------------------------
+# Full recount
+# -----------------------------------
+def _count_subquery(model, fk, condition=None):
+    qs = model.objects.filter(**{fk: OuterRef("pk")})
+    if condition is not None:
+        qs = qs.filter(condition)
+    counted = qs.order_by().values(fk).annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def _recount_target(target_model, fk, admission_model, enrollment_model):
+    values = {ENROLLED_COUNTER: _count_subquery(enrollment_model, fk)}
+    for status, field in STATUS_COUNTERS.items():
+        values[field] = _count_subquery(admission_model, fk, Q(status=status))
+    values[PAID_COUNTER] = _count_subquery(admission_model, fk, Q(is_paid=True))
+    return target_model.objects.update(**values)
+
+
+def recount(course_model, institute_model, admission_model, enrollment_model):
+    """
+    Rebuild every counter with one correlated UPDATE per table. Models are
+    passed in so migrations can run this against historical models.
+    """
+    return {
+        "courses": _recount_target(course_model, "course", admission_model, enrollment_model),
+        "institutes": _recount_target(institute_model, "institute", admission_model, enrollment_model),
+    }
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from main.models import Institute
+from main.routers import PRIMARY
+
+
+# The approved institute owned by the logged-in user, needed by the navbar
+# on every page and by all institute-owner views. CurrentInstituteMiddleware
+# puts a lazy ``request.institute`` on each request; the first access looks
+# the user up in a per-user cache entry and only queries on a miss. The
+# entry is dropped whenever one of the user's institutes is saved or
+# deleted (see signals.py), so status changes show up immediately.
+
+CACHE_KEY = "current_institute:user:{}"
+
+# Cached for users without an approved institute
+NONE = "none"
+
+
+def _timeout():
+    return getattr(settings, "CURRENT_INSTITUTE_CACHE_TIMEOUT", 300)
+
+
+def cache_key(user_id):
+    return CACHE_KEY.format(user_id)
+
+
+def approved_institute_for(user):
+    """The user's approved institute (oldest first), or None."""
+    if not user.is_authenticated:
+        return None
+    key = cache_key(user.pk)
+    institute = cache.get(key)
+    if institute is None:
+        # From the primary: a lagging replica could re-cache an old status
+        institute = (
+            Institute.objects.using(PRIMARY)
+            .filter(owner__user_id=user.pk, status="approved")
+            .order_by("pk")
+            .first()
+        )
+        cache.set(key, institute or NONE, _timeout())
+    return None if institute == NONE else institute
+
+
+def current_institute(request):
+    """
+    The request user's approved institute, looked up once per request.
+    Views use this rather than ``request.institute`` when they need the
+    model instance itself, e.g. as a queryset filter value.
+    """
+    if not hasattr(request, "_cached_institute"):
+        request._cached_institute = approved_institute_for(request.user)
+    return request._cached_institute
+
+
+def invalidate(user_id):
+    cache.delete(cache_key(user_id))
@@ -1,13 +1,124 @@
-import qrcode
+import base64
+import hashlib
 import os
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
 from django.conf import settings
 
-def generate_qr(admission_id):
-    data = f"https://yourdomain.com/verify/admission/{admission_id}/"
-    img = qrcode.make(data)
+from main.utils import verification
+
+
+# QR codes for admissions. Encoding is pure CPU work and the same admission
+# is encoded again on every offer letter render, so PNG bytes are kept in a
+# bounded in-process LRU keyed on (data, options) and, with QR_DISK_CACHE
+# on, in MEDIA_ROOT/qr/ so they survive restarts and are shared between
+# processes. Offer letters print the code at ~45px, so the defaults use a
+# small box size; callers that need print-quality codes pass their own.
+
+ERROR_CORRECTION = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+DEFAULT_OPTIONS = {"box_size": 4, "border": 2, "error_correction": "M"}
+
+
+def admission_qr_data(admission_id):
+    """Signed verification URL for an admission (see utils/verification.py)."""
+    return f"{settings.SITE_URL.rstrip('/')}/verify/admission/{verification.make_token(admission_id)}/"
+
+
+# -----------------------------------
+# Encoding
+# -----------------------------------
+@lru_cache(maxsize=getattr(settings, "QR_CACHE_SIZE", 512))
+def _encode(data, box_size, border, error_correction):
+    qr = qrcode.QRCode(
+        error_correction=ERROR_CORRECTION[error_correction],
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    buffer = BytesIO()
+    qr.make_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _options(box_size=None, border=None, error_correction=None):
+    options = {
+        "box_size": box_size or DEFAULT_OPTIONS["box_size"],
+        "border": DEFAULT_OPTIONS["border"] if border is None else border,
+        "error_correction": (error_correction or DEFAULT_OPTIONS["error_correction"]).upper(),
+    }
+    if options["error_correction"] not in ERROR_CORRECTION:
+        raise ValueError(f"Unknown error correction level: {error_correction}")
+    return options
+
+
+def qr_png(data, **options):
+    """PNG bytes for ``data``; options are box_size, border and error_correction (L/M/Q/H)."""
+    options = _options(**options)
+    return _encode(data, options["box_size"], options["border"], options["error_correction"])
+
+
+def qr_base64(data, **options):
+    return base64.b64encode(qr_png(data, **options)).decode("ascii")
+
+
+# -----------------------------------
+# Admissions
+# -----------------------------------
+def _disk_path(admission_id, data, options):
+    # The digest covers the encoded URL too, so a new SITE_URL or signing
+    # key never serves an old file
+    digest = hashlib.sha1(repr((data, sorted(options.items()))).encode()).hexdigest()[:10]
+    return os.path.join(settings.MEDIA_ROOT, "qr", f"ad_{admission_id}_{digest}.png")
+
+
+def _write(path, png):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(png)
+    os.replace(tmp, path)
+
+
+def admission_qr_png(admission_id, **options):
+    """QR for an admission's verification URL, via the memory and disk tiers."""
+    options = _options(**options)
+    data = admission_qr_data(admission_id)
+    if not getattr(settings, "QR_DISK_CACHE", False):
+        return qr_png(data, **options)
+
+    path = _disk_path(admission_id, data, options)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        png = qr_png(data, **options)
+        _write(path, png)
+        return png
+
+
+def admission_qr_base64(admission_id, **options):
+    return base64.b64encode(admission_qr_png(admission_id, **options)).decode("ascii")
+
+
+def generate_qr(admission_id, **options):
+    """Write the admission's QR to MEDIA_ROOT/qr/ (if missing) and return the path."""
+    options = _options(**options)
+    data = admission_qr_data(admission_id)
+    path = _disk_path(admission_id, data, options)
+    if not os.path.exists(path):
+        _write(path, qr_png(data, **options))
+    return path
 
-    qr_path = os.path.join(settings.MEDIA_ROOT, f"qr/ad_{admission_id}.png")
-    os.makedirs(os.path.dirname(qr_path), exist_ok=True)
 
-    img.save(qr_path)
-    return qr_path
+def cache_info():
+    return _encode.cache_info()
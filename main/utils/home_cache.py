@@ -0,0 +1,131 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Min
+from django.templatetags.static import static
+
+from main.models import Course, CourseCategory, StudentFeedback
+from main.routers import primary_reads
+from main.utils import images
+from main.utils.pricing import final_price
+
+
+HOME_CACHE_KEY = "home:payload"
+# Bumped whenever the payload is invalidated; other catalog-wide caches
+# (the catalog facets) put it in their keys so they expire with it
+VERSION_KEY = "home:version"
+
+TOP_COURSES = 3
+TOP_CATEGORIES = 8
+LATEST_FEEDBACKS = 10
+
+DEFAULT_AVATAR = "images/tesimg04.png"
+
+
+# -----------------------------------
+# Helpers
+# -----------------------------------
+def _file_url(field, width):
+    return images.rendition_url(field, width) if field else None
+
+
+def _course_row(c):
+    return {
+        "id": c.id,
+        "title": c.title,
+        "image_url": _file_url(c.image, 640),
+        "category_title": c.category.title,
+        "institute_name": c.institute.name,
+        "institute_logo_url": _file_url(c.institute.profile_logo, 160),
+        "original_price": c.original_price,
+        "discount_percent": c.discount_percent,
+        "final_price": final_price(c),
+    }
+
+
+def _category_row(cat):
+    return {
+        "id": cat.id,
+        "title": cat.title,
+        "image_url": _file_url(cat.image, 320),
+        "course_count": cat.course_count,
+        "institute_name": cat.institute.name,
+        "institute_logo_url": _file_url(cat.institute.profile_logo, 160),
+    }
+
+
+def _feedback_row(fb):
+    profile = getattr(fb.student, "profile", None)
+    avatar = profile.avatar if profile else None
+    return {
+        "name": fb.student.username,
+        "role": "Student",
+        "text": fb.feedback_text,
+        "image": images.rendition_url(avatar, 160) if avatar else static(DEFAULT_AVATAR),
+    }
+
+
+# -----------------------------------
+# Payload
+# -----------------------------------
+def build_home_payload():
+    courses = (
+        Course.objects
+        .select_related("category", "institute")
+        .with_final_price()
+        .order_by("-id")[:TOP_COURSES]
+    )
+
+    # One tile per distinct title, represented by its oldest category
+    first_ids = (
+        CourseCategory.objects
+        .values("title")
+        .annotate(first_id=Min("id"))
+        .order_by("title")
+        .values_list("first_id", flat=True)[:TOP_CATEGORIES]
+    )
+    categories = (
+        CourseCategory.objects
+        .filter(id__in=list(first_ids))
+        .select_related("institute")
+        .annotate(course_count=Count("courses"))
+        .order_by("title")
+    )
+
+    feedbacks = (
+        StudentFeedback.objects
+        .select_related("student__profile")
+        .order_by("-created_at")[:LATEST_FEEDBACKS]
+    )
+    feedback_rows = [_feedback_row(fb) for fb in feedbacks]
+
+    return {
+        "courses": [_course_row(c) for c in courses],
+        "categories": [_category_row(cat) for cat in categories],
+        "feedbacks": feedback_rows,
+        "feedbacks_json": json.dumps(feedback_rows, cls=DjangoJSONEncoder),
+    }
+
+
+def get_home_payload():
+    payload = cache.get(HOME_CACHE_KEY)
+    if payload is None:
+        with primary_reads():
+            payload = build_home_payload()
+        timeout = getattr(settings, "HOME_PAGE_CACHE_TIMEOUT", 300)
+        cache.set(HOME_CACHE_KEY, payload, timeout)
+    return payload
+
+
+def catalog_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_home_payload(**kwargs):
+    cache.delete(HOME_CACHE_KEY)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
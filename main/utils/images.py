@@ -0,0 +1,376 @@
+import hashlib
+import logging
+import posixpath
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.templatetags.static import static
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from main.models import Course, CourseCategory, ImageRendition, Institute
+from main.utils import background
+from main.utils.institute_cache import bump_detail_version
+
+
+logger = logging.getLogger(__name__)
+
+
+# Resized copies of uploaded images. Each original gets a WebP and a JPEG
+# rendition at every width in IMAGE_RENDITION_WIDTHS below its own width,
+# plus one at its own width when it is no wider than the largest of them
+# (never upscaled), saved without EXIF/ICC metadata next to a predictable
+# path:
+#
+#   course/images/photo.jpg -> renditions/course/images/photo/w320.webp
+#
+# so templates can build rendition URLs from the field and the original's
+# width, which is recorded on the ImageRendition row.
+#
+# Renditions are made off the request thread: saving a model queues an
+# ImageRendition row for each new upload and, once the transaction commits,
+# hands it to a small worker pool (IMAGE_WORKERS; 0 leaves the queue to
+# `manage.py generate_renditions`). While a row is pending the helpers serve
+# a lightweight placeholder; failed or untracked images fall back to the
+# original file.
+
+# model label -> image fields that get renditions
+RENDITION_FIELDS = {
+    "main.profile": ("avatar",),
+    "main.institute": ("profile_logo", "background_image"),
+    "main.coursecategory": ("image",),
+    "main.course": ("image",),
+}
+
+FORMATS = {
+    "webp": ("webp", "WEBP"),
+    "jpeg": ("jpg", "JPEG"),
+}
+
+PENDING = "pending"
+PROCESSING = "processing"
+READY = "ready"
+FAILED = "failed"
+
+# Cached state for images with no ImageRendition row
+UNTRACKED = "untracked"
+
+STATE_PREFIX = "images:renditions:v2:"
+PLACEHOLDER = "images/placeholder.svg"
+
+RETRY_DELAY = 30
+JOB_TIMEOUT = 300
+
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def widths():
+    return tuple(sorted(getattr(settings, "IMAGE_RENDITION_WIDTHS", (160, 320, 640, 1280))))
+
+
+def _quality():
+    return getattr(settings, "IMAGE_RENDITION_QUALITY", 80)
+
+
+def _workers():
+    return getattr(settings, "IMAGE_WORKERS", 1)
+
+
+def _max_attempts():
+    return getattr(settings, "IMAGE_RENDITION_MAX_ATTEMPTS", 3)
+
+
+def fields_for(instance):
+    return RENDITION_FIELDS.get(instance._meta.label_lower, ())
+
+
+def rendition_name(source_name, width, fmt="jpeg"):
+    stem, _ext = posixpath.splitext(source_name)
+    return f"renditions/{stem}/w{width}.{FORMATS[fmt][0]}"
+
+
+def rendition_widths(original_width=None):
+    """
+    Widths rendered for an original ``original_width`` pixels wide: the
+    configured widths below it, and its own width if it is no wider than the
+    largest configured one. Every configured width when it is unknown.
+    """
+    if not original_width:
+        return widths()
+    found = tuple(w for w in widths() if w < original_width)
+    if original_width <= widths()[-1]:
+        found += (original_width,)
+    return found
+
+
+def pick_width(width, original_width=None):
+    """Smallest rendered width that covers ``width`` (or the largest one)."""
+    available = rendition_widths(original_width)
+    for w in available:
+        if w >= int(width):
+            return w
+    return available[-1]
+
+
+# -----------------------------------
+# Generation
+# -----------------------------------
+def _flatten(img):
+    # JPEG has no alpha; composite transparent images onto white
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _encode(img, fmt):
+    out = BytesIO()
+    if fmt == "jpeg":
+        _flatten(img).save(out, format="JPEG", quality=_quality(), optimize=True, progressive=True)
+    else:
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        img.save(out, format="WEBP", quality=_quality(), method=4)
+    return out.getvalue()
+
+
+def generate(source_name, storage=None):
+    """
+    Write every rendition of ``source_name``. Safe to repeat: existing
+    renditions are replaced. Returns the original's width.
+    """
+    storage = storage or default_storage
+    with storage.open(source_name, "rb") as f, Image.open(f) as original:
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    # Largest first, each step resized from the previous one
+    img = original
+    for width in reversed(rendition_widths(original.width)):
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        for fmt in FORMATS:
+            name = rendition_name(source_name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            # A fresh image object carries no exif/icc_profile into the file
+            storage.save(name, ContentFile(_encode(img.copy(), fmt)))
+    return original.width
+
+
+# -----------------------------------
+# Queue
+# -----------------------------------
+def sources_for(instance):
+    names = []
+    for field in fields_for(instance):
+        field_file = getattr(instance, field)
+        if field_file:
+            names.append(field_file.name)
+    return names
+
+
+def enqueue(source_names, force=False):
+    """
+    Mark ``source_names`` pending and wake the workers after commit.
+    Images already tracked are left alone unless ``force`` is set.
+    Returns the names that were queued.
+    """
+    source_names = set(source_names)
+    if not source_names:
+        return []
+    existing = dict(
+        ImageRendition.objects.filter(source__in=source_names).values_list("source", "status")
+    )
+    new = source_names - existing.keys()
+    ImageRendition.objects.bulk_create(
+        [ImageRendition(source=name) for name in new], ignore_conflicts=True,
+    )
+    queued = set(new)
+    if force:
+        requeue = [name for name, status in existing.items() if status != PENDING]
+        ImageRendition.objects.filter(source__in=requeue).exclude(status=PROCESSING).update(
+            status=PENDING, attempts=0, error="",
+        )
+        queued.update(requeue)
+    for name in queued:
+        _set_state(name, PENDING)
+    queued = sorted(queued)
+    transaction.on_commit(lambda: wake_workers(queued))
+    return queued
+
+
+def queue_instance(instance):
+    """Queue renditions for image fields of ``instance`` that are not tracked yet."""
+    return enqueue([name for name in sources_for(instance) if state(name) == UNTRACKED])
+
+
+def wake_workers(source_names):
+    for name in source_names:
+        background.submit("image-renditions", _workers(), process, name)
+
+
+def _claim(source_name):
+    return ImageRendition.objects.filter(source=source_name, status=PENDING).update(
+        status=PROCESSING, attempts=F("attempts") + 1, started_at=timezone.now(),
+    )
+
+
+def process(source_name, storage=None):
+    """
+    Generate renditions for one queued image. Only the caller that moves
+    the row from pending to processing does the work, so duplicate wake-ups
+    are harmless. Returns the resulting status, or None if the row was not
+    pending.
+    """
+    if not _claim(source_name):
+        return None
+    rows = ImageRendition.objects.filter(source=source_name, status=PROCESSING)
+    try:
+        width = generate(source_name, storage)
+    except IMAGE_ERRORS as e:
+        attempts = rows.values_list("attempts", flat=True).first() or 0
+        status = PENDING if attempts < _max_attempts() else FAILED
+        rows.update(status=status, error=str(e))
+        _set_state(source_name, status)
+        if status == PENDING:
+            background.submit_later(
+                RETRY_DELAY * attempts, "image-renditions", _workers(), process, source_name,
+            )
+        else:
+            logger.warning("Could not create renditions for %s: %s", source_name, e)
+            _renditions_changed(source_name)
+        return status
+    rows.update(status=READY, error="", width=width)
+    _set_state(source_name, READY, width)
+    _renditions_changed(source_name)
+    return READY
+
+
+def requeue_stale():
+    """Put rows left processing by a dead worker back in the queue."""
+    cutoff = timezone.now() - timedelta(seconds=JOB_TIMEOUT)
+    return ImageRendition.objects.filter(status=PROCESSING, started_at__lt=cutoff).update(status=PENDING)
+
+
+def run_pending(limit=None):
+    """Process queued images in this thread; used by generate_renditions."""
+    requeue_stale()
+    names = ImageRendition.objects.filter(status=PENDING).order_by("updated_at").values_list("source", flat=True)
+    if limit:
+        names = names[:limit]
+    return {name: process(name) for name in list(names)}
+
+
+def discard(source_name, storage=None):
+    """Remove the renditions and queue row of a deleted original."""
+    storage = storage or default_storage
+    original_width = ImageRendition.objects.filter(source=source_name).values_list("width", flat=True).first()
+    names = [
+        rendition_name(source_name, width, fmt)
+        for width in rendition_widths(original_width) for fmt in FORMATS
+    ]
+    names = [name for name in names if storage.exists(name)]
+    if hasattr(storage, "delete_many"):
+        # The dedup storage checks references of all of them at once
+        storage.delete_many(names)
+    else:
+        for name in names:
+            storage.delete(name)
+    ImageRendition.objects.filter(source=source_name).delete()
+    cache.delete(_state_key(source_name))
+
+
+def _renditions_changed(source_name):
+    # Cached pages built while the image was pending still point at the
+    # placeholder. Imported here: both modules import this one.
+    from main.utils import typeahead
+    from main.utils.home_cache import invalidate_home_payload
+
+    invalidate_home_payload()
+    typeahead.invalidate()
+    institute_ids = set(
+        Institute.objects.filter(profile_logo=source_name).values_list("pk", flat=True)
+    ) | set(
+        Institute.objects.filter(background_image=source_name).values_list("pk", flat=True)
+    ) | set(
+        Course.objects.filter(image=source_name).values_list("institute_id", flat=True)
+    ) | set(
+        CourseCategory.objects.filter(image=source_name).values_list("institute_id", flat=True)
+    )
+    for institute_id in institute_ids:
+        bump_detail_version(institute_id)
+
+
+# -----------------------------------
+# Lookup
+# -----------------------------------
+def _state_key(source_name):
+    return STATE_PREFIX + hashlib.sha1(source_name.encode("utf-8")).hexdigest()
+
+
+def _set_state(source_name, status, width=None):
+    # Final states rarely change; pending ones are re-read soon in case
+    # another process finished the job
+    timeout = 24 * 60 * 60 if status in (READY, FAILED) else 60
+    cache.set(_state_key(source_name), (status, width), timeout)
+
+
+def _state(source_name):
+    """(status, original width or None); cached so templates stay cheap."""
+    key = _state_key(source_name)
+    found = cache.get(key)
+    if found is None:
+        row = ImageRendition.objects.filter(source=source_name).values_list("status", "width").first()
+        found = row or (UNTRACKED, None)
+        _set_state(source_name, *found)
+    return tuple(found)
+
+
+def state(source_name):
+    """Rendition status of ``source_name`` (UNTRACKED if never queued)."""
+    return _state(source_name)[0]
+
+
+def is_available(source_name):
+    return state(source_name) == READY
+
+
+def rendition_url(field_file, width, fmt="jpeg"):
+    """
+    URL of the rendition closest to ``width``; the placeholder while it is
+    being made, the original if it failed or was never queued.
+    """
+    if not field_file:
+        return ""
+    status, original_width = _state(field_file.name)
+    if status == READY:
+        return field_file.storage.url(
+            rendition_name(field_file.name, pick_width(width, original_width), fmt)
+        )
+    if status in (PENDING, PROCESSING):
+        return static(PLACEHOLDER)
+    return field_file.url
+
+
+def srcset(field_file, fmt="jpeg"):
+    """``srcset`` value listing every rendition at its real width, or "" until they are ready."""
+    if not field_file:
+        return ""
+    status, original_width = _state(field_file.name)
+    if status != READY:
+        return ""
+    storage = field_file.storage
+    return ", ".join(
+        f"{storage.url(rendition_name(field_file.name, w, fmt))} {w}w"
+        for w in rendition_widths(original_width)
+    )
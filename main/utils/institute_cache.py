@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Version counter for the cached "Courses Offered" fragment on the institute
+# detail page. The fragment key includes the version, so bumping it on any
+# course, category or enrollment change makes the next render rebuild it.
+
+VERSION_KEY = "institute_detail:{}:version"
+
+
+def detail_cache_timeout():
+    return getattr(settings, "INSTITUTE_DETAIL_CACHE_TIMEOUT", 300)
+
+
+def detail_version(institute_id):
+    return cache.get_or_set(VERSION_KEY.format(institute_id), 1, None)
+
+
+def bump_detail_version(institute_id):
+    if institute_id is None:
+        return
+    key = VERSION_KEY.format(institute_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
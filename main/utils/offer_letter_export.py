@@ -0,0 +1,260 @@
+import logging
+import zipfile
+from io import RawIOBase
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Exists, OuterRef
+from django.utils.text import get_valid_filename
+
+from main.models import Admission, Enrollment
+from main.utils import branding, offer_letters, pdf_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Offer letters for a whole intake. Letters already in the PDF cache are
+# streamed straight from disk; the rest are rendered on the offer letter
+# worker pool (offer_letters.submit). Rendered PDFs come back as cache
+# paths, not bytes, and both the ZIP and the merged PDF are written one
+# letter at a time, so the web process never holds more than one letter in
+# memory. Letters that fail to render are listed in MISSING_NAME.
+
+CHUNK_SIZE = 64 * 1024
+MISSING_NAME = "MISSING.txt"
+
+
+def accepted_admissions(institute, course=None):
+    """Accepted admissions of ``institute`` whose student holds the enrollment."""
+    enrolled = Enrollment.objects.filter(student__user=OuterRef("user"), course=OuterRef("course"))
+    admissions = (
+        Admission.objects
+        .filter(institute=institute, status="accepted", course__isnull=False)
+        .filter(Exists(enrolled))
+        .select_related("user__profile", "course")
+        .order_by("course__title", "student_name", "pk")
+    )
+    if course is not None:
+        admissions = admissions.filter(course=course)
+    return admissions
+
+
+def filename_for(admission):
+    """``<course>/Offer_Letter_<id>.pdf``, with the course title made safe as a folder name."""
+    try:
+        folder = get_valid_filename(admission.course.title)
+    except SuspiciousFileOperation:
+        # Titles like "" or ".." that leave nothing usable
+        folder = f"course_{admission.course_id}"
+    return f"{folder}/{offer_letters.filename_for(admission.id)}"
+
+
+def missing_report(admissions):
+    """Plain-text list of admissions whose letter could not be rendered."""
+    lines = ["Offer letters that could not be rendered:", ""]
+    lines += [f"{a.student_name} - {a.course.title} (admission {a.id})" for a in admissions]
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------
+# Rendering
+# -----------------------------------
+def _render_one(admission, institute):
+    """Render one letter into the PDF cache and return its path, or None if it failed."""
+    try:
+        key, pdf = offer_letters.offer_letter_pdf(admission, institute)
+    except Exception:
+        logger.exception("Offer letter for admission %s failed to render", admission.id)
+        return None
+    if pdf is None:
+        logger.warning("xhtml2pdf could not render the offer letter for admission %s", admission.id)
+        return None
+    with pdf:
+        path = pdf_cache.path_for(key)
+        if not path.exists():
+            # Evicted by a concurrent write; store it again
+            path = pdf_cache.put(key, pdf)
+    return str(path) if path else None
+
+
+def rendered_letters(admissions, institute):
+    """
+    Yield (admission, pdf_path or None) in the order given. None means the
+    letter failed to render.
+    """
+    branding.branding_for(institute)  # build once here, not in every task
+    plan = []
+    for admission in admissions:
+        path = pdf_cache.get_path(offer_letters.render_key(admission, institute))
+        # With the pool disabled, missing letters render below, in order
+        future = offer_letters.submit(_render_one, admission, institute) if path is None else None
+        plan.append((admission, path, future))
+
+    try:
+        for admission, path, future in plan:
+            if path is None:
+                path = future.result() if future is not None else _render_one(admission, institute)
+            yield admission, path
+    finally:
+        # The client went away: drop the renders that haven't started
+        for _admission, _path, future in plan:
+            if future is not None:
+                future.cancel()
+
+
+# -----------------------------------
+# Output
+# -----------------------------------
+class _ChunkSink(RawIOBase):
+    """Unseekable write target that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_entries(letters):
+    """
+    (name, path) for each rendered (admission, path) pair, then
+    (MISSING_NAME, bytes) listing the letters that failed, if any.
+    """
+    missing = []
+    for admission, path in letters:
+        if path is None:
+            missing.append(admission)
+        else:
+            yield filename_for(admission), path
+    if missing:
+        yield MISSING_NAME, missing_report(missing).encode()
+
+
+def stream_zip(entries):
+    """
+    Yield a ZIP archive chunk by chunk. ``entries`` are (name, path) pairs,
+    or (name, bytes) for small generated members.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, source in entries:
+            if isinstance(source, bytes):
+                archive.writestr(name, source)
+            else:
+                with open(source, "rb") as src, archive.open(name, "w") as dst:
+                    while True:
+                        chunk = src.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def merge_pdfs(paths, dest):
+    """
+    Concatenate the PDFs in ``paths`` into ``dest`` and return it rewound.
+
+    Each source is read, its objects renumbered and written out before the
+    next one is opened, so only the page references and object offsets are
+    kept until the end. (pypdf's PdfWriter keeps every page in memory until
+    it writes.)
+    """
+    from pypdf import PdfReader
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NullObject
+
+    # 1 is the catalog and 2 the page tree, written last
+    offsets = {}
+    kids = []
+    next_number = 3
+
+    def write_object(number, body):
+        offsets[number] = dest.tell()
+        dest.write(f"{number} 0 obj\n".encode())
+        if isinstance(body, bytes):
+            dest.write(body)
+        else:
+            body.write_to_stream(dest)
+        dest.write(b"\nendobj\n")
+
+    def copy(reader):
+        nonlocal next_number
+        numbers = {}
+        queue = []
+
+        def renumber(ref):
+            nonlocal next_number
+            key = (ref.idnum, ref.generation)
+            if key not in numbers:
+                numbers[key] = next_number
+                next_number += 1
+                queue.append(ref)
+            return IndirectObject(numbers[key], 0, None)
+
+        def remap(obj):
+            if isinstance(obj, IndirectObject):
+                return renumber(obj)
+            if isinstance(obj, DictionaryObject):
+                for name, value in list(obj.items()):
+                    obj[name] = remap(value)
+            elif isinstance(obj, ArrayObject):
+                for i, value in enumerate(obj):
+                    obj[i] = remap(value)
+            return obj
+
+        # reader.pages copies inherited attributes (resources, media box)
+        # into each page, so the source page tree can be left behind
+        pages = {(page.indirect_reference.idnum, page.indirect_reference.generation) for page in reader.pages}
+        for page in reader.pages:
+            kids.append(renumber(page.indirect_reference))
+        while queue:
+            ref = queue.pop()
+            obj = ref.get_object()
+            if obj is None:
+                # Dangling reference in the source
+                obj = NullObject()
+            elif (ref.idnum, ref.generation) in pages:
+                obj.pop(NameObject("/Parent"), None)
+                remap(obj)
+                obj[NameObject("/Parent")] = IndirectObject(2, 0, None)
+            else:
+                remap(obj)
+            write_object(numbers[(ref.idnum, ref.generation)], obj)
+
+    dest.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    for path in paths:
+        # An open file, so the reader parses objects from disk on demand
+        # instead of loading the whole letter
+        with open(path, "rb") as src:
+            reader = PdfReader(src)
+            copy(reader)
+            # The reader's object cache is full of reference cycles; empty
+            # it so the letter is freed now, not at the next full collection
+            reader.resolved_objects.clear()
+            reader.flattened_pages = None
+
+    kid_refs = " ".join(f"{ref.idnum} 0 R" for ref in kids)
+    write_object(2, f"<< /Type /Pages /Kids [{kid_refs}] /Count {len(kids)} >>".encode())
+    write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    xref = dest.tell()
+    dest.write(f"xref\n0 {next_number}\n0000000000 65535 f \n".encode())
+    for number in range(1, next_number):
+        dest.write(f"{offsets[number]:010d} 00000 n \n".encode())
+    dest.write(f"trailer\n<< /Size {next_number} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    dest.seek(0)
+    return dest
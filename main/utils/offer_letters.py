@@ -0,0 +1,309 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import File
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+
+from main.models import Enrollment, OfferLetter
+from main.utils import background, branding, generate_qr, pdf_cache, pdf_generator
+
+
+logger = logging.getLogger(__name__)
+
+
+# Offer letters are rendered off the request path. Accepting an admission
+# queues an OfferLetter row; a worker claims queued rows with a conditional
+# UPDATE, renders the PDF into MEDIA_ROOT/offer_letters/ and marks the row
+# ready. Workers run on a small in-process thread pool (OFFER_LETTER_WORKERS)
+# and/or in the ``process_offer_letters`` management command, so no broker
+# is needed. Both can run at once: a row is only ever claimed by one worker.
+#
+# Rendered bytes also go through utils/pdf_cache.py keyed on render_key(),
+# a hash of every input the template reads. A stored letter whose
+# content_hash no longer matches is stale and gets rendered again.
+
+QUEUED = "queued"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+# Seconds before a failed render is retried, times the attempts so far
+RETRY_DELAY = 30
+
+
+class OfferLetterUnavailable(Exception):
+    """The admission cannot have an offer letter (no enrollment, institute not approved)."""
+
+
+def _workers():
+    return getattr(settings, "OFFER_LETTER_WORKERS", 2)
+
+
+def _max_attempts():
+    return getattr(settings, "OFFER_LETTER_MAX_ATTEMPTS", 3)
+
+
+def _job_timeout():
+    return getattr(settings, "OFFER_LETTER_JOB_TIMEOUT", 300)
+
+
+# -----------------------------------
+# Rendering
+# -----------------------------------
+def image_to_base64(image_field):
+    if image_field and hasattr(image_field, 'path') and os.path.exists(image_field.path):
+        try:
+            with open(image_field.path, "rb") as img_file:
+                return base64.b64encode(img_file.read()).decode('utf-8')
+        except OSError as e:
+            logger.warning("Error converting image to base64: %s", e)
+            return None
+    return None
+
+
+def get_enrollment(admission):
+    student = getattr(admission.user, "student_profile", None) if admission.user else None
+    if student is None:
+        return None
+    return (
+        Enrollment.objects
+        .select_related("institute__branding")
+        .filter(student=student, course=admission.course)
+        .first()
+    )
+
+
+def offer_letter_context(admission, institute):
+    student_photo_base64 = None
+    profile = getattr(admission.user, "profile", None)
+    if profile and profile.avatar:
+        student_photo_base64 = image_to_base64(profile.avatar)
+
+    assets = branding.branding_for(institute)
+    return {
+        "admission": admission,
+        "course": admission.course,
+        "institute": institute,
+        "student_name": admission.user.get_full_name() if admission.user else admission.student_name,
+        "qr_base64": generate_qr.admission_qr_base64(admission.id),
+        "signature_base64": assets.signature_base64,
+        "stamp_base64": assets.stamp_base64,
+        "logo_base64": assets.logo_base64,
+        "student_photo_base64": student_photo_base64,
+    }
+
+
+TEMPLATE = "main/offer_letter.html"
+
+
+def letter_institute(admission):
+    """The institute issuing the letter; raises OfferLetterUnavailable."""
+    enrollment = get_enrollment(admission)
+    if enrollment is None:
+        raise OfferLetterUnavailable("Enrollment not found.")
+    institute = enrollment.institute
+    if institute.status != "approved":
+        raise OfferLetterUnavailable("Offer letter not available.")
+    return institute
+
+
+def render_key(admission, institute):
+    """SHA-256 over everything offer_letter.html renders for this admission."""
+    course = admission.course
+    profile = getattr(admission.user, "profile", None)
+    parts = [
+        pdf_cache.file_digest(get_template(TEMPLATE).origin.name),
+        [admission.id, admission.student_name, admission.address, admission.created_at],
+        generate_qr.admission_qr_data(admission.id),
+        admission.user.get_full_name() if admission.user else "",
+        [course.title, course.duration, course.level, course.class_type] if course else None,
+        [institute.name, institute.address, institute.email, institute.phone],
+        branding.branding_for(institute).digest,
+        pdf_cache.field_digest(profile.avatar) if profile else "",
+        settings.TIME_ZONE,
+    ]
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def _render(admission, institute):
+    html = render_to_string(TEMPLATE, offer_letter_context(admission, institute))
+    return pdf_generator.render_pdf_from_html(html)
+
+
+def offer_letter_pdf(admission, institute=None):
+    """
+    Return (key, file) for the admission, rendering only on a cache miss.
+    ``file`` is an open binary file at position 0 that the caller closes,
+    or None if xhtml2pdf failed.
+    """
+    institute = institute or letter_institute(admission)
+    key = render_key(admission, institute)
+    path = pdf_cache.get_path(key)
+    if path is not None:
+        try:
+            return key, open(path, "rb")
+        except FileNotFoundError:
+            pass
+    pdf = _render(admission, institute)
+    if pdf is not None:
+        pdf_cache.put(key, pdf)
+        pdf.seek(0)
+    return key, pdf
+
+
+def filename_for(admission_id):
+    return f"Offer_Letter_{admission_id}.pdf"
+
+
+# -----------------------------------
+# Queue
+# -----------------------------------
+def enqueue(admission_ids):
+    """
+    Queue (or re-queue) offer letters for accepted admissions. Safe to call
+    inside a transaction: the in-process workers are woken on commit.
+    """
+    admission_ids = list(dict.fromkeys(admission_ids))
+    if not admission_ids:
+        return 0
+
+    now = timezone.now()
+    existing = set(
+        OfferLetter.objects.filter(admission_id__in=admission_ids).values_list("admission_id", flat=True)
+    )
+    OfferLetter.objects.bulk_create(
+        [OfferLetter(admission_id=pk, run_after=now) for pk in admission_ids if pk not in existing],
+        ignore_conflicts=True,
+    )
+    if existing:
+        # A running job that gets re-queued finds its row changed and leaves
+        # it for the next pass, so the newest data always wins
+        OfferLetter.objects.filter(admission_id__in=existing).exclude(status=QUEUED).update(
+            status=QUEUED, attempts=0, error="", run_after=now,
+        )
+    transaction.on_commit(wake_workers)
+    return len(admission_ids)
+
+
+def is_due(letter):
+    """Queued and past its run_after, i.e. a worker should pick it up now."""
+    return letter is not None and letter.status == QUEUED and letter.run_after <= timezone.now()
+
+
+def letter_for(admission):
+    return OfferLetter.objects.filter(admission=admission).first()
+
+
+def is_ready(letter, key=None):
+    """The stored file exists and, when ``key`` is given, is still current."""
+    return (
+        letter is not None
+        and letter.status == READY
+        and (key is None or letter.content_hash == key)
+        and bool(letter.file)
+        and letter.file.storage.exists(letter.file.name)
+    )
+
+
+def requeue_stale():
+    """Put back jobs whose worker died mid-render."""
+    cutoff = timezone.now() - timedelta(seconds=_job_timeout())
+    return OfferLetter.objects.filter(status=RUNNING, started_at__lt=cutoff).update(status=QUEUED)
+
+
+def claim_next():
+    """Claim the oldest due job, or return None when the queue is empty."""
+    now = timezone.now()
+    due = (
+        OfferLetter.objects
+        .filter(status=QUEUED, run_after__lte=now)
+        .order_by("run_after", "pk")
+        .values_list("pk", flat=True)[:20]
+    )
+    for pk in due:
+        claimed = OfferLetter.objects.filter(pk=pk, status=QUEUED).update(
+            status=RUNNING, started_at=now, attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return (
+                OfferLetter.objects
+                .select_related("admission__user__profile", "admission__user__student_profile", "admission__course")
+                .get(pk=pk)
+            )
+    return None
+
+
+def _finish(letter, **fields):
+    """Write the outcome only if nobody re-queued the row meanwhile."""
+    return OfferLetter.objects.filter(
+        pk=letter.pk, status=RUNNING, started_at=letter.started_at,
+    ).update(finished_at=timezone.now(), **fields)
+
+
+def run_job(letter):
+    """Render one claimed job. Returns the status it ended in."""
+    key = ""
+    try:
+        key, pdf = offer_letter_pdf(letter.admission)
+        error = "PDF generation error" if pdf is None else ""
+        retry = pdf is None
+    except OfferLetterUnavailable as exc:
+        pdf, error, retry = None, str(exc), False
+    except Exception as exc:
+        logger.exception("Offer letter for admission %s failed", letter.admission_id)
+        pdf, error, retry = None, repr(exc), True
+
+    if pdf is None:
+        if retry and letter.attempts < _max_attempts():
+            delay = RETRY_DELAY * letter.attempts
+            _finish(letter, status=QUEUED, error=error, run_after=timezone.now() + timedelta(seconds=delay))
+            # Nothing else wakes the in-process workers once the row is due
+            background.submit_later(delay, "offer-letters", _workers(), run_pending)
+            return QUEUED
+        _finish(letter, status=FAILED, error=error)
+        return FAILED
+
+    old_name = letter.file.name if letter.file else None
+    storage = OfferLetter._meta.get_field("file").storage
+    with pdf:
+        letter.file.save(filename_for(letter.admission_id), File(pdf), save=False)
+    if not _finish(letter, status=READY, file=letter.file.name, content_hash=key, error=""):
+        storage.delete(letter.file.name)
+        return QUEUED
+    if old_name and old_name != letter.file.name:
+        storage.delete(old_name)
+    return READY
+
+
+def run_pending(limit=None):
+    """Drain due jobs in this thread. Returns {status: count}."""
+    requeue_stale()
+    done = {}
+    while limit is None or sum(done.values()) < limit:
+        letter = claim_next()
+        if letter is None:
+            break
+        status = run_job(letter)
+        done[status] = done.get(status, 0) + 1
+    return done
+
+
+# -----------------------------------
+# In-process workers
+# -----------------------------------
+def submit(fn, *args):
+    """Run ``fn(*args)`` on the worker pool; returns the Future, or None if the pool is disabled."""
+    return background.submit("offer-letters", _workers(), fn, *args)
+
+
+def wake_workers():
+    # With OFFER_LETTER_WORKERS = 0 the queue is left to process_offer_letters
+    submit(run_pending)
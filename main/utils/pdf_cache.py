@@ -0,0 +1,260 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import locks
+
+
+logger = logging.getLogger(__name__)
+
+
+# Content-addressed store for rendered PDFs. Callers hash every input of a
+# render (field values, template source, image digests) into a key; the
+# bytes are kept on disk as <key>.pdf, so a key never needs invalidating --
+# changed inputs simply produce a new key. Reads touch the file's mtime and
+# writes evict the least recently used files once the directory grows past
+# PDF_CACHE_MAX_BYTES. Hit/miss counters are kept in a locked JSON file
+# next to the PDFs, so every process (and the pdf_cache command) sees the
+# same totals.
+
+STATS_FILE = "stats.json"
+
+
+def cache_dir():
+    path = Path(getattr(settings, "PDF_CACHE_DIR", Path(settings.BASE_DIR) / "cache" / "pdf"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _max_bytes():
+    return getattr(settings, "PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+
+def path_for(key):
+    return cache_dir() / f"{key}.pdf"
+
+
+# -----------------------------------
+# Input digests
+# -----------------------------------
+_digests = OrderedDict()
+_digests_lock = threading.Lock()
+_DIGEST_MEMO_SIZE = 1024
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file's contents, or "" if it does not exist. Memoised on
+    (path, size, mtime) so repeated renders only stat the file.
+    """
+    if not path:
+        return ""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    memo_key = (str(path), st.st_size, st.st_mtime_ns)
+    with _digests_lock:
+        digest = _digests.get(memo_key)
+        if digest is not None:
+            _digests.move_to_end(memo_key)
+            return digest
+
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    except OSError:
+        return ""
+    digest = h.hexdigest()
+
+    with _digests_lock:
+        _digests[memo_key] = digest
+        while len(_digests) > _DIGEST_MEMO_SIZE:
+            _digests.popitem(last=False)
+    return digest
+
+
+def field_digest(field):
+    """file_digest() for a FileField/ImageField value."""
+    if not field:
+        return ""
+    try:
+        return file_digest(field.path)
+    except (NotImplementedError, ValueError):
+        # Remote storage: fall back to the stored name
+        return f"name:{field.name}"
+
+
+# -----------------------------------
+# Store
+# -----------------------------------
+def _stats_path():
+    return cache_dir() / STATS_FILE
+
+
+def _read_counts(f):
+    try:
+        counts = json.loads(f.read() or "{}")
+    except ValueError:
+        return {}
+    return counts if isinstance(counts, dict) else {}
+
+
+def _record(outcome):
+    try:
+        fd = os.open(_stats_path(), os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+") as f:
+            locks.lock(f, locks.LOCK_EX)
+            try:
+                counts = _read_counts(f)
+                counts[outcome] = counts.get(outcome, 0) + 1
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(counts))
+            finally:
+                locks.unlock(f)
+    except OSError:
+        # Counting is best effort; never fail a read over it
+        logger.warning("Could not update PDF cache stats", exc_info=True)
+
+
+def _counts():
+    try:
+        with open(_stats_path()) as f:
+            locks.lock(f, locks.LOCK_SH)
+            try:
+                return _read_counts(f)
+            finally:
+                locks.unlock(f)
+    except FileNotFoundError:
+        return {}
+
+
+def get_path(key):
+    """Path of the cached PDF for ``key``, or None on a miss."""
+    path = path_for(key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        _record("misses")
+        return None
+    _record("hits")
+    return path
+
+
+def contains(key):
+    """Presence check that does not count towards the hit rate."""
+    return path_for(key).exists()
+
+
+def get(key):
+    path = get_path(key)
+    if path is None:
+        return None
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        # Evicted between the touch and the read
+        return None
+
+
+def put(key, data):
+    """
+    Store ``data`` (bytes or a readable file) under ``key`` atomically and
+    evict old entries.
+    """
+    directory = cache_dir()
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if hasattr(data, "read"):
+                shutil.copyfileobj(data, f, 64 * 1024)
+            else:
+                f.write(data)
+        os.replace(tmp, path_for(key))
+    except OSError:
+        logger.exception("Could not write PDF cache entry %s", key)
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return None
+    evict()
+    return path_for(key)
+
+
+def _entries():
+    entries = []
+    for entry in os.scandir(cache_dir()):
+        if not entry.name.endswith(".pdf"):
+            continue
+        try:
+            st = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, entry.path))
+    return entries
+
+
+def evict(max_bytes=None):
+    """
+    Drop least recently used entries until the store is under 90% of
+    ``max_bytes``. Returns the number of files removed.
+    """
+    max_bytes = _max_bytes() if max_bytes is None else max_bytes
+    entries = _entries()
+    total = sum(size for _mtime, size, _path in entries)
+    if total <= max_bytes:
+        return 0
+
+    target = int(max_bytes * 0.9)
+    removed = 0
+    for _mtime, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear():
+    removed = 0
+    for _mtime, _size, path in _entries():
+        try:
+            os.unlink(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    try:
+        os.unlink(_stats_path())
+    except FileNotFoundError:
+        pass
+    return removed
+
+
+def stats():
+    counts = _counts()
+    hits = counts.get("hits", 0)
+    misses = counts.get("misses", 0)
+    entries = _entries()
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        "entries": len(entries),
+        "bytes": sum(size for _mtime, size, _path in entries),
+        "max_bytes": _max_bytes(),
+    }
@@ -1,14 +1,88 @@
+import hashlib
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
 from django.template.loader import get_template
 from xhtml2pdf import pisa
-from io import BytesIO
-
-def generate_pdf(template_src, context_dict={}):
-    template = get_template(template_src)
-    html = template.render(context_dict)
-    
-    result = BytesIO()
-    pdf = pisa.pisaDocument(BytesIO(html.encode("UTF-8")), result)
-
-    if not pdf.err:
-        return result.getvalue()
-    return None
+
+from main.utils import pdf_cache
+
+
+# Shared output path for generated documents. PDFs are rendered straight
+# into a SpooledTemporaryFile that stays in memory up to
+# DOCUMENT_SPOOL_MAX_MEMORY bytes and rolls over to disk beyond that, and
+# responses stream the file in chunks instead of copying it into an
+# HttpResponse buffer.
+
+CHUNK_SIZE = 64 * 1024
+
+
+def spool_max_memory():
+    return getattr(settings, "DOCUMENT_SPOOL_MAX_MEMORY", 2 * 1024 * 1024)
+
+
+def spooled_file():
+    return tempfile.SpooledTemporaryFile(max_size=spool_max_memory(), mode="w+b")
+
+
+def render_pdf_from_html(html, dest=None):
+    """
+    Render ``html`` into ``dest`` (a new spooled file by default) and
+    return it rewound, or None if xhtml2pdf reported an error.
+    """
+    dest = dest if dest is not None else spooled_file()
+    pdf = pisa.CreatePDF(html, dest=dest)
+    if pdf.err:
+        dest.close()
+        return None
+    dest.seek(0)
+    return dest
+
+
+def render_pdf(template_src, context_dict=None, dest=None):
+    html = get_template(template_src).render(context_dict or {})
+    return render_pdf_from_html(html, dest)
+
+
+def generate_pdf(template_src, context_dict=None):
+    """
+    Render a template through the PDF cache and return the PDF as an open
+    file at position 0 for document_response(), or None if xhtml2pdf
+    failed. Renders of the same HTML are streamed from the cached file.
+    """
+    html = get_template(template_src).render(context_dict or {})
+    key = hashlib.sha256(html.encode("utf-8")).hexdigest()
+    path = pdf_cache.get_path(key)
+    if path is not None:
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            pass
+    pdf = render_pdf_from_html(html)
+    if pdf is not None:
+        pdf_cache.put(key, pdf)
+        pdf.seek(0)
+    return pdf
+
+
+def copy_file(src, dest):
+    shutil.copyfileobj(src, dest, CHUNK_SIZE)
+
+
+# -----------------------------------
+# Responses
+# -----------------------------------
+def document_response(fileobj, filename, content_type="application/pdf", as_attachment=True):
+    """Stream an open, rewound file; it is closed when the response finishes."""
+    response = FileResponse(fileobj, as_attachment=as_attachment, filename=filename, content_type=content_type)
+    response.block_size = CHUNK_SIZE
+    return response
+
+
+def streaming_document_response(chunks, filename, content_type):
+    """Stream a document produced as an iterator of byte chunks (e.g. a ZIP)."""
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,74 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import DecimalField, ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, Round
+
+
+# All course price maths lives here; Course.save(), the CourseQuerySet write
+# paths and the listing views go through these helpers.
+
+PRICE_FIELDS = ("original_price", "discount_percent")
+
+CENT = Decimal("0.01")
+
+
+def _price_field():
+    return DecimalField(max_digits=10, decimal_places=2)
+
+
+# -----------------------------------
+# Python side
+# -----------------------------------
+def compute_discount_price(original_price, discount_percent):
+    original_price = Decimal(original_price or 0)
+    if not discount_percent:
+        return original_price.quantize(CENT, rounding=ROUND_HALF_UP)
+    discount_amount = original_price * Decimal(discount_percent) / 100
+    return (original_price - discount_amount).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def apply_discount_price(course):
+    course.discount_price = compute_discount_price(course.original_price, course.discount_percent)
+    return course
+
+
+def final_price(course):
+    # Annotated querysets already carry the value
+    annotated = course.__dict__.get("final_price")
+    if annotated is not None:
+        return annotated
+    if course.discount_price is not None:
+        return course.discount_price
+    return compute_discount_price(course.original_price, course.discount_percent)
+
+
+# -----------------------------------
+# Database side
+# -----------------------------------
+def discount_price_expression(original_price=None, discount_percent=None):
+    """
+    SQL equivalent of compute_discount_price(). Arguments default to the
+    current column values so the expression can be used in UPDATE statements
+    with either the old or the incoming values.
+    """
+    original = original_price if original_price is not None else F("original_price")
+    percent = discount_percent if discount_percent is not None else F("discount_percent")
+    if not hasattr(original, "resolve_expression"):
+        original = Value(original, output_field=_price_field())
+    if not hasattr(percent, "resolve_expression"):
+        percent = Value(percent)
+    # Divide as floating point so SQLite does not truncate with integer
+    # division, then cast back so every backend rounds a decimal value
+    discounted = ExpressionWrapper(
+        original * (Value(100) - percent), output_field=FloatField()
+    ) / Value(100.0)
+    return Round(
+        Cast(discounted, output_field=DecimalField(max_digits=14, decimal_places=4)),
+        2,
+        output_field=_price_field(),
+    )
+
+
+def final_price_expression():
+    # discount_price is maintained on every write path; fall back for legacy rows
+    return Coalesce(F("discount_price"), discount_price_expression(), output_field=_price_field())
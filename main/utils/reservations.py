@@ -0,0 +1,264 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from main.models import Admission, Course, Enrollment, Institute
+from main.utils import counters, offer_letters, verification
+from main.utils.institute_cache import bump_detail_version
+
+
+# Seat reservation for accepted admissions. This is the only code path that
+# moves an admission to "accepted". The admission row is locked, the
+# enrollment insert is guarded by the (student, course) unique constraint and
+# the seat is taken last with a single conditional UPDATE. Concurrent accepts
+# never oversell a course and no SELECT ... FOR UPDATE is taken on the
+# course row, so accepts for one course do not queue behind each other.
+
+ACCEPTED = "accepted"
+ALREADY_ACCEPTED = "already_accepted"
+ALREADY_ENROLLED = "already_enrolled"
+NO_SEATS = "no_seats"
+NOT_ELIGIBLE = "not_eligible"
+
+# Results that leave the admission accepted; accepting twice is a no-op
+SUCCESSFUL = (ACCEPTED, ALREADY_ACCEPTED, ALREADY_ENROLLED)
+
+MESSAGES = {
+    ACCEPTED: "Student accepted and enrolled.",
+    ALREADY_ACCEPTED: "Admission was already accepted.",
+    ALREADY_ENROLLED: "Student is already enrolled in this course; admission accepted.",
+    NO_SEATS: "No seats left in this course.",
+    NOT_ELIGIBLE: "Admission has no course or no student account.",
+}
+
+
+class _NoSeats(Exception):
+    pass
+
+
+def take_seat(course_id):
+    """UPDATE ... SET seats = seats - 1 WHERE id = %s AND seats > 0"""
+    return Course.objects.filter(pk=course_id, seats__gt=0).update(seats=F("seats") - 1) == 1
+
+
+def accept_admission(admission_id):
+    """
+    Accept one admission, enrolling the student and taking a seat.
+    Returns (result, admission) where result is one of the constants above.
+    """
+    try:
+        with transaction.atomic():
+            admission = (
+                Admission.objects
+                .select_for_update(of=("self",))
+                .select_related("user__student_profile")
+                .get(pk=admission_id)
+            )
+            if admission.status == "accepted":
+                return ALREADY_ACCEPTED, admission
+
+            student = getattr(admission.user, "student_profile", None) if admission.user else None
+            if student is None or admission.course_id is None:
+                return NOT_ELIGIBLE, admission
+
+            result = ACCEPTED
+            try:
+                with transaction.atomic():
+                    Enrollment.objects.create(
+                        student=student,
+                        course_id=admission.course_id,
+                        institute_id=admission.institute_id,
+                    )
+            except IntegrityError:
+                # Enrolled through an earlier admission; that one holds the seat
+                result = ALREADY_ENROLLED
+
+            admission.status = "accepted"
+            admission.save(update_fields=["status"])
+
+            # Taken last so a full course rolls back everything above
+            if result == ACCEPTED and not take_seat(admission.course_id):
+                raise _NoSeats
+            offer_letters.enqueue([admission.pk])
+            return result, admission
+    except _NoSeats:
+        return NO_SEATS, Admission.objects.get(pk=admission_id)
+
+
+# -----------------------------------
+# Bulk actions
+# -----------------------------------
+BULK_STATUSES = {
+    "shortlist": "shortlisted",
+    "reject": "rejected",
+}
+
+ALREADY_IN_STATUS = "unchanged"
+UPDATED = "updated"
+NOT_FOUND = "not_found"
+
+MESSAGES.update({
+    ALREADY_IN_STATUS: "Admission already had that status.",
+    UPDATED: "Admission status updated.",
+    NOT_FOUND: "Admission not found.",
+})
+
+
+def _apply_bulk_counters(transitions, enrolled):
+    """
+    transitions: [(before_state, after_state)] for admissions updated in bulk
+    enrolled: [(course_id, institute_id)] for bulk-created enrollments
+    """
+    totals = {"course": {}, "institute": {}}
+    for before, after in transitions:
+        for target, rows in counters.admission_deltas(before, after).items():
+            for pk, fields in rows.items():
+                merged = totals[target].setdefault(pk, {})
+                for field, delta in fields.items():
+                    merged[field] = merged.get(field, 0) + delta
+    for course_id, institute_id in enrolled:
+        for target, pk in (("course", course_id), ("institute", institute_id)):
+            merged = totals[target].setdefault(pk, {})
+            merged[counters.ENROLLED_COUNTER] = merged.get(counters.ENROLLED_COUNTER, 0) + 1
+
+    for pk, fields in totals["course"].items():
+        counters.apply_counter_deltas(Course, pk, fields)
+    for pk, fields in totals["institute"].items():
+        counters.apply_counter_deltas(Institute, pk, fields)
+
+
+def _bulk_set_status(admissions, status, report):
+    changed = []
+    for admission in admissions:
+        if admission.status == status:
+            report[admission.pk] = ALREADY_IN_STATUS
+        else:
+            changed.append(admission)
+            report[admission.pk] = UPDATED
+    if changed:
+        Admission.objects.filter(pk__in=[a.pk for a in changed]).update(status=status)
+        transitions = []
+        for admission in changed:
+            before = counters.admission_state(admission)
+            admission.status = status
+            transitions.append((before, counters.admission_state(admission)))
+        _apply_bulk_counters(transitions, [])
+        verification.invalidate([a.pk for a in changed])
+
+
+def _bulk_accept(admissions, report):
+    candidates = []
+    for admission in admissions:
+        student = getattr(admission.user, "student_profile", None) if admission.user else None
+        if admission.status == "accepted":
+            report[admission.pk] = ALREADY_ACCEPTED
+        elif student is None or admission.course_id is None:
+            report[admission.pk] = NOT_ELIGIBLE
+        else:
+            candidates.append((admission, student))
+
+    enrolled_pairs = set(
+        Enrollment.objects.filter(
+            student__in=[s for _a, s in candidates],
+            course__in=[a.course_id for a, _s in candidates],
+        ).values_list("student_id", "course_id")
+    )
+
+    # First come, first served within each course
+    wanted = {}
+    accepted = []
+    for admission, student in candidates:
+        pair = (student.pk, admission.course_id)
+        if pair in enrolled_pairs:
+            report[admission.pk] = ALREADY_ENROLLED
+            accepted.append(admission)
+        else:
+            enrolled_pairs.add(pair)
+            wanted.setdefault(admission.course_id, []).append((admission, student))
+
+    # One seat UPDATE per course, courses locked in id order
+    seats = dict(
+        Course.objects.select_for_update()
+        .filter(pk__in=sorted(wanted))
+        .order_by("pk")
+        .values_list("pk", "seats")
+    )
+    new_enrollments = []
+    for course_id in sorted(wanted):
+        queue = wanted[course_id]
+        granted = min(len(queue), seats.get(course_id, 0))
+        if granted and not Course.objects.filter(pk=course_id, seats__gte=granted).update(
+            seats=F("seats") - granted
+        ):
+            granted = 0
+        for position, (admission, student) in enumerate(queue):
+            if position < granted:
+                report[admission.pk] = ACCEPTED
+                accepted.append(admission)
+                new_enrollments.append(Enrollment(
+                    student=student,
+                    course_id=course_id,
+                    institute_id=admission.institute_id,
+                ))
+            else:
+                report[admission.pk] = NO_SEATS
+
+    Enrollment.objects.bulk_create(new_enrollments)
+    if accepted:
+        Admission.objects.filter(pk__in=[a.pk for a in accepted]).update(status="accepted")
+
+    transitions = []
+    for admission in accepted:
+        before = counters.admission_state(admission)
+        admission.status = "accepted"
+        transitions.append((before, counters.admission_state(admission)))
+    _apply_bulk_counters(transitions, [(e.course_id, e.institute_id) for e in new_enrollments])
+
+    for institute_id in {a.institute_id for a in accepted}:
+        bump_detail_version(institute_id)
+    offer_letters.enqueue([a.pk for a in accepted])
+    verification.invalidate([a.pk for a in accepted])
+
+
+def bulk_update_admissions(admission_ids, action, institute=None):
+    """
+    Apply "shortlist", "reject" or "accept" to many admissions in one
+    transaction. Returns [(admission_id, result)] in the order given;
+    ``institute`` limits the update to that institute's admissions.
+    """
+    if action != "accept" and action not in BULK_STATUSES:
+        raise ValueError(f"Unknown bulk action: {action}")
+
+    admission_ids = list(dict.fromkeys(int(pk) for pk in admission_ids))
+    report = {}
+    with transaction.atomic():
+        admissions = (
+            Admission.objects
+            .select_for_update(of=("self",))
+            .select_related("user__student_profile")
+            .filter(pk__in=admission_ids)
+            .order_by("created_at", "pk")
+        )
+        if institute is not None:
+            admissions = admissions.filter(institute=institute)
+        admissions = list(admissions)
+
+        if action == "accept":
+            _bulk_accept(admissions, report)
+        else:
+            _bulk_set_status(admissions, BULK_STATUSES[action], report)
+
+    return [(pk, report.get(pk, NOT_FOUND)) for pk in admission_ids]
+
+
+def summarize(report, limit=20):
+    """Human-readable lines for a bulk report: totals, then items needing attention."""
+    totals = {}
+    for _pk, result in report:
+        totals[result] = totals.get(result, 0) + 1
+    lines = [", ".join(f"{count} {result.replace('_', ' ')}" for result, count in totals.items())]
+    problems = [(pk, result) for pk, result in report if result in (NO_SEATS, NOT_ELIGIBLE, NOT_FOUND)]
+    for pk, result in problems[:limit]:
+        lines.append(f"Admission #{pk}: {MESSAGES[result]}")
+    if len(problems) > limit:
+        lines.append(f"...and {len(problems) - limit} more.")
+    return lines
@@ -0,0 +1,269 @@
+import re
+
+from django.db import connection
+
+from main.models import Course, CourseCategory, Institute
+
+
+# Inverted index over courses, categories and institutes.
+#   sqlite     -> FTS5 virtual table
+#   postgresql -> table with a weighted tsvector column and a GIN index
+# Any other backend falls back to icontains lookups.
+
+INDEX_TABLE = "main_search_index"
+
+# kind -> (model, rowid tag); the tag keeps FTS5 rowids unique across kinds
+KINDS = {
+    "course": (Course, 1),
+    "category": (CourseCategory, 2),
+    "institute": (Institute, 3),
+}
+
+MAX_TOKENS = 8
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# -----------------------------------
+# Documents
+# -----------------------------------
+def kind_for(instance):
+    for kind, (model, _tag) in KINDS.items():
+        if isinstance(instance, model):
+            return kind
+    return None
+
+
+# kind -> (title field, body field or None). Migration 0003 fills the index
+# from historical models through these field names.
+DOCUMENT_FIELDS = {
+    "course": ("title", "description"),
+    "category": ("title", None),
+    "institute": ("name", "address"),
+}
+
+
+def document_for(instance):
+    """Return the (title, body) pair indexed for a model instance."""
+    kind = kind_for(instance)
+    if kind is None:
+        raise TypeError(f"{type(instance).__name__} is not searchable")
+    title_field, body_field = DOCUMENT_FIELDS[kind]
+    body = getattr(instance, body_field) if body_field else ""
+    return getattr(instance, title_field), body or ""
+
+
+def tokenize(query):
+    return [t.lower() for t in _TOKEN_RE.findall(query or "")][:MAX_TOKENS]
+
+
+def _rowid(kind, object_id):
+    return object_id * 4 + KINDS[kind][1]
+
+
+def _vendor(conn=None):
+    return (conn or connection).vendor
+
+
+def is_supported(conn=None):
+    return _vendor(conn) in ("sqlite", "postgresql")
+
+
+# -----------------------------------
+# Schema
+# -----------------------------------
+def create_index_table(conn):
+    vendor = _vendor(conn)
+    with conn.cursor() as cursor:
+        if vendor == "sqlite":
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+                "kind UNINDEXED, title, body, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        elif vendor == "postgresql":
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {INDEX_TABLE} ("
+                "kind varchar(16) NOT NULL, "
+                "object_id bigint NOT NULL, "
+                "title text NOT NULL, "
+                "body text NOT NULL, "
+                "document tsvector NOT NULL, "
+                "PRIMARY KEY (kind, object_id))"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {INDEX_TABLE}_document_gin "
+                f"ON {INDEX_TABLE} USING GIN (document)"
+            )
+
+
+def drop_index_table(conn):
+    if is_supported(conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {INDEX_TABLE}")
+
+
+# -----------------------------------
+# Maintenance
+# -----------------------------------
+_PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', %s), 'A') || "
+    "setweight(to_tsvector('simple', %s), 'B')"
+)
+
+
+def _upsert_rows(cursor, vendor, rows):
+    # rows: iterable of (kind, object_id, title, body)
+    if vendor == "sqlite":
+        rows = [(_rowid(kind, pk), kind, title, body) for kind, pk, title, body in rows]
+        cursor.executemany(f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s", [(r[0],) for r in rows])
+        cursor.executemany(
+            f"INSERT INTO {INDEX_TABLE} (rowid, kind, title, body) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+    else:
+        cursor.executemany(
+            f"INSERT INTO {INDEX_TABLE} (kind, object_id, title, body, document) "
+            f"VALUES (%s, %s, %s, %s, {_PG_DOCUMENT}) "
+            "ON CONFLICT (kind, object_id) DO UPDATE SET "
+            "title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document",
+            [(kind, pk, title, body, title, body) for kind, pk, title, body in rows],
+        )
+
+
+def index_object(instance):
+    if not is_supported():
+        return
+    kind = kind_for(instance)
+    title, body = document_for(instance)
+    with connection.cursor() as cursor:
+        _upsert_rows(cursor, _vendor(), [(kind, instance.pk, title, body)])
+
+
+def remove_object(instance):
+    if not is_supported():
+        return
+    kind = kind_for(instance)
+    with connection.cursor() as cursor:
+        if _vendor() == "sqlite":
+            cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s", [_rowid(kind, instance.pk)])
+        else:
+            cursor.execute(
+                f"DELETE FROM {INDEX_TABLE} WHERE kind = %s AND object_id = %s",
+                [kind, instance.pk],
+            )
+
+
+def fill_index(conn, models, batch_size=1000):
+    """
+    Index every row of ``models`` ({kind: model class}, historical models
+    allowed) on ``conn``; returns the number of indexed rows per kind.
+    """
+    vendor = _vendor(conn)
+    counts = {}
+    with conn.cursor() as cursor:
+        for kind, model in models.items():
+            title_field, body_field = DOCUMENT_FIELDS[kind]
+            fields = ["pk", title_field] + ([body_field] if body_field else [])
+            rows = model._default_manager.using(conn.alias).order_by("pk").values_list(*fields)
+            counts[kind] = 0
+            batch = []
+            for pk, title, *body in rows.iterator(chunk_size=batch_size):
+                batch.append((kind, pk, title, (body[0] if body else "") or ""))
+                if len(batch) >= batch_size:
+                    _upsert_rows(cursor, vendor, batch)
+                    counts[kind] += len(batch)
+                    batch = []
+            if batch:
+                _upsert_rows(cursor, vendor, batch)
+                counts[kind] += len(batch)
+    return counts
+
+
+def rebuild_index(batch_size=1000):
+    """Rebuild the whole index; returns the number of indexed rows per kind."""
+    if not is_supported():
+        return {}
+    create_index_table(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+    return fill_index(connection, {kind: model for kind, (model, _tag) in KINDS.items()}, batch_size)
+
+
+# -----------------------------------
+# Queries
+# -----------------------------------
+def _ranked_ids_sqlite(tokens, limit):
+    match = " ".join(f'"{t}"*' for t in tokens)
+    sql = (
+        "SELECT kind, rowid FROM ("
+        "  SELECT kind, rowid, row_number() OVER ("
+        f"    PARTITION BY kind ORDER BY bm25({INDEX_TABLE}, 0.0, 10.0, 1.0)"
+        "  ) AS position"
+        f"  FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s"
+        ") WHERE position <= %s ORDER BY kind, position"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, limit])
+        return [(kind, rowid // 4) for kind, rowid in cursor.fetchall()]
+
+
+def _ranked_ids_postgresql(tokens, limit):
+    tsquery = " & ".join(f"{t}:*" for t in tokens)
+    sql = (
+        "SELECT kind, object_id FROM ("
+        "  SELECT kind, object_id, row_number() OVER ("
+        "    PARTITION BY kind ORDER BY ts_rank(document, q) DESC"
+        "  ) AS position"
+        f"  FROM {INDEX_TABLE}, to_tsquery('simple', %s) AS q"
+        "  WHERE document @@ q"
+        ") ranked WHERE position <= %s ORDER BY kind, position"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [tsquery, limit])
+        return cursor.fetchall()
+
+
+def ranked_ids(query, limit=5):
+    """Return {kind: [object ids best match first]} for a search query."""
+    tokens = tokenize(query)
+    results = {kind: [] for kind in KINDS}
+    if not tokens:
+        return results
+
+    vendor = _vendor()
+    if vendor == "sqlite":
+        rows = _ranked_ids_sqlite(tokens, limit)
+    elif vendor == "postgresql":
+        rows = _ranked_ids_postgresql(tokens, limit)
+    else:
+        return _fallback_ids(query, limit)
+
+    for kind, object_id in rows:
+        results[kind].append(object_id)
+    return results
+
+
+def _fallback_ids(query, limit):
+    return {
+        "course": list(Course.objects.filter(title__icontains=query).values_list("id", flat=True)[:limit]),
+        "category": list(CourseCategory.objects.filter(title__icontains=query).values_list("id", flat=True)[:limit]),
+        "institute": list(Institute.objects.filter(name__icontains=query).values_list("id", flat=True)[:limit]),
+    }
+
+
+def _in_rank_order(queryset, ids):
+    if not ids:
+        return []
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def search(query, limit=5):
+    """Ranked model instances for the search dropdown."""
+    ids = ranked_ids(query, limit)
+    return {
+        "categories": _in_rank_order(CourseCategory.objects.select_related("institute"), ids["category"]),
+        "courses": _in_rank_order(Course.objects.select_related("institute"), ids["course"]),
+        "institutes": _in_rank_order(Institute.objects.all(), ids["institute"]),
+    }
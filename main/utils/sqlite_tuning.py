@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+# SQLite profile for single-box deployments. With the stock rollback
+# journal a writer locks readers out while it commits, and a transaction
+# that reads before it writes (accepting an admission, paying for one) can
+# only upgrade its lock if nobody else got there first; when that fails
+# SQLite answers "database is locked" at once instead of waiting. The
+# profile switches to WAL, so readers never wait for the writer, and the
+# settings open transactions with BEGIN IMMEDIATE, so writers take the lock
+# up front and queue on busy_timeout instead of failing.
+#
+# The PRAGMAs in SQLITE_PRAGMAS are applied to every new SQLite connection
+# from the connection_created signal (see main/signals.py). journal_mode is
+# stored in the database file; the others last for the connection.
+
+
+def pragmas():
+    return getattr(settings, "SQLITE_PRAGMAS", {})
+
+
+def apply_pragmas(connection, values=None):
+    """Run ``PRAGMA name = value`` for each configured setting on ``connection``."""
+    if connection.vendor != "sqlite":
+        return
+    values = pragmas() if values is None else values
+    with connection.cursor() as cursor:
+        for name, value in values.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def current(connection, name):
+    """Value of PRAGMA ``name`` on ``connection``."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@contextmanager
+def transaction_mode(mode):
+    """
+    Open transactions with ``mode`` (None, "DEFERRED", "IMMEDIATE") on
+    SQLite connections created inside the block; connections already open
+    keep theirs. Used by benchmark_sqlite to compare profiles.
+    """
+    previous = {}
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        if settings_dict["ENGINE"] != "django.db.backends.sqlite3":
+            continue
+        options = settings_dict.setdefault("OPTIONS", {})
+        previous[alias] = options.pop("transaction_mode", None)
+        if mode is not None:
+            options["transaction_mode"] = mode
+    try:
+        yield
+    finally:
+        for alias, old in previous.items():
+            options = connections.settings[alias]["OPTIONS"]
+            options.pop("transaction_mode", None)
+            if old is not None:
+                options["transaction_mode"] = old
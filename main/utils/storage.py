@@ -0,0 +1,218 @@
+import hashlib
+import logging
+import posixpath
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+
+logger = logging.getLogger(__name__)
+
+
+# Content-addressed media storage. Uploads are stored once per SHA-256
+# digest under blobs/ab/cd/<digest><ext>, whatever the upload_to path or
+# original filename, and a StoredFile row counts how many saves point at
+# each blob. delete() drops one reference and removes the file (after the
+# transaction commits) when none are left; replacing or clearing a file on
+# save releases the old one the same way (replaced_files / release). So an
+# institute re-uploading its
+# logo as a signature, or a student attaching the same marksheet to several
+# admissions, costs no extra disk. Files saved before this storage existed
+# have no StoredFile row and are only removed once no model refers to them.
+#
+# Models are imported lazily: main/models.py imports this module.
+
+BLOB_PREFIX = "blobs"
+CHUNK_SIZE = 64 * 1024
+
+
+def _stored_file_model():
+    return apps.get_model("main", "StoredFile")
+
+
+def content_digest(content):
+    content.seek(0)
+    digest = hashlib.sha256()
+    for chunk in content.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def blob_name(digest, original_name):
+    ext = posixpath.splitext(original_name)[1].lower()
+    return posixpath.join(BLOB_PREFIX, digest[:2], digest[2:4], digest + ext)
+
+
+def is_blob(name):
+    return name.startswith(BLOB_PREFIX + "/")
+
+
+class DedupFileSystemStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The stored name comes from the content digest in _save()
+        return name
+
+    def _save(self, name, content):
+        digest = content_digest(content)
+        StoredFile = _stored_file_model()
+        with transaction.atomic():
+            stored, created = StoredFile.objects.select_for_update().get_or_create(
+                digest=digest,
+                defaults={"name": blob_name(digest, name), "size": content.size, "refcount": 1},
+            )
+            if not created:
+                StoredFile.objects.filter(pk=stored.pk).update(refcount=F("refcount") + 1)
+        if not created and self.exists(stored.name):
+            return stored.name
+        # First copy, or the blob went missing: (re)write it. Overwriting is
+        # allowed, and identical content makes a concurrent writer harmless.
+        return super()._save(stored.name, content)
+
+    def delete(self, name):
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        if not is_blob(name):
+            if not references(name):
+                super().delete(name)
+            return
+
+        StoredFile = _stored_file_model()
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(name=name).first()
+            if stored is None:
+                return
+            if stored.refcount > 1:
+                StoredFile.objects.filter(pk=stored.pk).update(refcount=F("refcount") - 1)
+                return
+            stored.delete()
+        transaction.on_commit(lambda: self._remove_blob(name))
+
+    def delete_many(self, names):
+        """delete() for several names, checking the non-blob ones' references in one query."""
+        in_use = referenced([name for name in names if not is_blob(name)])
+        for name in names:
+            if is_blob(name):
+                self.delete(name)
+            elif name not in in_use:
+                super().delete(name)
+
+    def _remove_blob(self, name):
+        # A save of the same content may have revived the blob since
+        if _stored_file_model().objects.filter(name=name).exists():
+            return
+        super().delete(name)
+        from main.utils import images
+
+        images.discard(name, self)
+
+
+def dedup_storage():
+    return _dedup_storage
+
+
+_dedup_storage = DedupFileSystemStorage(allow_overwrite=True)
+
+
+# -----------------------------------
+# References
+# -----------------------------------
+def dedup_fields():
+    """(model, field name) for every file field backed by the dedup storage."""
+    found = []
+    for model in apps.get_app_config("main").get_models():
+        for field in model._meta.get_fields():
+            if getattr(field, "storage", None) is _dedup_storage:
+                found.append((model, field.name))
+    return found
+
+
+def references(name):
+    """Number of rows whose dedup-backed file fields point at ``name``."""
+    return sum(
+        model._default_manager.filter(**{field: name}).count() for model, field in dedup_fields()
+    )
+
+
+def referenced(names):
+    """The subset of ``names`` that some dedup-backed file field points at, in one query."""
+    names = list(names)
+    if not names:
+        return set()
+    queries = [
+        model._default_manager.filter(**{f"{field}__in": names}).order_by().values_list(field, flat=True)
+        for model, field in dedup_fields()
+    ]
+    return set(queries[0].union(*queries[1:]))
+
+
+def replaced_files(instance, update_fields=None):
+    """
+    Names of the dedup-backed files that saving ``instance`` will replace or
+    clear, read from its stored row. Call before the save.
+    """
+    fields = [
+        field.name for field in instance._meta.concrete_fields
+        if getattr(field, "storage", None) is _dedup_storage
+        and (update_fields is None or field.name in update_fields)
+    ]
+    if instance.pk is None or not fields:
+        return []
+    stored = type(instance)._default_manager.filter(pk=instance.pk).values(*fields).first()
+    if stored is None:
+        return []
+    return [stored[field] for field in fields if stored[field] and stored[field] != getattr(instance, field).name]
+
+
+def release(names):
+    """Drop one reference to each of ``names``, e.g. the files a save replaced."""
+    for name in names:
+        try:
+            _dedup_storage.delete(name)
+        except OSError as e:
+            logger.warning("Could not delete %s: %s", name, e)
+
+
+def delete_files(instance):
+    """Release every dedup-backed file of a deleted ``instance``."""
+    for field in instance._meta.get_fields():
+        if getattr(field, "storage", None) is not _dedup_storage:
+            continue
+        field_file = getattr(instance, field.name)
+        if field_file:
+            try:
+                field_file.storage.delete(field_file.name)
+            except OSError as e:
+                logger.warning("Could not delete %s: %s", field_file.name, e)
+
+
+def reconcile(dry_run=False):
+    """
+    Reset every StoredFile refcount from the rows that actually point at it
+    and remove blobs nothing refers to (saves that were rolled back, files
+    replaced on edit). Returns (updated, removed) counts.
+    """
+    StoredFile = _stored_file_model()
+    counts = {}
+    for model, field in dedup_fields():
+        names = model._default_manager.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+        for name in names.values_list(field, flat=True).iterator():
+            counts[name] = counts.get(name, 0) + 1
+
+    updated = removed = 0
+    for stored in StoredFile.objects.iterator():
+        refcount = counts.get(stored.name, 0)
+        if refcount == stored.refcount:
+            continue
+        if refcount:
+            updated += 1
+            if not dry_run:
+                StoredFile.objects.filter(pk=stored.pk).update(refcount=refcount)
+        else:
+            removed += 1
+            if not dry_run:
+                stored.delete()
+                _dedup_storage._remove_blob(stored.name)
+    return updated, removed
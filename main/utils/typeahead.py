@@ -0,0 +1,216 @@
+import hashlib
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+
+from main.models import Course, CourseCategory, Institute
+from main.routers import primary_reads
+from main.utils import images, search
+from main.utils.pricing import final_price
+
+
+# Per-prefix response cache for the search dropdown.
+#
+# Each normalised query is cached for a short TTL. When every kind returned
+# no more than TYPEAHEAD_REUSE_LIMIT matches the entry is "complete": it holds the
+# full match set, so any longer query that extends it ("pyt" -> "pyth") is
+# answered by filtering the cached rows in Python instead of hitting the
+# index. Empty results are complete too, which gives negative caching.
+
+CACHE_PREFIX = "typeahead:v2:"
+GENERATION_KEY = "typeahead:generation"
+
+RESULT_LIMIT = 5
+
+
+def _ttl():
+    return getattr(settings, "TYPEAHEAD_CACHE_TIMEOUT", 60)
+
+
+def _negative_ttl():
+    return getattr(settings, "TYPEAHEAD_NEGATIVE_CACHE_TIMEOUT", 120)
+
+
+def _reuse_limit():
+    return getattr(settings, "TYPEAHEAD_REUSE_LIMIT", 50)
+
+
+def normalize(query):
+    return " ".join((query or "").lower().split())
+
+
+def _generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def invalidate(**kwargs):
+    # Any index change retires every cached entry at once
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def cache_key(normalized, generation=None):
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    return f"{CACHE_PREFIX}{generation or _generation()}:{digest}"
+
+
+# -----------------------------------
+# Rows
+# -----------------------------------
+# Response tuples:
+#   courses    -> [id, title, final_price, institute_name, image_url]
+#   categories -> [id, title, institute_name, image_url]
+#   institutes -> [id, name, logo_url]
+# Cached entries keep the indexed words of each row next to the tuple so
+# longer queries can be matched without going back to the database.
+
+def _url(field):
+    return images.rendition_url(field, 160) if field else ""
+
+
+def fold(token):
+    """Case- and accent-fold like the FTS tokenizer (unicode61 remove_diacritics)."""
+    decomposed = unicodedata.normalize("NFKD", token)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def _words(*texts):
+    return sorted({fold(w) for text in texts for w in search.tokenize(text)})
+
+
+def _course_rows(ids):
+    objects = Course.objects.select_related("institute").with_final_price().in_bulk(ids)
+    rows = []
+    for pk in ids:
+        c = objects.get(pk)
+        if c is None:
+            continue
+        title, body = search.document_for(c)
+        rows.append((
+            [c.id, c.title, f"{final_price(c):.2f}", c.institute.name, _url(c.image)],
+            _words(title, body),
+        ))
+    return rows
+
+
+def _category_rows(ids):
+    objects = CourseCategory.objects.select_related("institute").in_bulk(ids)
+    rows = []
+    for pk in ids:
+        cat = objects.get(pk)
+        if cat is None:
+            continue
+        title, body = search.document_for(cat)
+        rows.append((
+            [cat.id, cat.title, cat.institute.name, _url(cat.image)],
+            _words(title, body),
+        ))
+    return rows
+
+
+def _institute_rows(ids):
+    objects = Institute.objects.in_bulk(ids)
+    rows = []
+    for pk in ids:
+        inst = objects.get(pk)
+        if inst is None:
+            continue
+        title, body = search.document_for(inst)
+        rows.append((
+            [inst.id, inst.name, _url(inst.profile_logo)],
+            _words(title, body),
+        ))
+    return rows
+
+
+_ROW_BUILDERS = {
+    "courses": ("course", _course_rows),
+    "categories": ("category", _category_rows),
+    "institutes": ("institute", _institute_rows),
+}
+
+
+# -----------------------------------
+# Entries
+# -----------------------------------
+def _build_entry(normalized):
+    reuse_limit = _reuse_limit()
+    ids = search.ranked_ids(normalized, limit=reuse_limit + 1)
+    complete = all(len(kind_ids) <= reuse_limit for kind_ids in ids.values())
+
+    rows = {}
+    for name, (kind, builder) in _ROW_BUILDERS.items():
+        # Incomplete entries can never be reused, so only the top rows are kept
+        kind_ids = ids[kind] if complete else ids[kind][:RESULT_LIMIT]
+        rows[name] = builder(kind_ids)
+    return {"complete": complete, "rows": rows}
+
+
+def _matches(words, tokens):
+    return all(any(w.startswith(t) for w in words) for t in tokens)
+
+
+def _narrow_entry(entry, normalized):
+    tokens = [fold(t) for t in search.tokenize(normalized)]
+    rows = {
+        name: [row for row in kind_rows if _matches(row[1], tokens)]
+        for name, kind_rows in entry["rows"].items()
+    }
+    return {"complete": True, "rows": rows}
+
+
+def _cached_prefix_entry(normalized):
+    """Longest complete cached entry for a strict prefix of the query."""
+    prefixes = [normalized[:n].rstrip() for n in range(len(normalized) - 1, 0, -1)]
+    prefixes = [p for p in dict.fromkeys(prefixes) if p]
+    if not prefixes:
+        return None
+    generation = _generation()
+    keys = {p: cache_key(p, generation) for p in prefixes}
+    found = cache.get_many(list(keys.values()))
+    for prefix in prefixes:
+        entry = found.get(keys[prefix])
+        if entry is not None and entry["complete"]:
+            return entry
+    return None
+
+
+def _is_empty(entry):
+    return not any(entry["rows"].values())
+
+
+def lookup(query):
+    """
+    Return (payload, source) for a dropdown query, where source is one of
+    "hit", "prefix" or "miss".
+    """
+    normalized = normalize(query)
+    if not normalized:
+        return _payload(normalized, {"rows": {name: [] for name in _ROW_BUILDERS}}), "hit"
+
+    key = cache_key(normalized)
+    entry = cache.get(key)
+    source = "hit"
+
+    if entry is None:
+        parent = _cached_prefix_entry(normalized)
+        if parent is not None:
+            entry = _narrow_entry(parent, normalized)
+            source = "prefix"
+        else:
+            with primary_reads():
+                entry = _build_entry(normalized)
+            source = "miss"
+        cache.set(key, entry, _negative_ttl() if _is_empty(entry) else _ttl())
+
+    return _payload(normalized, entry), source
+
+
+def _payload(normalized, entry):
+    payload = {"q": normalized}
+    for name, kind_rows in entry["rows"].items():
+        payload[name] = [row[0] for row in kind_rows[:RESULT_LIMIT]]
+    return payload
@@ -0,0 +1,274 @@
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File, locks
+from django.db import transaction
+from django.utils import timezone
+
+from main.models import AdmissionDocument, UploadSession
+
+
+# Chunked, resumable uploads for admission documents. The client opens a
+# session with the file's name, size and document type, then PUTs the bytes
+# in order with a Content-Range header. Each chunk is streamed from the
+# request straight into a part file under UPLOAD_SESSION_DIR, so nothing is
+# held in memory, and the per-type size limit is checked before and while
+# writing. After a dropped connection the client asks for the session and
+# resumes from ``received``; bytes it re-sends are skipped. A complete
+# session is attached to an AdmissionDocument by moving the part file into
+# storage, once.
+
+OPEN = "open"
+COMPLETE = "complete"
+ATTACHED = "attached"
+
+READ_SIZE = 64 * 1024
+
+# Largest body create_upload reads; it only carries a few short fields
+CREATE_BODY_MAX = 4 * 1024
+
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadError(Exception):
+    """A rejected upload request; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400, received=None):
+        super().__init__(message)
+        self.status = status
+        self.received = received
+
+
+def upload_dir():
+    return getattr(settings, "UPLOAD_SESSION_DIR", os.path.join(settings.BASE_DIR, "cache", "uploads"))
+
+
+def chunk_size():
+    return getattr(settings, "UPLOAD_CHUNK_SIZE", 1024 * 1024)
+
+
+def _expiry():
+    return getattr(settings, "UPLOAD_SESSION_EXPIRY", 24 * 60 * 60)
+
+
+def max_sessions():
+    return getattr(settings, "UPLOAD_MAX_SESSIONS", 10)
+
+
+def max_size(doc_type):
+    """Size limit for ``doc_type`` in bytes, or None for an unknown type."""
+    return getattr(settings, "ADMISSION_DOCUMENT_MAX_SIZE", {}).get(doc_type)
+
+
+def check_size(doc_type, size):
+    limit = max_size(doc_type)
+    if limit is None:
+        raise UploadError(f"Unknown document type: {doc_type}")
+    if size > limit:
+        raise UploadError(f"{doc_type} files must be at most {limit // (1024 * 1024)} MB.", status=413)
+
+
+def check_content_length(header, limit):
+    """
+    The request's Content-Length as an int, checked against ``limit`` before
+    any of the body is read.
+    """
+    try:
+        length = int(header)
+    except (TypeError, ValueError):
+        raise UploadError("A Content-Length header is required.", status=411)
+    if length < 0:
+        raise UploadError("Content-Length must not be negative.")
+    if length > limit:
+        raise UploadError(f"Request bodies must be at most {limit} bytes.", status=413)
+    return length
+
+
+def part_path(session):
+    return os.path.join(upload_dir(), f"{session.pk}.part")
+
+
+def describe(session):
+    return {
+        "id": str(session.pk),
+        "doc_type": session.doc_type,
+        "filename": session.filename,
+        "size": session.size,
+        "received": session.received,
+        "status": session.status,
+        "chunk_size": chunk_size(),
+    }
+
+
+# -----------------------------------
+# Sessions
+# -----------------------------------
+def create_session(user, doc_type, filename, size):
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("size must be a whole number of bytes.")
+    filename = os.path.basename(str(filename or "")).strip()
+    if not filename or size <= 0:
+        raise UploadError("filename and a positive size are required.")
+    check_size(doc_type, size)
+    # Every unattached session holds a part file on disk
+    held = UploadSession.objects.filter(user=user).exclude(status=ATTACHED).count()
+    if held >= max_sessions():
+        raise UploadError(
+            f"At most {max_sessions()} uploads may be in progress; finish or cancel one first.", status=429,
+        )
+
+    session = UploadSession.objects.create(
+        user=user, doc_type=doc_type, filename=filename[:255], size=size,
+    )
+    os.makedirs(upload_dir(), exist_ok=True)
+    open(part_path(session), "wb").close()
+    return session
+
+
+def parse_content_range(header, size):
+    """(start, end) from ``bytes start-end/total``, checked against the session size."""
+    match = CONTENT_RANGE_RE.match(header or "")
+    if not match:
+        raise UploadError("A Content-Range header of the form 'bytes start-end/total' is required.")
+    start, end, total = map(int, match.groups())
+    if total != size:
+        raise UploadError("Content-Range total does not match the session size.")
+    if start > end or end >= size:
+        raise UploadError("Content-Range is outside the file.", status=416)
+    return start, end
+
+
+def write_chunk(session, stream, content_range, content_length=None):
+    """
+    Append the chunk in ``stream`` to the session's part file and return the
+    refreshed session. Chunks must start at or before ``received``; any
+    bytes already stored are read and skipped, so retries are idempotent.
+    The headers are checked before anything is read from ``stream``.
+    """
+    start, end = parse_content_range(content_range, session.size)
+    length = end - start + 1
+    if length > chunk_size():
+        raise UploadError(f"Chunks must be at most {chunk_size()} bytes.", status=413)
+    if content_length is not None and check_content_length(content_length, chunk_size()) != length:
+        raise UploadError("Content-Length does not match Content-Range.")
+
+    path = part_path(session)
+    try:
+        part = open(path, "r+b")
+    except FileNotFoundError:
+        raise UploadError("This upload has expired.", status=410)
+
+    with part:
+        # One writer per session; concurrent chunks wait and then see the
+        # offset the previous one left behind
+        locks.lock(part, locks.LOCK_EX)
+        try:
+            session.refresh_from_db()
+            if session.status != OPEN:
+                raise UploadError("This upload is already complete.", status=409, received=session.received)
+            received = session.received
+            if start > received:
+                raise UploadError("Chunk starts past the received bytes.", status=409, received=received)
+
+            skip = received - start
+            remaining = length
+            part.seek(received)
+            while remaining > 0:
+                data = stream.read(min(READ_SIZE, remaining))
+                if not data:
+                    # Client went away; keep what arrived so it can resume
+                    break
+                remaining -= len(data)
+                if skip:
+                    dropped = min(skip, len(data))
+                    data, skip = data[dropped:], skip - dropped
+                if data:
+                    part.write(data)
+                    received += len(data)
+            if stream.read(1):
+                part.truncate(session.received)
+                raise UploadError("Chunk body is longer than its Content-Range.", status=413, received=session.received)
+            part.flush()
+
+            status = COMPLETE if received == session.size else OPEN
+            UploadSession.objects.filter(pk=session.pk).update(
+                received=received, status=status, updated_at=timezone.now(),
+            )
+            session.received, session.status = received, status
+        finally:
+            locks.unlock(part)
+    return session
+
+
+def abort(session):
+    _remove_part(session)
+    session.delete()
+
+
+def _remove_part(session):
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+
+
+# -----------------------------------
+# Attaching
+# -----------------------------------
+class AssembledUpload(File):
+    """A finished part file; storages move it into place instead of copying."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def completed_session(user, session_id, doc_type):
+    """The user's complete, unattached session for ``doc_type``, or None."""
+    try:
+        return UploadSession.objects.get(pk=session_id, user=user, doc_type=doc_type, status=COMPLETE)
+    except (UploadSession.DoesNotExist, ValidationError):
+        return None
+
+
+def attach(session, admission):
+    """
+    Create the AdmissionDocument for a complete session. Raises UploadError
+    (409) when the session was attached already, e.g. by a repeated submit.
+    """
+    path = part_path(session)
+    with transaction.atomic():
+        # Claim the session first; a concurrent attach waits here and then
+        # finds it taken
+        claimed = UploadSession.objects.filter(pk=session.pk, status=COMPLETE).update(status=ATTACHED)
+        if not claimed:
+            raise UploadError("This upload has already been attached.", status=409)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            raise UploadError("This upload has expired.", status=410)
+        with f:
+            document = AdmissionDocument.objects.create(
+                admission=admission,
+                doc_type=session.doc_type,
+                file=AssembledUpload(f, name=session.filename),
+            )
+        UploadSession.objects.filter(pk=session.pk).update(document=document)
+    # Left behind when the content was already stored
+    _remove_part(session)
+    return document
+
+
+def expire_sessions():
+    """Drop sessions (and their part files) idle for UPLOAD_SESSION_EXPIRY; returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=_expiry())
+    stale = UploadSession.objects.filter(updated_at__lt=cutoff)
+    count = 0
+    for session in stale.iterator():
+        abort(session)
+        count += 1
+    return count
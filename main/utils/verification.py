@@ -0,0 +1,153 @@
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from main.models import Admission
+
+
+# Public verification of admissions by QR scan. The QR holds an
+# HMAC-signed token, so forged or mistyped codes are rejected before any
+# database access. Valid tokens are answered from a small cached record
+# (student, course, institute, status). Saving the admission drops its
+# record; saving a course or institute bumps that object's version number
+# instead, and records stamped with an older version are rebuilt on their
+# next scan, so the save doesn't have to find every admission under it.
+
+SALT = "main.admission-verification"
+CACHE_PREFIX = "verify:admission:"
+VERSION_KEY = "verify:{}:{}:version"
+
+
+def _signer():
+    return signing.Signer(salt=SALT)
+
+
+def _timeout():
+    return getattr(settings, "VERIFICATION_CACHE_TIMEOUT", 3600)
+
+
+def make_token(admission_id):
+    return _signer().sign(str(admission_id))
+
+
+def admission_id_from_token(token):
+    """The admission id a token was signed for, or None if it is forged."""
+    try:
+        value = _signer().unsign(token)
+    except signing.BadSignature:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def cache_key(admission_id):
+    return f"{CACHE_PREFIX}{admission_id}"
+
+
+# -----------------------------------
+# Versions
+# -----------------------------------
+def _version_keys(course_id, institute_id):
+    keys = [VERSION_KEY.format("institute", institute_id)]
+    if course_id is not None:
+        keys.append(VERSION_KEY.format("course", course_id))
+    return keys
+
+
+def _versions(keys):
+    """Current value of each version key, starting the missing ones."""
+    found = cache.get_many(keys)
+    # Start from the clock, not 1, so a version that was evicted can't
+    # come back with a value an old record was stamped with
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+    return {**found, **missing}
+
+
+def _stamp(course_id, institute_id, versions):
+    return [versions[key] for key in _version_keys(course_id, institute_id)]
+
+
+def bump(kind, pk):
+    """Outdate the records of every admission to course or institute ``pk``."""
+    key = VERSION_KEY.format(kind, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+# -----------------------------------
+# Records
+# -----------------------------------
+def build_record(admission):
+    return {
+        "admission_id": admission.id,
+        "student_name": admission.student_name,
+        "course": admission.course.title if admission.course else None,
+        "institute": admission.institute.name,
+        "status": admission.status,
+        "verified": admission.status == "accepted",
+        "applied_on": admission.created_at.date().isoformat(),
+    }
+
+
+# Cached for deleted admissions so repeated scans stay off the database
+MISSING = {"verified": False, "status": "not_found"}
+
+
+# Cached as {"record", "course_id", "institute_id", "stamp"}, where stamp
+# holds the institute's and course's versions when the record was built
+def _entry(admission, versions):
+    return {
+        "record": build_record(admission),
+        "course_id": admission.course_id,
+        "institute_id": admission.institute_id,
+        "stamp": _stamp(admission.course_id, admission.institute_id, versions),
+    }
+
+
+def get_record(admission_id):
+    key = cache_key(admission_id)
+    entry = cache.get(key)
+    if entry is not None:
+        if entry["record"] == MISSING:
+            return entry["record"]
+        keys = _version_keys(entry["course_id"], entry["institute_id"])
+        if entry["stamp"] == _stamp(entry["course_id"], entry["institute_id"], _versions(keys)):
+            return entry["record"]
+
+    admission = (
+        Admission.objects
+        .select_related("course", "institute")
+        .filter(pk=admission_id)
+        .first()
+    )
+    if admission is None:
+        entry = {"record": MISSING}
+    else:
+        entry = _entry(admission, _versions(_version_keys(admission.course_id, admission.institute_id)))
+    cache.set(key, entry, _timeout())
+    return entry["record"]
+
+
+def warm(admission_ids):
+    """Precompute records for many admissions with one query."""
+    admissions = list(Admission.objects.select_related("course", "institute").filter(pk__in=admission_ids))
+    keys = {key for a in admissions for key in _version_keys(a.course_id, a.institute_id)}
+    versions = _versions(list(keys))
+    cache.set_many({cache_key(a.pk): _entry(a, versions) for a in admissions}, _timeout())
+
+
+def invalidate(admission_ids):
+    cache.delete_many([cache_key(pk) for pk in admission_ids])
+
+
+def verify(token):
+    """Return the verification record for a QR token, or None for a forged token."""
+    admission_id = admission_id_from_token(token)
+    if admission_id is None:
+        return None
+    return get_record(admission_id)
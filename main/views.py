@@ -1,4 +1,5 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth.models import User
@@ -6,22 +7,36 @@ from django.contrib.auth import authenticate, login, logout
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.http import JsonResponse
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.http import require_http_methods, require_POST
 from django.core.serializers.json import DjangoJSONEncoder
 from django.conf import settings
+from django.db import transaction
 from datetime import datetime
 import json
 
 from .models import (
     Profile, Institute, CourseCategory, Course,
-    Admission, StudentFeedback, Enrollment 
+    Admission, StudentFeedback, Enrollment, UploadSession
 
 )
 from .forms import (
     UserForm, ProfileForm, InstituteForm, CourseCategoryForm, CourseForm,
     StudentFeedbackForm
 )
-from .utils.pdf_generator import generate_pdf
+from .utils.pdf_generator import (
+    document_response, generate_pdf, spooled_file, streaming_document_response,
+)
 from .utils.generate_qr import generate_qr
+from .utils.home_cache import get_home_payload
+from .routers import PRIMARY, replica_reads
+from .utils.current_institute import current_institute
+from .utils.institute_cache import detail_cache_timeout, detail_version
+from .utils.pricing import final_price
+from .utils import (
+    catalog, offer_letter_export, offer_letters, pdf_cache, reservations, search,
+    typeahead, uploads, verification,
+)
 
 
 date = datetime.now()
@@ -30,35 +45,12 @@ date = datetime.now()
 # -----------------------------------
 # Helper Functions
 # -----------------------------------
-def check_institute_approved(student):
-    inst = Institute.objects.filter(owner=student).first()
-    if inst and inst.status == "approved":
-        return inst
-    return None
-
-
 # -----------------------------------
 # Home Page & Feedback
 # -----------------------------------
 # @login_required
+@replica_reads
 def home(request):
-    # Courses
-    courses = Course.objects.all().order_by('-id')
-    for c in courses:
-        c.final_price = c.original_price - (c.original_price * c.discount_percent / 100) if c.discount_percent else c.original_price
-
-    # Categories - Unique by title
-    all_categories = CourseCategory.objects.all().order_by('title')[:8]  
-    seen_titles = set()
-    categories = []
-    for cat in all_categories:
-        if cat.title not in seen_titles:
-            seen_titles.add(cat.title)
-            categories.append(cat)
-
-    # Feedbacks
-    feedbacks = StudentFeedback.objects.all().order_by('-created_at')
-
     if request.method == 'POST':
         form = StudentFeedbackForm(request.POST)
         if form.is_valid():
@@ -69,21 +61,15 @@ def home(request):
     else:
         form = StudentFeedbackForm()
 
-    feedbacks_json = json.dumps([
-        {
-            "name": fb.student.username,
-            "role": "Student",
-            "text": fb.feedback_text,
-            "image": fb.student.profile.avatar.url if hasattr(fb.student, 'profile') and fb.student.profile.avatar else "/static/images/tesimg04.png"
-        } for fb in feedbacks
-    ], cls=DjangoJSONEncoder)
+    # Courses, category tiles and feedback are served from the cached payload
+    payload = get_home_payload()
 
     return render(request, "main/students/home.html", {
-        "courses": courses,
-        "categories": categories,
-        "feedbacks": feedbacks,
+        "courses": payload["courses"],
+        "categories": payload["categories"],
+        "feedbacks": payload["feedbacks"],
         "form": form,
-        "feedbacks_json": feedbacks_json,
+        "feedbacks_json": payload["feedbacks_json"],
     })
 
 
@@ -93,6 +79,7 @@ def home(request):
 import logging
 logger = logging.getLogger(__name__)
 
+@replica_reads
 def ajax_search(request):
     try:
         query = request.GET.get('q', '').strip()
@@ -100,17 +87,9 @@ def ajax_search(request):
         if not query:
             return JsonResponse({'html': ''})
                 
-        categories = CourseCategory.objects.filter(title__icontains=query)[:5]
-        courses = Course.objects.filter(title__icontains=query)[:5]
-        institutes = Institute.objects.filter(name__icontains=query)[:5]
-        
-        print(f"Found: {categories.count()} categories, {courses.count()} courses, {institutes.count()} institutes")
-        
-        html = render_to_string('main/search_dropdown.html', {
-            'categories': categories,
-            'courses': courses,
-            'institutes': institutes,
-        })
+        results = search.search(query, limit=5)
+
+        html = render_to_string('main/search_dropdown.html', results)
         return JsonResponse({'html': html})
         
     except Exception as e:
@@ -118,44 +97,44 @@ def ajax_search(request):
         return JsonResponse({'html': f'<div class="p-2 text-center text-danger">Server Error: {str(e)}</div>'})
 
 
+@replica_reads
+@cache_control(max_age=30)
+def search_api(request):
+    # Compact JSON results for the search dropdown; see utils/typeahead.py
+    payload, source = typeahead.lookup(request.GET.get('q', ''))
+    response = JsonResponse(payload)
+    response['X-Search-Cache'] = source
+    return response
+
+
 # -----------------------------------
 # Courses
 # -----------------------------------
+@replica_reads
 @login_required
 def course(request):
-    all_categories = CourseCategory.objects.all().order_by('title')
-    categories = []
-    seen_titles = set()
-    for cat in all_categories:
-        if cat.title not in seen_titles:
-            seen_titles.add(cat.title)
-            categories.append(cat)
-
-    category_title = request.GET.get('category') 
-    if category_title:
-        courses = Course.objects.filter(category__title=category_title)
-    else:
-        courses = Course.objects.all()
-    for c in courses:
-        c.final_price = (
-            c.original_price - (c.original_price * c.discount_percent / 100)
-            if c.discount_percent else c.original_price
-        )
+    filters = catalog.parse_filters(request.GET)
+    page = catalog.course_page(filters, cursor=request.GET.get('cursor'))
+
     return render(request, 'main/students/course/course.html', {
-        "categories": categories,
-        "courses": courses,
-        "selected_category": category_title,  
+        "categories": catalog.category_facets(filters),
+        "courses": page["courses"],
+        "next_cursor": page["next_cursor"],
+        "filters": filters,
+        "levels": catalog.LEVELS,
+        "class_types": Course._meta.get_field("class_type").choices,
+        "selected_category": filters["category"],
     })
 
 
 
+@replica_reads
 def course_detail(request, id):
     course = get_object_or_404(Course, id=id)
     discount_percent = course.discount_percent or 0
-    final_price = course.original_price - (course.original_price * discount_percent / 100)
     return render(request, 'main/students/course/course_detail.html', {
         "course": course,
-        "final_price": final_price,
+        "final_price": final_price(course),
         "discount_percent": discount_percent
     })
 
@@ -391,7 +370,9 @@ def apply_institute(request):
 # -----------------------------------
 
 from django.views.generic.detail import DetailView
+from django.db.models import Prefetch
 
+@replica_reads
 class InstituteDetailView(DetailView):
     model = Institute
     template_name = "main/institute_detail.html"
@@ -402,17 +383,18 @@ class InstituteDetailView(DetailView):
 
         institute = self.object
 
-        categories = CourseCategory.objects.filter(
+        # Enrollment counts are read from Course.enrolled_count. The queryset
+        # is lazy, so nothing runs while the fragment is cached; it fills
+        # the shared fragment cache, so it reads from the primary.
+        categories = CourseCategory.objects.using(PRIMARY).filter(
             institute=institute
-        ).prefetch_related('courses')
-
-        for category in categories:
-            for course in category.courses.all():
-                course.enrolled_students = Enrollment.objects.filter(
-                    course=course
-                ).count()
+        ).prefetch_related(
+            Prefetch('courses', queryset=Course.objects.using(PRIMARY).order_by('id'))
+        )
 
         context['categories'] = categories
+        context['detail_version'] = detail_version(institute.pk)
+        context['detail_cache_timeout'] = detail_cache_timeout()
         return context
 
 # -----------------------------------
@@ -425,22 +407,29 @@ def dashboard(request, category_id=None):
         messages.error(request, "Student profile not found.")
         return redirect("main:home")
 
-    institutes = Institute.objects.filter(owner=student)
-    approved = institutes.filter(status="approved").first()
-    pending = institutes.filter(status="pending").first()
-    rejected = institutes.filter(status="rejected").first()
+    approved = current_institute(request)
+    pending = rejected = None
+    if not approved:
+        institutes = Institute.objects.filter(owner=student)
+        pending = institutes.filter(status="pending").first()
+        rejected = institutes.filter(status="rejected").first()
 
     categories = CourseCategory.objects.filter(institute=approved) if approved else []
     if category_id:
         categories = categories.filter(id=category_id)
 
-    enrolled = Admission.objects.filter(institute=approved, course__isnull=False) if approved else []
+    courses = Course.objects.filter(institute=approved).select_related('category') if approved else []
+
+    enrolled = Admission.objects.filter(
+        institute=approved, course__isnull=False
+    ).select_related('user', 'course') if approved else []
 
     return render(request, "admin/custom_admin/dashboard.html", {
         "approved_institute": approved,
         "pending_institute": pending,
         "rejected_institute": rejected,
         "categories": categories,
+        "courses": courses,
         "students": enrolled,
         "course_form": CourseForm(),
     })
@@ -501,9 +490,11 @@ def manage_student(request, admission_id):
             return redirect("main:dashboard")
 
         elif action == "accept":
-            admission.status = "accepted"
-            admission.save()
-            messages.success(request, "Student accepted! Enrollment and seat update handled automatically.")
+            result, admission = reservations.accept_admission(admission.id)
+            if result in reservations.SUCCESSFUL:
+                messages.success(request, reservations.MESSAGES[result])
+            else:
+                messages.error(request, reservations.MESSAGES[result])
             return redirect("main:dashboard")
 
         elif action == "reject":
@@ -519,6 +510,28 @@ def manage_student(request, admission_id):
         "courses": courses,
     })
 
+@login_required
+def bulk_manage_students(request):
+    if request.method != "POST":
+        return redirect("main:dashboard")
+
+    institute = current_institute(request)
+    if not institute:
+        messages.warning(request, "Your institute is not approved yet.")
+        return redirect("main:dashboard")
+
+    action = request.POST.get("action")
+    ids = [pk for pk in request.POST.getlist("admission_ids") if pk.isdigit()]
+    if action not in ("shortlist", "accept", "reject") or not ids:
+        messages.error(request, "Select at least one student and an action.")
+        return redirect("main:dashboard")
+
+    report = reservations.bulk_update_admissions(ids, action, institute=institute)
+    for line in reservations.summarize(report):
+        messages.info(request, line)
+    return redirect("main:dashboard")
+
+
 # -----------------------------------
 # Accept Admission
 # -----------------------------------
@@ -529,10 +542,11 @@ def accept_admission(request, admission_id):
         messages.error(request, "You are not authorized.")
         return redirect('main:institute_dashboard')
 
-    admission.status = 'accepted'
-    admission.save()   
-
-    messages.success(request, "Admission accepted successfully.")
+    result, admission = reservations.accept_admission(admission.id)
+    if result in reservations.SUCCESSFUL:
+        messages.success(request, "Admission accepted successfully.")
+    else:
+        messages.error(request, reservations.MESSAGES[result])
     return redirect('main:institute_dashboard')
 
 
@@ -553,8 +567,7 @@ def reject_admission(request, admission_id):
 # -----------------------------------
 @login_required
 def add_category(request):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     if not institute:
         messages.warning(request, "Your institute is not approved yet.")
         return redirect("main:dashboard")
@@ -575,8 +588,7 @@ def add_category(request):
 # category list
 @login_required
 def category_list(request):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     if not institute:
         messages.warning(request, "Your institute is not approved yet.")
         return redirect("main:dashboard")
@@ -585,6 +597,7 @@ def category_list(request):
     return render(request, "admin/custom_admin/category/category_list.html", {"categories": categories})
 
 # single category
+@replica_reads
 def category_list_stu(request, pk=None):
     if pk:
         category = get_object_or_404(CourseCategory, id=pk)
@@ -603,8 +616,7 @@ def category_list_stu(request, pk=None):
 # edit category
 @login_required
 def edit_category(request, category_id):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     category = get_object_or_404(CourseCategory, id=category_id, institute=institute)
 
     if request.method == "POST":
@@ -621,8 +633,7 @@ def edit_category(request, category_id):
 # delete category
 @login_required
 def delete_category(request, category_id):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     category = get_object_or_404(CourseCategory, id=category_id, institute=institute)
     category.delete()
     messages.success(request, "Category deleted successfully!")
@@ -634,8 +645,7 @@ def delete_category(request, category_id):
 # -----------------------------------
 @login_required
 def add_course(request, category_id=None):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     categories = CourseCategory.objects.filter(institute=institute)
 
     if request.method == "POST":
@@ -674,15 +684,9 @@ def add_course(request, category_id=None):
 # course
 @login_required
 def course_list(request, category_id):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     category = get_object_or_404(CourseCategory, id=category_id, institute=institute)
-    courses = Course.objects.filter(category=category)
-
-    # Calculate final price for each course
-    for course in courses:
-        discount = course.discount_percent or 0
-        course.final_price = course.original_price - (course.original_price * discount / 100)
+    courses = Course.objects.filter(category=category).select_related('category').with_final_price()
 
     return render(request, "admin/custom_admin/course/course_list.html", {
         "courses": courses,
@@ -693,16 +697,14 @@ def course_list(request, category_id):
 # course view
 @login_required
 def view_course(request, course_id):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     course = get_object_or_404(Course, id=course_id, institute=institute)
     return render(request, "admin/custom_admin/course/course_detail.html", {"course": course})
 
 # edit course
 @login_required
 def edit_course(request, course_id):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     course = get_object_or_404(Course, id=course_id, institute=institute)
 
     if request.method == "POST":
@@ -719,8 +721,7 @@ def edit_course(request, course_id):
 # delete course
 @login_required
 def delete_course(request, course_id):
-    student = getattr(request.user, 'student_profile', None)
-    institute = check_institute_approved(student)
+    institute = current_institute(request)
     course = get_object_or_404(Course, id=course_id, institute=institute)
     course.delete()
     messages.success(request, "Course deleted successfully!")
@@ -748,7 +749,9 @@ def esewa_success_mock(request, admission_id):
 
     admission.is_paid = True
     admission.esewa_ref_id = "MOCK_REF_" + str(admission.id)
-    admission.save()
+    # One write transaction for the row and its counters
+    with transaction.atomic():
+        admission.save()
 
     return render(
         request,
@@ -799,7 +802,7 @@ def admission_form(request):
     }
 
     if course_id:
-        selected_course = get_object_or_404(Course, id=course_id)
+        selected_course = get_object_or_404(Course.objects.select_related("category__institute"), id=course_id)
         initial.update({
             "course": selected_course.id,
             "category": selected_course.category.id,
@@ -820,28 +823,59 @@ def admission_form(request):
             return redirect("main:course") 
     if request.method == "POST":
         form = AdmissionForm(request.POST)
-        if form.is_valid():
+        valid = form.is_valid()
+
+        # Documents arrive either as finished chunked uploads (<doc>_upload
+        # holds the session id) or as plain multipart files
+        sessions = {}
+        for doc_type in ["photo", "marksheet", "id_card"]:
+            upload_id = request.POST.get(f"{doc_type}_upload")
+            session = uploads.completed_session(request.user, upload_id, doc_type)
+            if session:
+                sessions[doc_type] = session
+            elif upload_id:
+                # Unfinished, or attached by an earlier submit
+                messages.error(request, f"The {doc_type} upload can no longer be used; please upload it again.")
+                valid = False
+            elif request.FILES.get(doc_type):
+                try:
+                    uploads.check_size(doc_type, request.FILES[doc_type].size)
+                except uploads.UploadError as e:
+                    messages.error(request, str(e))
+                    valid = False
+
+        if valid:
             admission = form.save(commit=False)
             admission.user = request.user
 
-            course = admission.course
-            discount = (course.original_price * course.discount_percent) / 100
-            admission.amount = course.original_price - discount
+            admission.amount = final_price(admission.course)
             admission.esewa_pid = str(uuid.uuid4())
-            admission.save()
-
-            # Upload documents
-            for doc_type in ["photo", "marksheet", "id_card"]:
-                if request.FILES.get(doc_type):
-                    AdmissionDocument.objects.create(
-                        admission=admission,
-                        file=request.FILES[doc_type],
-                        doc_type=doc_type
-                    )
+            try:
+                # A repeated submit finds its uploads attached already and
+                # leaves no second admission behind
+                with transaction.atomic():
+                    admission.save()
+
+                    # Upload documents
+                    for doc_type in ["photo", "marksheet", "id_card"]:
+                        if doc_type in sessions:
+                            uploads.attach(sessions[doc_type], admission)
+                        elif request.FILES.get(doc_type):
+                            AdmissionDocument.objects.create(
+                                admission=admission,
+                                file=request.FILES[doc_type],
+                                doc_type=doc_type
+                            )
+            except uploads.UploadError as e:
+                messages.error(request, str(e))
+                return render(request, "main/students/admission_form.html", {
+                    "form": form,
+                    "selected_course": selected_course
+                }, status=e.status)
 
             return redirect("main:esewa_payment", admission_id=admission.id)
     else:
-        form = AdmissionForm(initial=initial)
+        form = AdmissionForm(initial=initial, course=selected_course)
 
     return render(request, "main/students/admission_form.html", {
         "form": form,
@@ -858,100 +892,219 @@ def delete_admission(request, admission_id):
         return redirect('main:student_profile')
     return redirect('main:student_profile')
 
+# -----------------------------------
+# Chunked document uploads
+# -----------------------------------
+def _upload_error(error):
+    payload = {"error": str(error)}
+    if error.received is not None:
+        payload["received"] = error.received
+    return JsonResponse(payload, status=error.status)
+
+
+@login_required
+@require_POST
+def create_upload(request):
+    """Open a resumable upload: {doc_type, filename, size} -> session."""
+    try:
+        # Refuse oversized bodies before request.body buffers them
+        uploads.check_content_length(request.META.get("CONTENT_LENGTH") or 0, uploads.CREATE_BODY_MAX)
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON."}, status=400)
+    else:
+        data = request.POST
+    try:
+        session = uploads.create_session(request.user, data.get("doc_type"), data.get("filename"), data.get("size"))
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    payload = uploads.describe(session)
+    payload["upload_url"] = reverse("main:upload_session", args=[session.pk])
+    return JsonResponse(payload, status=201)
+
+
+@login_required
+@require_http_methods(["GET", "PUT", "DELETE"])
+def upload_session(request, session_id):
+    """GET: progress, PUT: next chunk (with Content-Range), DELETE: abort."""
+    session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+    if request.method == "DELETE":
+        uploads.abort(session)
+        return JsonResponse({"status": "aborted"})
+    if request.method == "PUT":
+        try:
+            # The body is read from the request stream in small pieces
+            session = uploads.write_chunk(
+                session, request, request.headers.get("Content-Range"), request.META.get("CONTENT_LENGTH") or None,
+            )
+        except uploads.UploadError as e:
+            return _upload_error(e)
+    return JsonResponse(uploads.describe(session))
+
+
 # -----------------------------------
 # Offer Letter
 # -----------------------------------
 
+def _offer_letter_admission(request, admission_id):
+    """
+    Return (admission, key, None) when the user may fetch its offer letter,
+    else (None, None, message). ``key`` identifies the current letter content.
+    """
+    admission = get_object_or_404(
+        Admission.objects.select_related("user__profile", "user__student_profile", "course"),
+        id=admission_id,
+    )
+
+    if request.user != admission.user:
+        return None, None, "Access denied."
+
+    try:
+        institute = offer_letters.letter_institute(admission)
+    except offer_letters.OfferLetterUnavailable as exc:
+        return None, None, str(exc)
+    return admission, offer_letters.render_key(admission, institute), None
+
+
 @login_required
 def download_offer_letter(request, admission_id):
-    import os
-    import base64
-    import qrcode
-    from io import BytesIO
     from django.http import HttpResponse
-    from django.template.loader import render_to_string
-    from xhtml2pdf import pisa
-    from django.shortcuts import get_object_or_404
-    from .models import Admission, Enrollment, Institute
+    from django.utils.cache import get_conditional_response, patch_cache_control
+
+    admission, key, error = _offer_letter_admission(request, admission_id)
+    if error:
+        return HttpResponse(error)
+
+    etag = f'"{key}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        letter = offer_letters.letter_for(admission)
+        filename = offer_letters.filename_for(admission.id)
+        if offer_letters.is_ready(letter, key):
+            response = document_response(letter.file.open("rb"), filename)
+        else:
+            # Missing or stale: queue a fresh render, and serve the cached
+            # bytes meanwhile if this exact letter was rendered before
+            if letter is None or letter.status != offer_letters.RUNNING:
+                offer_letters.enqueue([admission.id])
+            cached = pdf_cache.get_path(key)
+            if cached is None:
+                return render(request, "main/students/offer_letter_status.html", {
+                    "admission": admission,
+                    "letter": offer_letters.letter_for(admission),
+                }, status=202)
+            response = document_response(open(cached, "rb"), filename)
+
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
-    admission = get_object_or_404(Admission, id=admission_id)
 
-    if request.user != admission.user:
-        return HttpResponse("Access denied.")
+@login_required
+def offer_letter_status(request, admission_id):
+    admission, key, error = _offer_letter_admission(request, admission_id)
+    if error:
+        return JsonResponse({"status": "unavailable", "message": error}, status=403)
+
+    letter = offer_letters.letter_for(admission)
+    if offer_letters.is_ready(letter, key) or pdf_cache.contains(key):
+        status = offer_letters.READY
+    elif letter is None or letter.status == offer_letters.READY:
+        # Never queued, stale, or the stored file has gone missing
+        offer_letters.enqueue([admission.id])
+        status = offer_letters.QUEUED
+    else:
+        if offer_letters.is_due(letter):
+            # A retry whose timer was lost (e.g. the process restarted)
+            offer_letters.wake_workers()
+        status = letter.status
+    return JsonResponse({
+        "status": status,
+        "download_url": reverse("main:download_offer_letter", args=[admission.id]) if status == offer_letters.READY else None,
+    })
 
-    enrollment = Enrollment.objects.filter(
-        student=admission.user.student_profile,
-        course=admission.course
-    ).first()
 
-    if not enrollment:
-        return HttpResponse("Enrollment not found.")
 
-    institute = enrollment.institute
+@never_cache
+def verify_admission(request, token):
+    # Public QR scan target; forged tokens never reach the database. Not
+    # cacheable by browsers or proxies, so a revoked admission stops showing
+    # as valid at once; the server-side record keeps repeat scans cheap.
+    record = verification.verify(token)
+    wants_json = request.GET.get("format") == "json" or "application/json" in request.headers.get("Accept", "")
+    if wants_json:
+        if record is None:
+            return JsonResponse({"verified": False, "status": "invalid"}, status=404)
+        return JsonResponse(record)
+    return render(request, "main/verify_admission.html", {
+        "record": record,
+    }, status=200 if record is not None else 404)
 
-    if institute.status != "approved":
-        return HttpResponse("Offer letter not available.")
 
-    def image_to_base64(image_field):
-        if image_field and hasattr(image_field, 'path') and os.path.exists(image_field.path):
-            try:
-                with open(image_field.path, "rb") as img_file:
-                    return base64.b64encode(img_file.read()).decode('utf-8')
-            except Exception as e:
-                print(f"Error converting image to base64: {e}")
-                return None
-        return None
-
-    # Generate QR code
-    qr_buffer = BytesIO()
-    qrcode.make(f"ADMISSION VERIFIED: {admission.id}").save(qr_buffer, format='PNG')
-    qr_base64 = base64.b64encode(qr_buffer.getvalue()).decode('utf-8')
-
-    signature_base64 = image_to_base64(institute.signature)
-    stamp_base64 = image_to_base64(institute.stamp)
-    logo_base64 = image_to_base64(institute.profile_logo)
-
-    student_photo_base64 = None
-    if admission.user.profile and admission.user.profile.avatar:
-        student_photo_base64 = image_to_base64(admission.user.profile.avatar)
+@login_required
+def export_offer_letters(request):
+    """All accepted students' offer letters as one ZIP, or one merged PDF with ?format=pdf."""
+    from django.utils.text import slugify
 
-    context = {
-        "admission": admission,
-        "course": admission.course,
-        "institute": institute,
-        "student_name": admission.user.get_full_name() if admission.user else admission.student_name,
-        "qr_base64": qr_base64,
-        "signature_base64": signature_base64,
-        "stamp_base64": stamp_base64,
-        "logo_base64": logo_base64,
-        "student_photo_base64": student_photo_base64,
-    }
+    institute = current_institute(request)
+    if not institute:
+        messages.warning(request, "Your institute is not approved yet.")
+        return redirect("main:dashboard")
 
-    html = render_to_string("main/offer_letter.html", context)
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="Offer_Letter_{admission.id}.pdf"'
+    course = None
+    if request.GET.get("course"):
+        course = get_object_or_404(Course, id=request.GET["course"], institute=institute)
 
-    pisa_status = pisa.CreatePDF(html, dest=response)
+    admissions = list(offer_letter_export.accepted_admissions(institute, course))
+    if not admissions:
+        messages.info(request, "No accepted students to export.")
+        return redirect("main:dashboard")
 
-    if pisa_status.err:
-        return HttpResponse('PDF generation error')
-    return response
+    basename = f"offer_letters_{slugify(course.title if course else institute.name) or institute.id}"
+    letters = offer_letter_export.rendered_letters(admissions, institute)
 
+    if request.GET.get("format") == "pdf":
+        letters = list(letters)
+        missing = [admission for admission, path in letters if path is None]
+        if len(missing) == len(letters):
+            messages.error(request, "None of the offer letters could be rendered.")
+            return redirect("main:dashboard")
+        merged = offer_letter_export.merge_pdfs((path for _admission, path in letters if path), spooled_file())
+        response = document_response(merged, f"{basename}.pdf")
+        if missing:
+            response["X-Missing-Offer-Letters"] = ",".join(str(admission.id) for admission in missing)
+            messages.warning(
+                request,
+                f"{len(missing)} offer letters could not be rendered and are not in the PDF: "
+                + ", ".join(admission.student_name for admission in missing),
+            )
+        return response
 
+    # Letters that fail to render are listed in MISSING.txt inside the ZIP
+    return streaming_document_response(
+        offer_letter_export.stream_zip(offer_letter_export.zip_entries(letters)),
+        f"{basename}.zip", "application/zip",
+    )
 
 
 
 # -----------------------------------
 # Dynamic AJAX Loading
 # -----------------------------------
+@replica_reads
 def load_categories(request):
     institute_id = request.GET.get("institute_id")
     categories = CourseCategory.objects.filter(institute_id=institute_id)
     return JsonResponse(list(categories.values("id", "title")), safe=False)
 
 
+@replica_reads
 def load_courses(request):
     category_id = request.GET.get("category_id")
-    courses = Course.objects.filter(category_id=category_id)
-    data = [{"id": c.id, "title": c.title, "original_price": float(c.original_price), "discount_percent": c.discount_percent} for c in courses]
+    courses = Course.objects.filter(category_id=category_id).with_final_price()
+    data = [{"id": c.id, "title": c.title, "original_price": float(c.original_price), "discount_percent": c.discount_percent, "final_price": float(c.final_price)} for c in courses]
     return JsonResponse(data, safe=False)